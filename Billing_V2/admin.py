@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import BillingReport, OrderCost, ServiceCost
+from LedgerLink.paginators import EstimatedCountPaginator
+from .models import BillingReport, MonthlyBillingRollup, OrderCost, ServiceCost
 
 
 class ServiceCostInline(admin.TabularInline):
@@ -44,6 +46,9 @@ class OrderCostAdmin(admin.ModelAdmin):
     readonly_fields = ['total_amount', 'order_link', 'billing_report_link']
     fields = ['order', 'order_link', 'billing_report', 'billing_report_link', 'total_amount']
     inlines = [ServiceCostInline]
+    list_select_related = ['order']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     def order_reference(self, obj):
         """Get order reference number for display"""
@@ -65,8 +70,8 @@ class OrderCostAdmin(admin.ModelAdmin):
     
     def billing_report_link(self, obj):
         """Generate a link to the billing report in the admin"""
-        if obj and obj.billing_report:
-            url = reverse('admin:Billing_V2_billingreport_change', args=[obj.billing_report.id])
+        if obj and obj.billing_report_id:
+            url = reverse('admin:Billing_V2_billingreport_change', args=[obj.billing_report_id])
             return format_html('<a href="{}">View Report</a>', url)
         return "-"
     billing_report_link.short_description = "Report Link"
@@ -86,6 +91,7 @@ class BillingReportAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     inlines = [OrderCostInline]
+    list_select_related = ['customer']
     
     fieldsets = (
         ('Basic Information', {
@@ -107,10 +113,15 @@ class BillingReportAdmin(admin.ModelAdmin):
         return f"${obj.total_amount:,.2f}" if obj.total_amount else "$0.00"
     formatted_total.short_description = "Total Amount"
     
+    def get_queryset(self, request):
+        """Annotate order counts so the changelist doesn't count per row"""
+        return super().get_queryset(request).annotate(_order_count=Count('order_costs'))
+    
     def order_count(self, obj):
         """Get count of orders for display"""
-        return obj.order_costs.count()
+        return obj._order_count
     order_count.short_description = "Orders"
+    order_count.admin_order_field = '_order_count'
     
     def customer_link(self, obj):
         """Generate a link to the customer in the admin"""
@@ -141,5 +152,22 @@ class BillingReportAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(MonthlyBillingRollup)
+class MonthlyBillingRollupAdmin(admin.ModelAdmin):
+    """Read-only admin for the monthly rollup table, rebuilt by backfill_billing_rollups"""
+    list_display = ['month', 'customer', 'service_name', 'order_count', 'quantity', 'amount', 'updated_at']
+    list_filter = ['month']
+    search_fields = ['customer__company_name', 'service_name']
+    date_hierarchy = 'month'
+    ordering = ['-month', 'customer', 'service_id']
+    list_select_related = ['customer']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # Register ServiceCost model separately if needed
 # admin.site.register(ServiceCost)
\ No newline at end of file
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class BillingV2Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Billing_V2'
-    verbose_name = 'Billing V2'
\ No newline at end of file
+    verbose_name = 'Billing V2'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,52 @@
+import logging
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import OrderCost
+from ...utils.rollups import refresh_monthly_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly billing rollup table from stored report data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer-id', type=int, help='Only rebuild this customer')
+        parser.add_argument('--start-month', type=str, help='First month to rebuild (YYYY-MM)')
+        parser.add_argument('--end-month', type=str, help='Last month to rebuild (YYYY-MM)')
+
+    def parse_month(self, value, name):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"Invalid {name}: {value}. Use YYYY-MM")
+
+    def handle(self, *args, **options):
+        start_month = self.parse_month(options.get('start_month'), '--start-month')
+        end_month = self.parse_month(options.get('end_month'), '--end-month')
+        if start_month and end_month and start_month > end_month:
+            raise CommandError("--start-month must not be after --end-month")
+
+        customer_id = options.get('customer_id')
+        if customer_id:
+            customer_ids = [customer_id]
+        else:
+            customer_ids = list(
+                OrderCost.objects.order_by()
+                .values_list('billing_report__customer_id', flat=True)
+                .distinct()
+            )
+
+        total_rows = 0
+        for index, customer_id in enumerate(customer_ids, start=1):
+            rows = refresh_monthly_rollups(customer_id, start_month, end_month)
+            total_rows += rows
+            self.stdout.write(f"[{index}/{len(customer_ids)}] Customer {customer_id}: {rows} rollup rows")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {total_rows} monthly rollup rows for {len(customer_ids)} customers"
+        ))
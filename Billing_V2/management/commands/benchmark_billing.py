@@ -0,0 +1,89 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.benchmark import BillingBenchmark, compare_results, dump_results
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark billing calculators, rule evaluation and exporters on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1000,
+                            help='Number of synthetic orders (default: 1000)')
+        parser.add_argument('--customers', type=int, default=1,
+                            help='Number of synthetic customers (default: 1)')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed for the data generator (default: 42)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed runs per benchmark (default: 3)')
+        parser.add_argument('--only', type=str,
+                            help='Comma-separated list of benchmarks to run')
+        parser.add_argument('--output', type=str,
+                            help='Write JSON results to this file')
+        parser.add_argument('--baseline', type=str,
+                            help='JSON results from an earlier run to compare against')
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help='Relative median slowdown reported as a regression (default: 0.10)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if any benchmark regressed')
+        parser.add_argument('--keep-data', action='store_true',
+                            help='Keep the generated data instead of rolling it back')
+
+    def handle(self, *args, **options):
+        if options['orders'] < 1 or options['customers'] < 1 or options['repeat'] < 1:
+            raise CommandError('--orders, --customers and --repeat must be positive')
+
+        only = [name.strip() for name in options['only'].split(',')] if options.get('only') else None
+        benchmark = BillingBenchmark(
+            orders=options['orders'],
+            customers=options['customers'],
+            seed=options['seed'],
+            repeat=options['repeat'],
+            keep_data=options['keep_data'],
+            only=only,
+        )
+        if only:
+            unknown = set(only) - set(benchmark.benchmarks())
+            if unknown:
+                raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(f"Generating {options['orders']} orders for {options['customers']} customer(s)...")
+        results = benchmark.run()
+
+        for result in results['results']:
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"{result['name']:<26} failed: {result['error']}"))
+            else:
+                self.stdout.write(
+                    f"{result['name']:<26} median {result['median']:.4f}s  "
+                    f"{result['orders_per_second']} orders/s  {result['queries']} queries"
+                )
+                if result.get('python_fallback_rule_groups'):
+                    self.stdout.write(
+                        f"{'':<26} {result['python_fallback_rule_groups']} of {result['rule_groups']} "
+                        f"rule groups evaluated in Python"
+                    )
+
+        if options.get('output'):
+            dump_results(results, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options.get('baseline'):
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline: {str(e)}")
+
+            comparison = compare_results(baseline, results, options['threshold'])
+            regressions = [c for c in comparison if c['regression']]
+            for entry in comparison:
+                style = self.style.ERROR if entry['regression'] else self.style.SUCCESS
+                self.stdout.write(style(f"{entry['name']:<26} {entry['change']:+.1%} vs baseline"))
+
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} benchmark(s) regressed")
@@ -0,0 +1,33 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from customers.models import Customer
+from ...utils.billing_cache import warm_customer_indexes
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Preload the excluded SKU and product indexes used by billing into the shared cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer-id', type=int, help='Only warm this customer')
+
+    def handle(self, *args, **options):
+        customer_id = options.get('customer_id')
+        if customer_id:
+            if not Customer.objects.filter(id=customer_id).exists():
+                raise CommandError(f"Customer {customer_id} does not exist")
+            customer_ids = [customer_id]
+        else:
+            customer_ids = list(Customer.objects.filter(is_active=True).values_list('id', flat=True))
+
+        for index, customer_id in enumerate(customer_ids, start=1):
+            counts = warm_customer_indexes(customer_id)
+            self.stdout.write(
+                f"[{index}/{len(customer_ids)}] Customer {customer_id}: "
+                f"{counts['excluded_skus']} excluded SKUs, {counts['products']} products"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed billing cache for {len(customer_ids)} customers"))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Billing_V2', '0002_billingreport_metadata'),
+        ('customers', '0004_customer_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyBillingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_id', models.IntegerField()),
+                ('service_name', models.CharField(max_length=255)),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('order_count', models.IntegerField(default=0)),
+                ('quantity', models.IntegerField(default=0, help_text='Total item quantity of the billed orders')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_billing_rollups', to='customers.customer')),
+            ],
+            options={
+                'verbose_name': 'Monthly Billing Rollup',
+                'verbose_name_plural': 'Monthly Billing Rollups',
+                'indexes': [models.Index(fields=['month', 'service_id'], name='idx_rollup_month_service')],
+                'constraints': [models.UniqueConstraint(fields=('customer', 'month', 'service_id'), name='uniq_rollup_customer_month_service')],
+            },
+        ),
+    ]
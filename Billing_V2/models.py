@@ -3,6 +3,7 @@ from django.utils import timezone
 from customers.models import Customer
 from orders.models import Order
 from services.models import Service
+from billing.money import to_cents, to_decimal, to_float
 import json
 import logging
 
@@ -39,8 +40,8 @@ class BillingReport(models.Model):
                 self.total_amount = 0
                 return
                 
-            # Sum all service amounts from service_totals
-            total = sum(data['amount'] for data in self.service_totals.values())
+            # Sum all service amounts from service_totals in cents to avoid float drift
+            total = to_decimal(sum(to_cents(data['amount']) for data in self.service_totals.values()))
             self.total_amount = total
             logger.info(f"Updated report #{self.id} total_amount to {total} based on service totals")
         except Exception as e:
@@ -65,11 +66,12 @@ class BillingReport(models.Model):
         for service_cost in order_cost.service_costs.all():
             service_id = str(service_cost.service_id)
             if service_id in self.service_totals:
-                self.service_totals[service_id]['amount'] += float(service_cost.amount)
+                cents = to_cents(self.service_totals[service_id]['amount']) + to_cents(service_cost.amount)
+                self.service_totals[service_id]['amount'] = to_float(cents)
             else:
                 self.service_totals[service_id] = {
                     'service_name': service_cost.service_name,
-                    'amount': float(service_cost.amount)
+                    'amount': to_float(to_cents(service_cost.amount))
                 }
         
         # Update total amount from service totals
@@ -90,7 +92,10 @@ class BillingReport(models.Model):
             'start_date': self.start_date.strftime('%Y-%m-%d'),
             'end_date': self.end_date.strftime('%Y-%m-%d'),
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'orders': [order_cost.to_dict() for order_cost in self.order_costs.all()],
+            'orders': [
+                order_cost.to_dict()
+                for order_cost in self.order_costs.select_related('order').prefetch_related('service_costs')
+            ],
             'service_totals': self.service_totals,
             'total_amount': float(self.total_amount),
             'metadata': self.metadata
@@ -120,7 +125,7 @@ class OrderCost(models.Model):
         verbose_name_plural = "Order Costs"
     
     def __str__(self):
-        return f"Order Cost #{self.id} - Order #{self.order.id}"
+        return f"Order Cost #{self.id} - Order #{self.order_id}"
     
     def add_service_cost(self, service_cost):
         """
@@ -140,9 +145,9 @@ class OrderCost(models.Model):
             Dictionary representation of the order cost
         """
         return {
-            'order_id': self.order.id,
+            'order_id': self.order.transaction_id,
             'reference_number': self.order.reference_number,
-            'order_date': self.order.created_at.strftime('%Y-%m-%d'),
+            'order_date': self.order.close_date.strftime('%Y-%m-%d') if self.order.close_date else None,
             'service_costs': [sc.to_dict() for sc in self.service_costs.all()],
             'total_amount': float(self.total_amount)
         }
@@ -176,4 +181,36 @@ class ServiceCost(models.Model):
             'service_id': self.service_id,
             'service_name': self.service_name,
             'amount': float(self.amount)
-        }
\ No newline at end of file
+        }
+
+class MonthlyBillingRollup(models.Model):
+    """
+    Billed amounts per customer, service and month.
+
+    Maintained from the stored service costs when a report is generated (see
+    utils/rollups.py) and rebuilt with the backfill_billing_rollups command.
+    Like the analytics API, each order counts once, with its most recent
+    calculation, in the month it was closed. A row with service_id 0 holds
+    each month's totals across all services (see ALL_SERVICES_ID).
+    """
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='monthly_billing_rollups')
+    service_id = models.IntegerField()
+    service_name = models.CharField(max_length=255)
+    month = models.DateField(help_text="First day of the month")
+    order_count = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0, help_text="Total item quantity of the billed orders")
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Monthly Billing Rollup"
+        verbose_name_plural = "Monthly Billing Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'month', 'service_id'], name='uniq_rollup_customer_month_service'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'service_id'], name='idx_rollup_month_service'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id} {self.month:%Y-%m} {self.service_name}: ${self.amount}"
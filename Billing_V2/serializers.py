@@ -58,6 +58,14 @@ class BillingReportRequestSerializer(serializers.Serializer):
         choices=['json', 'csv', 'pdf', 'dict'],
         default='json'
     )
+    include_shipping = serializers.BooleanField(
+        default=False,
+        help_text="Pass carrier shipping charges through as service lines"
+    )
+    include_box_cost = serializers.BooleanField(
+        default=False,
+        help_text="Bill the cheapest box that fits each order as a materials line"
+    )
     
     def validate_customer_id(self, value):
         """Validate customer ID exists"""
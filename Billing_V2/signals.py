@@ -0,0 +1,24 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from customer_services.models import CustomerService
+from LedgerLink.cache import invalidate_namespace
+from products.models import Product
+from .utils.billing_cache import EXCLUDED_SKUS_NAMESPACE, PRODUCT_SKUS_NAMESPACE
+
+
+@receiver([post_save, post_delete], sender=CustomerService)
+@receiver(m2m_changed, sender=CustomerService.skus.through)
+def invalidate_excluded_skus(sender, **kwargs):
+    """Drop cached excluded SKU indexes when customer services change."""
+    invalidate_namespace(EXCLUDED_SKUS_NAMESPACE)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_skus(sender, **kwargs):
+    """Drop cached product SKU indexes when products change.
+
+    Excluded SKUs are read through the products, so they are dropped too.
+    """
+    invalidate_namespace(PRODUCT_SKUS_NAMESPACE)
+    invalidate_namespace(EXCLUDED_SKUS_NAMESPACE)
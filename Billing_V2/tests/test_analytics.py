@@ -0,0 +1,97 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order
+from ..models import BillingReport, OrderCost, ServiceCost
+from ..utils.analytics import BillingAnalytics
+
+
+class BillingAnalyticsTest(TestCase):
+    """Dashboard aggregates are computed in one query and count each order once."""
+
+    def setUp(self):
+        self.acme = Customer.objects.create(company_name="Acme", legal_business_name="Acme Inc", email="acme@example.com")
+        self.globex = Customer.objects.create(company_name="Globex", legal_business_name="Globex Inc", email="globex@example.com")
+
+        self.orders = {}
+        for transaction_id, customer, close_date in [
+            (84000, self.acme, datetime(2024, 1, 15, tzinfo=dt_timezone.utc)),
+            (84001, self.acme, datetime(2024, 2, 3, tzinfo=dt_timezone.utc)),
+            (84002, self.globex, datetime(2024, 2, 20, tzinfo=dt_timezone.utc)),
+        ]:
+            self.orders[transaction_id] = Order.objects.create(
+                transaction_id=transaction_id, customer=customer,
+                reference_number=f"AN-{transaction_id}", close_date=close_date
+            )
+
+        # Acme billed twice for January: only the second calculation counts
+        self.add_report(self.acme, {84000: [(1, 'Pick', '1.00')]})
+        self.add_report(self.acme, {84000: [(1, 'Pick', '2.00'), (2, 'Pack', '0.50')],
+                                    84001: [(1, 'Pick', '3.00')]})
+        self.add_report(self.globex, {84002: [(2, 'Pack', '4.00')]})
+
+    def add_report(self, customer, costs):
+        now = timezone.now()
+        report = BillingReport.objects.create(customer=customer, start_date=now, end_date=now)
+        for transaction_id, services in costs.items():
+            order_cost = OrderCost.objects.create(order=self.orders[transaction_id], billing_report=report)
+            for service_id, name, amount in services:
+                ServiceCost.objects.create(order_cost=order_cost, service_id=service_id,
+                                           service_name=name, amount=Decimal(amount))
+
+    def test_by_service(self):
+        with self.assertNumQueries(1):
+            rows = BillingAnalytics().by_service()
+
+        self.assertEqual(rows, [
+            {'service_id': 1, 'service_name': 'Pick', 'total_amount': Decimal('5.00'), 'order_count': 2, 'customer_count': 1},
+            {'service_id': 2, 'service_name': 'Pack', 'total_amount': Decimal('4.50'), 'order_count': 2, 'customer_count': 2},
+        ])
+
+    def test_by_customer(self):
+        with self.assertNumQueries(1):
+            rows = BillingAnalytics().by_customer()
+
+        self.assertEqual([(r['customer_name'], r['total_amount'], r['order_count'], r['report_count']) for r in rows], [
+            ('Acme', Decimal('5.50'), 2, 1),
+            ('Globex', Decimal('4.00'), 1, 1),
+        ])
+
+    def test_by_period_with_filters(self):
+        rows = BillingAnalytics().by_period('month')
+        self.assertEqual([(r['period'], r['total_amount']) for r in rows], [
+            ('2024-01-01', Decimal('2.50')),
+            ('2024-02-01', Decimal('7.00')),
+        ])
+
+        rows = BillingAnalytics(customer_id=self.acme.id, start_date=date(2024, 2, 1),
+                                end_date=date(2024, 2, 29)).by_period('month')
+        self.assertEqual([(r['period'], r['total_amount']) for r in rows], [('2024-02-01', Decimal('3.00'))])
+
+        rows = BillingAnalytics(service_id=2).by_customer()
+        self.assertEqual([r['total_amount'] for r in rows], [Decimal('4.00'), Decimal('0.50')])
+
+    def test_invalid_grouping(self):
+        with self.assertRaises(ValueError):
+            BillingAnalytics().aggregate('product')
+        with self.assertRaises(ValueError):
+            BillingAnalytics().aggregate('period', period='fortnight')
+
+    def test_endpoint(self):
+        response = self.client.get('/api/v2/reports/analytics/', {'group_by': 'customer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['customer_name'] for row in response.json()['data']], ['Acme', 'Globex'])
+
+        response = self.client.get('/api/v2/reports/analytics/', {'group_by': 'period', 'start_date': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_customer_summary_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v2/reports/customer_summary/')
+        names = sorted(row['customer_name'] for row in response.json())
+        self.assertEqual(names, ['Acme', 'Globex'])
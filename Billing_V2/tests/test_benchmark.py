@@ -0,0 +1,62 @@
+import pytest
+from django.db import transaction
+from django.test import TestCase
+
+from orders.models import Order
+from Billing_V2.utils.benchmark import BillingBenchmark, SyntheticDataGenerator, compare_results
+
+
+@pytest.mark.performance
+class SyntheticDataGeneratorTest(TestCase):
+    """Tests for the deterministic benchmark data generator."""
+
+    def generate(self, seed):
+        generator = SyntheticDataGenerator(orders=50, customers=2, products_per_customer=10, seed=seed)
+        generator.generate()
+        orders = list(
+            Order.objects.filter(customer__in=generator.customers)
+            .order_by('transaction_id')
+            .values_list('close_date', 'weight_lb', 'sku_quantity')
+        )
+        return generator, orders
+
+    def test_same_seed_generates_same_orders(self):
+        with transaction.atomic():
+            _, first = self.generate(seed=7)
+            transaction.set_rollback(True)
+        _, second = self.generate(seed=7)
+        self.assertEqual(first, second)
+
+    def test_orders_fall_inside_period(self):
+        generator, orders = self.generate(seed=1)
+        start, end = generator.period
+        self.assertEqual(len(orders), 50)
+        self.assertTrue(all(start <= close_date < end for close_date, _, _ in orders))
+
+
+@pytest.mark.performance
+class BillingBenchmarkTest(TestCase):
+    """Tests for the benchmark runner."""
+
+    def test_run_reports_timings_and_rolls_back(self):
+        benchmark = BillingBenchmark(orders=20, repeat=1, only=['v2_calculator', 'rule_evaluation_sql'])
+        results = benchmark.run()
+
+        self.assertEqual(results['meta']['orders'], 20)
+        self.assertEqual([r['name'] for r in results['results']], ['v2_calculator', 'rule_evaluation_sql'])
+        for result in results['results']:
+            self.assertNotIn('error', result)
+            self.assertEqual(len(result['runs']), 1)
+            self.assertIsNotNone(result['queries'])
+        # Groups that don't compile (sku_quantity rules off PostgreSQL) are reported
+        rule_result = results['results'][1]
+        self.assertGreater(rule_result['rule_groups'], 0)
+        self.assertIn('python_fallback_rule_groups', rule_result)
+        self.assertFalse(Order.objects.exists())
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {'results': [{'name': 'a', 'median': 1.0}, {'name': 'b', 'median': 1.0}]}
+        current = {'results': [{'name': 'a', 'median': 1.5}, {'name': 'b', 'median': 1.05}]}
+        comparison = {c['name']: c for c in compare_results(baseline, current)}
+        self.assertTrue(comparison['a']['regression'])
+        self.assertFalse(comparison['b']['regression'])
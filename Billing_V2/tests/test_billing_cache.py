@@ -0,0 +1,88 @@
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from LedgerLink.cache import cache_key, get_or_load, invalidate_namespace
+from products.models import Product
+from services.models import Service
+from ..utils.billing_cache import (
+    get_excluded_skus,
+    get_product_skus,
+    progress_cache_key,
+)
+
+# A cache of their own, so cached values never leak into other tests
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-billing-cache',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BillingCacheTest(TestCase):
+    """Customer indexes are shared through the cache and invalidated on change."""
+
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            company_name="Cache Co",
+            legal_business_name="Cache Co LLC",
+            email="cache@example.com"
+        )
+        self.inbound = Product.objects.create(sku="in-001", customer=self.customer)
+        self.outbound = Product.objects.create(sku="out-002", customer=self.customer)
+        per_item = Service.objects.create(service_name="Per Item", charge_type="quantity")
+        self.per_item = CustomerService.objects.create(customer=self.customer, service=per_item, unit_price=1)
+        self.per_item.skus.add(self.inbound)
+
+    def test_key_format(self):
+        self.assertEqual(cache_key('auth:api_key', 'abc'), 'auth:api_key:abc')
+        self.assertEqual(
+            progress_cache_key(7, date(2024, 1, 1), '2024-01-31'),
+            'billing_v2:progress:7:2024-01-01:2024-01-31'
+        )
+
+    def test_get_or_load_uses_namespace_version(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(get_or_load('tests:ns', [1], loader, 60), 1)
+        self.assertEqual(get_or_load('tests:ns', [1], loader, 60), 1)
+
+        invalidate_namespace('tests:ns')
+        self.assertEqual(get_or_load('tests:ns', [1], loader, 60), 2)
+
+    def test_indexes_follow_model_changes(self):
+        self.assertEqual(get_excluded_skus(self.customer.id), {'IN001'})
+        self.assertEqual(get_product_skus(self.customer.id), {'IN001', 'OUT002'})
+
+        with self.assertNumQueries(0):
+            get_excluded_skus(self.customer.id)
+            get_product_skus(self.customer.id)
+
+        self.per_item.skus.add(self.outbound)
+        self.assertEqual(get_excluded_skus(self.customer.id), {'IN001', 'OUT002'})
+
+        Product.objects.create(sku="new-003", customer=self.customer)
+        self.assertEqual(get_product_skus(self.customer.id), {'IN001', 'OUT002', 'NEW003'})
+
+    def test_warm_command(self):
+        out = StringIO()
+        call_command('warm_billing_cache', stdout=out)
+
+        self.assertIn('1 excluded SKUs, 2 products', out.getvalue())
+        self.assertIn('Warmed billing cache for 1 customers', out.getvalue())
+
+        with self.assertNumQueries(0):
+            get_excluded_skus(self.customer.id)
+            get_product_skus(self.customer.id)
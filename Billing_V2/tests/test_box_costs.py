@@ -0,0 +1,78 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from materials.box_selection import BoxIndex
+from materials.models import BoxPrice
+from orders.models import Order
+from services.models import Service
+from ..models import ServiceCost
+from ..utils.box_costs import BOX_SERVICE_ID, get_box_charges
+from ..utils.calculator import BillingCalculator
+
+
+class BoxCostTest(TestCase):
+    """The cheapest fitting box is billed as a materials line when asked for."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Box Co",
+            legal_business_name="Box Co LLC",
+            email="box@example.com"
+        )
+        handling = Service.objects.create(service_name="Handling", charge_type="single")
+        CustomerService.objects.create(customer=self.customer, service=handling, unit_price=Decimal('1.00'))
+
+        BoxPrice.objects.create(box_type="Small", price=Decimal('1.50'), length=12, width=12, height=12)
+        BoxPrice.objects.create(box_type="Flat", price=Decimal('2.00'), length=36, width=24, height=4)
+
+        self.orders = [
+            Order.objects.create(
+                transaction_id=87000 + i,
+                customer=self.customer,
+                reference_number=f"BOX-{i}",
+                close_date=datetime(2024, 5, 10 + i, 12, tzinfo=dt_timezone.utc),
+                volume_cuft=volume_cuft,
+                packages=packages,
+            )
+            for i, (volume_cuft, packages) in enumerate([
+                (Decimal('0.5'), 1),
+                (Decimal('3'), 3),
+                (None, 1),
+                (Decimal('40'), 1),
+            ])
+        ]
+
+    def calculator(self, **kwargs):
+        return BillingCalculator(self.customer.id, date(2024, 5, 1), date(2024, 5, 31), **kwargs)
+
+    def test_charges_need_no_order_queries(self):
+        index = BoxIndex.load()
+
+        with self.assertNumQueries(0):
+            charges = get_box_charges(self.orders, index)
+
+        self.assertEqual(charges, {
+            87000: [(BOX_SERVICE_ID, 'Boxes', 150)],
+            87001: [(BOX_SERVICE_ID, 'Boxes', 600)],
+        })
+
+    def test_report_includes_box_lines(self):
+        report = self.calculator(include_box_cost=True).generate_report()
+
+        self.assertEqual(report.total_amount, Decimal('11.50'))
+        self.assertEqual(report.service_totals[str(BOX_SERVICE_ID)]['amount'], 7.5)
+        self.assertTrue(report.metadata['include_box_cost'])
+        self.assertEqual(
+            ServiceCost.objects.filter(order_cost__billing_report=report, service_id=BOX_SERVICE_ID).count(), 2
+        )
+
+    def test_box_cost_is_off_by_default(self):
+        report = self.calculator().generate_report()
+
+        self.assertEqual(report.total_amount, Decimal('4.00'))
+        self.assertFalse(report.metadata['include_box_cost'])
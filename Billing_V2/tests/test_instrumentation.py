@@ -0,0 +1,140 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from LedgerLink.metrics import Counter, Histogram
+from orders.models import Order
+from services.models import Service
+from ..utils.calculator import BillingCalculator
+from ..utils.instrumentation import EVENTS, REPORTS, STAGE_SECONDS
+
+
+class BillingInstrumentationTest(TestCase):
+    """Stage timings and counters are stored with the report and exported."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Metrics Co",
+            legal_business_name="Metrics Co LLC",
+            email="metrics@example.com"
+        )
+        handling = Service.objects.create(service_name="Handling", charge_type="single")
+        CustomerService.objects.create(customer=self.customer, service=handling, unit_price=Decimal('1.00'))
+        for i in range(3):
+            Order.objects.create(
+                transaction_id=89000 + i,
+                customer=self.customer,
+                reference_number=f"METRICS-{i}",
+                close_date=datetime(2024, 5, 10 + i, 12, tzinfo=dt_timezone.utc),
+            )
+
+    def calculator(self):
+        return BillingCalculator(self.customer.id, date(2024, 5, 1), date(2024, 5, 31))
+
+    def test_report_metadata(self):
+        completed = REPORTS.value(pipeline='v2', status='completed')
+        orders = EVENTS.value(event='orders')
+
+        report = self.calculator().generate_report()
+        report.refresh_from_db()
+
+        instrumentation = report.metadata['instrumentation']
+        self.assertEqual(
+            set(instrumentation['stages']),
+            {'validate', 'load_orders', 'load_services', 'load_rules', 'match_rules',
+             'load_charges', 'persist', 'cost', 'evaluate', 'rollups'}
+        )
+        self.assertEqual(instrumentation['stages']['load_orders']['queries'], 1)
+        self.assertGreater(instrumentation['counters']['queries'], 0)
+        self.assertEqual(instrumentation['counters']['orders'], 3)
+        self.assertEqual(instrumentation['counters']['service_lines'], 3)
+
+        self.assertEqual(REPORTS.value(pipeline='v2', status='completed'), completed + 1)
+        self.assertEqual(EVENTS.value(event='orders'), orders + 3)
+
+    def test_explain_trace(self):
+        calculator = BillingCalculator(self.customer.id, date(2024, 5, 1), date(2024, 5, 31), explain_order=89001)
+        with self.assertLogs('billing.explain', level='INFO') as logs:
+            calculator.generate_report()
+
+        self.assertEqual(len(logs.records), 1)
+        trace = logs.records[0].explain
+        self.assertEqual((trace['transaction_id'], trace['pipeline']), (89001, 'v2'))
+        self.assertEqual(
+            [step['step'] for step in trace['steps']], ['service_rules', 'service_cost', 'order_total']
+        )
+        self.assertEqual(trace['steps'][-1]['amount'], Decimal('1.00'))
+
+    def test_empty_and_failed_reports(self):
+        empty = REPORTS.value(pipeline='v2', status='empty')
+        report = BillingCalculator(self.customer.id, date(2023, 1, 1), date(2023, 1, 31)).generate_report()
+        report.refresh_from_db()
+        self.assertEqual(report.metadata['instrumentation']['counters']['orders'], 0)
+        self.assertEqual(REPORTS.value(pipeline='v2', status='empty'), empty + 1)
+
+        failed = REPORTS.value(pipeline='v2', status='error')
+        with self.assertRaises(Exception):
+            BillingCalculator(999999, date(2024, 5, 1), date(2024, 5, 31)).generate_report()
+        self.assertEqual(REPORTS.value(pipeline='v2', status='error'), failed + 1)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint(self):
+        self.calculator().generate_report()
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE billing_stage_duration_seconds histogram', body)
+        self.assertIn('billing_stage_duration_seconds_bucket{stage="cost",le="+Inf"}', body)
+        self.assertRegex(body, r'billing_reports_total\{pipeline="v2",status="completed"\} \d')
+        self.assertGreater(STAGE_SECONDS.count(stage='persist'), 0)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_metrics_private_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user('metrics-staff', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class MetricsFormatTest(SimpleTestCase):
+    def test_text_format(self):
+        requests = Counter('test_requests_total', 'Requests', ['path'])
+        requests.inc(path='/a"b')
+        requests.inc(2, path='/a"b')
+        latency = Histogram('test_latency_seconds', 'Latency', buckets=(0.1, 1))
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        self.assertEqual(requests.render(), [
+            '# HELP test_requests_total Requests',
+            '# TYPE test_requests_total counter',
+            'test_requests_total{path="/a\\"b"} 3.0',
+        ])
+        self.assertEqual(latency.render()[2:], [
+            'test_latency_seconds_bucket{le="0.1"} 1',
+            'test_latency_seconds_bucket{le="1.0"} 2',
+            'test_latency_seconds_bucket{le="+Inf"} 3',
+            'test_latency_seconds_sum 5.55',
+            'test_latency_seconds_count 3',
+        ])
+
+        with self.assertRaises(ValueError):
+            requests.inc(-1, path='/')
+        with self.assertRaises(ValueError):
+            requests.inc(method='GET')
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from orders.models import Order
+from services.models import Service
+from ..models import OrderCost
+from ..utils.calculator import BillingCalculator
+
+
+class MoneyTotalsTest(TestCase):
+    """Report totals are summed in cents and match the stored service costs."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Cents Co",
+            legal_business_name="Cents Co LLC",
+            email="cents@example.com"
+        )
+        single = Service.objects.create(service_name="Handling", charge_type="single")
+        per_item = Service.objects.create(service_name="Per Item", charge_type="quantity")
+        CustomerService.objects.create(customer=self.customer, service=single, unit_price=Decimal('0.10'))
+        CustomerService.objects.create(customer=self.customer, service=per_item, unit_price=Decimal('0.07'))
+
+        for i in range(3):
+            Order.objects.create(
+                transaction_id=81000 + i,
+                customer=self.customer,
+                reference_number=f"CENTS-{i}",
+                close_date=timezone.now() - timedelta(days=1),
+                total_item_qty=i + 1,
+            )
+
+    def test_totals_are_exact(self):
+        calculator = BillingCalculator(
+            self.customer.id,
+            (timezone.now() - timedelta(days=5)).date(),
+            timezone.now().date()
+        )
+        report = calculator.generate_report()
+
+        # 3 x 0.10 + (1 + 2 + 3) x 0.07
+        self.assertEqual(report.total_amount, Decimal('0.72'))
+        self.assertEqual(
+            sorted(totals['amount'] for totals in report.service_totals.values()),
+            [0.3, 0.42]
+        )
+
+    def test_order_totals_are_saved(self):
+        calculator = BillingCalculator(
+            self.customer.id,
+            (timezone.now() - timedelta(days=5)).date(),
+            timezone.now().date()
+        )
+        report = calculator.generate_report()
+
+        totals = dict(OrderCost.objects.filter(billing_report=report)
+                      .values_list('order__transaction_id', 'total_amount'))
+        self.assertEqual(totals, {
+            81000: Decimal('0.17'),
+            81001: Decimal('0.24'),
+            81002: Decimal('0.31'),
+        })
@@ -0,0 +1,116 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from customers.models import Customer
+from LedgerLink.profiling import assert_query_budget, fingerprint, profile_queries
+from orders.models import Order
+from ..models import BillingReport, OrderCost, ServiceCost
+
+
+class QueryProfilingTest(TestCase):
+    """Query counts, N+1 detection and query budgets for billing endpoints."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Profile Co",
+            legal_business_name="Profile Co LLC",
+            email="profile@example.com"
+        )
+        now = timezone.now()
+        self.report = BillingReport.objects.create(
+            customer=self.customer,
+            start_date=now - timedelta(days=30),
+            end_date=now,
+            total_amount=Decimal('10.00'),
+            service_totals={}
+        )
+        for i in range(6):
+            order = Order.objects.create(
+                transaction_id=88000 + i,
+                customer=self.customer,
+                reference_number=f"PROFILE-{i}",
+                close_date=now - timedelta(days=i),
+            )
+            order_cost = OrderCost.objects.create(order=order, billing_report=self.report, total_amount=1)
+            ServiceCost.objects.create(order_cost=order_cost, service_id=1, service_name="Pick", amount=1)
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT "a"."col1" FROM "a" WHERE "a"."id" IN (%s, %s,  %s) AND "a"."n" = 5'),
+            'SELECT "a"."col1" FROM "a" WHERE "a"."id" IN (...) AND "a"."n" = ?'
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t VALUES (%s, %s), (%s, %s) -- 'note'"),
+            'INSERT INTO t VALUES (...) -- ?'
+        )
+
+    def test_repeated_queries_are_reported(self):
+        with profile_queries() as profile:
+            for order_cost in OrderCost.objects.filter(billing_report=self.report):
+                order_cost.order.reference_number
+
+        self.assertEqual(profile.count, 7)
+        [(sql, count)] = profile.duplicates()
+        self.assertEqual(count, 6)
+        self.assertIn('orders_order', sql)
+
+    def test_query_budget(self):
+        with assert_query_budget(2, max_repeats=1):
+            list(OrderCost.objects.filter(billing_report=self.report).select_related('order'))
+
+        with self.assertRaisesMessage(AssertionError, '7 queries executed, budget is 3'):
+            with assert_query_budget(3):
+                for order_cost in OrderCost.objects.filter(billing_report=self.report):
+                    order_cost.order.reference_number
+
+        with self.assertRaisesMessage(AssertionError, 'A statement ran 6 times'):
+            with assert_query_budget(10, max_repeats=2):
+                for order_cost in OrderCost.objects.filter(billing_report=self.report):
+                    order_cost.order.reference_number
+
+    def test_endpoint_budgets(self):
+        # The report, then its order costs and service costs, whatever the number of orders
+        with assert_query_budget(3, max_repeats=1):
+            self.client.get(f'/api/v2/reports/{self.report.pk}/')
+        with assert_query_budget(3, max_repeats=1):
+            self.client.get(f'/api/v2/reports/{self.report.pk}/download/', {'format': 'json'})
+        with assert_query_budget(1):
+            self.client.get('/api/v2/reports/customer_summary/')
+
+    @override_settings(QUERY_PROFILING=True, QUERY_PROFILING_SAMPLE_RATE=1)
+    def test_middleware(self):
+        with self.assertLogs('LedgerLink.profiling', 'INFO') as logs:
+            response = self.client.get('/api/v2/reports/customer_summary/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="1 queries", app;dur=[\d.]+, total;dur=')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/api/v2/reports/customer_summary/')
+        self.assertEqual(record['queries'], 1)
+        self.assertEqual(record['duplicates'], [])
+
+    @override_settings(QUERY_PROFILING=True, QUERY_PROFILING_SAMPLE_RATE=1)
+    def test_middleware_counts_streamed_queries(self):
+        with self.assertLogs('LedgerLink.profiling', 'INFO') as logs:
+            # CSV is the default format
+            response = self.client.get(f'/api/v2/reports/{self.report.pk}/download/')
+            # Nothing is logged until the body has been sent
+            self.assertEqual(logs.records, [])
+            # The test client closes the response once the body is exhausted
+            body = b''.join(response.streaming_content)
+
+        self.assertIn(b'PROFILE-0', body)
+        self.assertEqual(connection.execute_wrappers, [])
+        self.assertRegex(response['Server-Timing'], r'desc="\d+ queries before streaming"')
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertTrue(record['streamed'])
+        before = int(response['Server-Timing'].split('desc="')[1].split()[0])
+        self.assertGreater(record['queries'], before)
+
+    def test_middleware_is_opt_in(self):
+        response = self.client.get('/api/v2/reports/customer_summary/')
+        self.assertNotIn('Server-Timing', response)
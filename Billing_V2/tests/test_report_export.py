@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order
+from ..models import BillingReport, OrderCost, ServiceCost
+from ..utils.calculator import BillingCalculator
+from ..utils.report_export import iter_report_csv
+
+
+class ReportExportTest(TestCase):
+    """CSV export and to_dict of stored reports read rows in bulk."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Export Co",
+            legal_business_name="Export Co LLC",
+            email="export@example.com"
+        )
+        now = timezone.now()
+        self.report = BillingReport.objects.create(
+            customer=self.customer,
+            start_date=now - timedelta(days=30),
+            end_date=now,
+            total_amount=Decimal('9.00'),
+            service_totals={
+                '1': {'service_name': 'Pick', 'amount': 5.0},
+                '2': {'service_name': 'Say "hi"', 'amount': 4.0},
+            }
+        )
+        close_dates = [datetime(2024, 3, 1, 12, tzinfo=dt_timezone.utc), None, datetime(2024, 3, 2, tzinfo=dt_timezone.utc)]
+        for i, close_date in enumerate(close_dates):
+            order = Order.objects.create(
+                transaction_id=83000 + i,
+                customer=self.customer,
+                reference_number=f'EXP-"{i}"' if i != 1 else '',
+                close_date=close_date,
+            )
+            order_cost = OrderCost.objects.create(order=order, billing_report=self.report, total_amount=Decimal('3.00'))
+            ServiceCost.objects.create(order_cost=order_cost, service_id=1, service_name='Pick', amount=Decimal('1.67'))
+            ServiceCost.objects.create(order_cost=order_cost, service_id=2, service_name='Say "hi"', amount=Decimal('1.33'))
+
+    def test_csv_is_streamed_from_one_query(self):
+        with self.assertNumQueries(1):
+            chunks = list(iter_report_csv(self.report, chunk_size=100))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), "\n".join([
+            'order_id,reference_number,date,service_id,service_name,amount',
+            '83000,"EXP-""0""",2024-03-01,1,"Pick",1.67',
+            '83000,"EXP-""0""",2024-03-01,2,"Say ""hi""",1.33',
+            '83001,"",,1,"Pick",1.67',
+            '83001,"",,2,"Say ""hi""",1.33',
+            '83002,"EXP-""2""",2024-03-02,1,"Pick",1.67',
+            '83002,"EXP-""2""",2024-03-02,2,"Say ""hi""",1.33',
+            '',
+            'SUMMARY',
+            'service_id,service_name,total_amount',
+            '1,"Pick",5.0',
+            '2,"Say ""hi""",4.0',
+            '',
+            'TOTAL,"",9.00',
+        ]))
+
+    def test_calculator_to_csv(self):
+        calculator = BillingCalculator(self.customer.id, self.report.start_date, self.report.end_date)
+        calculator.report = self.report
+        self.assertEqual(calculator.to_csv(), "".join(iter_report_csv(self.report)))
+
+    def test_to_dict(self):
+        report = BillingReport.objects.select_related('customer').get(pk=self.report.pk)
+        with self.assertNumQueries(2):
+            data = report.to_dict()
+
+        self.assertEqual([order['order_id'] for order in data['orders']], [83000, 83001, 83002])
+        self.assertEqual(data['orders'][0]['order_date'], '2024-03-01')
+        self.assertIsNone(data['orders'][1]['order_date'])
+        self.assertEqual(data['orders'][2]['service_costs'][1],
+                         {'service_id': 2, 'service_name': 'Say "hi"', 'amount': 1.33})
@@ -0,0 +1,72 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from customers.models import Customer
+from orders.models import Order
+from ..models import BillingReport, OrderCost, ServiceCost
+from ..renderers import ORJSONRenderer
+from ..serializers import BillingReportSerializer
+from ..utils.report_payload import build_report_payload
+
+
+class ReportPayloadTest(TestCase):
+    """The fast retrieve payload matches BillingReportSerializer."""
+
+    def setUp(self):
+        customer = Customer.objects.create(
+            company_name="Payload Co",
+            legal_business_name="Payload Co LLC",
+            email="payload@example.com"
+        )
+        now = timezone.now()
+        self.report = BillingReport.objects.create(
+            customer=customer,
+            start_date=now - timedelta(days=30),
+            end_date=now,
+            total_amount=Decimal('12.50'),
+            service_totals={'1': {'service_name': 'Pick', 'amount': 12.5}}
+        )
+        for i in range(3):
+            order = Order.objects.create(
+                transaction_id=82000 + i,
+                customer=customer,
+                reference_number=f"PAYLOAD-{i}",
+                close_date=now - timedelta(days=i) if i else None,
+            )
+            order_cost = OrderCost.objects.create(order=order, billing_report=self.report,
+                                                  total_amount=Decimal('4.00') + i)
+            for j in range(i):
+                ServiceCost.objects.create(order_cost=order_cost, service_id=j + 1,
+                                           service_name=f"Service {j}", amount=Decimal('2.5') * (j + 1))
+
+    def test_matches_serializer(self):
+        report = BillingReport.objects.select_related('customer').get(pk=self.report.pk)
+        expected = json.loads(json.dumps(BillingReportSerializer(report).data))
+
+        with self.assertNumQueries(2):
+            payload = build_report_payload(report)
+
+        self.assertEqual(payload, expected)
+
+    def test_orjson_renderer_matches_json_renderer(self):
+        report = BillingReport.objects.select_related('customer').get(pk=self.report.pk)
+        data = {
+            'success': True,
+            'data': build_report_payload(report),
+            'extra': [Decimal('1.10'), timezone.now(), None, {2: 'int key'}]
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_retrieve_endpoint(self):
+        response = self.client.get(f'/api/v2/reports/{self.report.pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body['success'])
+        self.assertEqual([o['order_id'] for o in body['data']['order_costs']], [82000, 82001, 82002])
@@ -0,0 +1,123 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from orders.models import Order
+from services.models import Service
+from ..models import MonthlyBillingRollup
+from ..utils.calculator import BillingCalculator
+from ..utils.rollups import month_end, query_monthly_rollups
+
+
+class MonthlyRollupTest(TestCase):
+    """The monthly rollup table follows generated reports."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Rollup Co",
+            legal_business_name="Rollup Co LLC",
+            email="rollup@example.com"
+        )
+        self.handling = Service.objects.create(service_name="Handling", charge_type="single")
+        self.per_item = Service.objects.create(service_name="Per Item", charge_type="quantity")
+        CustomerService.objects.create(customer=self.customer, service=self.handling, unit_price=Decimal('1.50'))
+        self.per_item_price = CustomerService.objects.create(
+            customer=self.customer, service=self.per_item, unit_price=Decimal('0.25')
+        )
+
+        for i, (month, day) in enumerate([(1, 10), (1, 31), (2, 14)]):
+            Order.objects.create(
+                transaction_id=85000 + i,
+                customer=self.customer,
+                reference_number=f"ROLL-{i}",
+                close_date=datetime(2024, month, day, 12, tzinfo=dt_timezone.utc),
+                total_item_qty=i + 1,
+            )
+
+    def generate(self):
+        calculator = BillingCalculator(self.customer.id, date(2024, 1, 1), date(2024, 2, 29))
+        return calculator.generate_report()
+
+    def rollup_rows(self):
+        return {
+            (row['month'], row['service_name']): (row['order_count'], row['quantity'], row['amount'])
+            for row in query_monthly_rollups(customer_id=self.customer.id)
+        }
+
+    def test_report_generation_updates_rollups(self):
+        self.generate()
+
+        self.assertEqual(self.rollup_rows(), {
+            ('2024-01-01', 'Handling'): (2, 3, Decimal('3.00')),
+            ('2024-01-01', 'Per Item'): (2, 3, Decimal('0.75')),
+            ('2024-02-01', 'Handling'): (1, 3, Decimal('1.50')),
+            ('2024-02-01', 'Per Item'): (1, 3, Decimal('0.75')),
+        })
+
+        # Billing the period again replaces the rows instead of adding to them
+        self.per_item_price.unit_price = Decimal('0.50')
+        self.per_item_price.save()
+        self.generate()
+
+        self.assertEqual(MonthlyBillingRollup.objects.count(), 6)
+        self.assertEqual(self.rollup_rows()[('2024-01-01', 'Per Item')], (2, 3, Decimal('1.50')))
+
+    def test_query_groupings(self):
+        self.generate()
+
+        with self.assertNumQueries(1):
+            by_month = query_monthly_rollups(group_by='month')
+        self.assertEqual(by_month, [
+            {'month': '2024-01-01', 'order_count': 2, 'quantity': 3, 'amount': Decimal('3.75')},
+            {'month': '2024-02-01', 'order_count': 1, 'quantity': 3, 'amount': Decimal('2.25')},
+        ])
+
+        by_service = query_monthly_rollups(group_by='service', start_month=date(2024, 2, 1))
+        self.assertEqual([(row['service_name'], row['amount']) for row in by_service],
+                         [('Handling', Decimal('1.50')), ('Per Item', Decimal('0.75'))])
+
+        by_customer = query_monthly_rollups(group_by='customer')
+        self.assertEqual(by_customer[0]['customer_name'], 'Rollup Co')
+        self.assertEqual(by_customer[0]['amount'], Decimal('6.00'))
+        self.assertEqual((by_customer[0]['order_count'], by_customer[0]['quantity']), (3, 6))
+
+        # A single service's orders are counted from its own rows
+        per_item = query_monthly_rollups(group_by='month', service_id=self.per_item.id)
+        self.assertEqual([(row['order_count'], row['amount']) for row in per_item],
+                         [(2, Decimal('0.75')), (1, Decimal('0.75'))])
+
+        with self.assertRaises(ValueError):
+            query_monthly_rollups(group_by='week')
+
+    def test_backfill_command(self):
+        self.generate()
+        MonthlyBillingRollup.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_billing_rollups', '--start-month', '2024-02', stdout=out)
+
+        self.assertIn('Rebuilt 3 monthly rollup rows for 1 customers', out.getvalue())
+        self.assertEqual({row['month'] for row in query_monthly_rollups()}, {'2024-02-01'})
+
+        call_command('backfill_billing_rollups', '--customer-id', str(self.customer.id), stdout=StringIO())
+        self.assertEqual(MonthlyBillingRollup.objects.count(), 6)
+
+    def test_endpoint(self):
+        self.generate()
+
+        response = self.client.get('/api/v2/reports/monthly_rollup/', {'group_by': 'month', 'end_month': '2024-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['month'] for row in response.json()['data']], ['2024-01-01'])
+
+        response = self.client.get('/api/v2/reports/monthly_rollup/', {'start_month': 'January'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_month_end(self):
+        self.assertEqual(month_end(date(2024, 2, 10)), date(2024, 2, 29))
+        self.assertEqual(month_end(date(2023, 12, 31)), date(2023, 12, 31))
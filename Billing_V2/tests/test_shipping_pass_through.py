@@ -0,0 +1,90 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from orders.models import Order
+from services.models import Service
+from shipping.models import CADShipping, USShipping
+from ..models import OrderCost, ServiceCost
+from ..utils.calculator import BillingCalculator
+from ..utils.shipping import CAD_SHIPPING_SERVICE_ID, US_SHIPPING_SERVICE_ID, get_shipping_charges
+
+
+class ShippingPassThroughTest(TestCase):
+    """Carrier shipping charges are billed as service lines."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Ship Co",
+            legal_business_name="Ship Co LLC",
+            email="ship@example.com"
+        )
+        handling = Service.objects.create(service_name="Handling", charge_type="single")
+        CustomerService.objects.create(customer=self.customer, service=handling, unit_price=Decimal('1.00'))
+
+        self.orders = [
+            Order.objects.create(
+                transaction_id=86000 + i,
+                customer=self.customer,
+                reference_number=f"SHIP-{i}",
+                close_date=datetime(2024, 5, 10 + i, 12, tzinfo=dt_timezone.utc),
+            )
+            for i in range(3)
+        ]
+        CADShipping.objects.create(
+            transaction=self.orders[0],
+            customer=self.customer,
+            pre_tax_shipping_charge=Decimal('10.00'),
+            fuel_surcharge=Decimal('1.25'),
+            tax1amount=Decimal('1.30'),
+        )
+        USShipping.objects.create(
+            transaction=self.orders[1],
+            customer=self.customer,
+            base_chg=Decimal('8.00'),
+            accessorial_charges=Decimal('2.50'),
+            rate=Decimal('99.00'),
+        )
+        # Charges outside the billing period are not picked up
+        outside = Order.objects.create(
+            transaction_id=86100,
+            customer=self.customer,
+            reference_number="SHIP-OUT",
+            close_date=datetime(2024, 7, 1, tzinfo=dt_timezone.utc),
+        )
+        USShipping.objects.create(transaction=outside, customer=self.customer, base_chg=Decimal('5.00'))
+
+    def calculator(self, **kwargs):
+        return BillingCalculator(self.customer.id, date(2024, 5, 1), date(2024, 5, 31), **kwargs)
+
+    def test_charges_loaded_in_one_query(self):
+        calculator = self.calculator()
+
+        with self.assertNumQueries(1):
+            charges = get_shipping_charges(self.customer.id, calculator.start_date, calculator.end_date)
+
+        self.assertEqual(charges, {
+            86000: [(CAD_SHIPPING_SERVICE_ID, 'CAD Shipping', 1255)],
+            86001: [(US_SHIPPING_SERVICE_ID, 'US Shipping', 1050)],
+        })
+
+    def test_report_includes_shipping_lines(self):
+        report = self.calculator(include_shipping=True).generate_report()
+
+        self.assertEqual(report.total_amount, Decimal('26.05'))
+        self.assertEqual(report.service_totals[str(CAD_SHIPPING_SERVICE_ID)]['amount'], 12.55)
+        self.assertEqual(report.service_totals[str(US_SHIPPING_SERVICE_ID)]['amount'], 10.5)
+        self.assertEqual(OrderCost.objects.get(order_id=86000).total_amount, Decimal('13.55'))
+        self.assertEqual(
+            ServiceCost.objects.filter(order_cost__billing_report=report, service_id__lt=0).count(), 2
+        )
+
+    def test_shipping_is_opt_in(self):
+        report = self.calculator().generate_report()
+
+        self.assertEqual(report.total_amount, Decimal('3.00'))
+        self.assertFalse(report.metadata['include_shipping'])
@@ -0,0 +1,152 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+from django.utils import timezone
+
+from ..models import OrderCost, ServiceCost
+
+logger = logging.getLogger(__name__)
+
+GROUPINGS = ('service', 'customer', 'period')
+
+PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+
+
+class BillingAnalytics:
+    """
+    SQL aggregates over stored Billing_V2 service costs for dashboards.
+
+    An order can appear in several reports when a period is billed more than
+    once; only its most recent OrderCost is counted, so totals reflect the
+    latest calculation of every order. Periods are based on the order close
+    date. Each aggregate is a single grouped query.
+    """
+
+    def __init__(self, customer_id=None, start_date=None, end_date=None, service_id=None):
+        """
+        Args:
+            customer_id: Only include orders of this customer
+            start_date: Only include orders closed on or after this date
+            end_date: Only include orders closed on or before this date
+            service_id: Only include costs of this service
+        """
+        self.customer_id = customer_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.service_id = service_id
+
+    def _order_filter(self, prefix=''):
+        """Filter on the order, with field names relative to prefix."""
+        conditions = Q()
+        if self.customer_id:
+            conditions &= Q(**{f'{prefix}order__customer_id': self.customer_id})
+        if self.start_date:
+            start = timezone.make_aware(datetime.combine(self.start_date, time.min))
+            conditions &= Q(**{f'{prefix}order__close_date__gte': start})
+        if self.end_date:
+            end = timezone.make_aware(datetime.combine(self.end_date + timedelta(days=1), time.min))
+            conditions &= Q(**{f'{prefix}order__close_date__lt': end})
+        return conditions
+
+    def service_costs(self):
+        """Service costs of the latest calculation of each matching order."""
+        latest_order_costs = (
+            OrderCost.objects
+            .filter(self._order_filter())
+            .values('order_id')
+            .annotate(latest_id=Max('id'))
+            .values('latest_id')
+        )
+        queryset = ServiceCost.objects.filter(
+            self._order_filter('order_cost__'),
+            order_cost_id__in=latest_order_costs
+        )
+        if self.service_id:
+            queryset = queryset.filter(service_id=self.service_id)
+        return queryset
+
+    def by_service(self):
+        """Totals per service, largest first."""
+        return list(
+            self.service_costs()
+            .values('service_id')
+            .annotate(
+                service_name=Max('service_name'),
+                total_amount=Sum('amount'),
+                order_count=Count('order_cost_id'),
+                customer_count=Count('order_cost__order__customer_id', distinct=True),
+            )
+            .order_by('-total_amount', 'service_id')
+        )
+
+    def by_customer(self):
+        """Totals per customer, largest first."""
+        return list(
+            self.service_costs()
+            .values(customer_id=F('order_cost__order__customer_id'))
+            .annotate(
+                customer_name=Max('order_cost__order__customer__company_name'),
+                total_amount=Sum('amount'),
+                order_count=Count('order_cost_id', distinct=True),
+                report_count=Count('order_cost__billing_report_id', distinct=True),
+            )
+            .order_by('-total_amount', 'customer_id')
+        )
+
+    def by_period(self, period='month'):
+        """
+        Totals per period, in chronological order.
+
+        Args:
+            period: One of day, week, month, quarter or year
+
+        Returns:
+            List of dictionaries with the period start date and its totals
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Invalid period: {period}. Choose from {', '.join(PERIODS)}")
+
+        rows = (
+            self.service_costs()
+            .values(period=PERIODS[period]('order_cost__order__close_date'))
+            .annotate(
+                total_amount=Sum('amount'),
+                order_count=Count('order_cost_id', distinct=True),
+                customer_count=Count('order_cost__order__customer_id', distinct=True),
+            )
+            .order_by('period')
+        )
+        return [
+            {**row, 'period': row['period'].date().isoformat() if row['period'] else None}
+            for row in rows
+        ]
+
+    def aggregate(self, group_by, period='month'):
+        """
+        Run the aggregate for one grouping.
+
+        Args:
+            group_by: One of service, customer or period
+            period: Period length when grouping by period
+
+        Returns:
+            List of aggregate rows
+
+        Raises:
+            ValueError: If the grouping or period is not supported
+        """
+        if group_by == 'service':
+            return self.by_service()
+        if group_by == 'customer':
+            return self.by_customer()
+        if group_by == 'period':
+            return self.by_period(period)
+        raise ValueError(f"Invalid group_by: {group_by}. Choose from {', '.join(GROUPINGS)}")
@@ -0,0 +1,423 @@
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import django
+from django.db import connection, transaction
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from orders.models import Order
+from products.models import Product
+from rules.models import Rule, RuleGroup
+from services.models import Service
+
+logger = logging.getLogger(__name__)
+
+# Services the calculators recognise by name, plus generic ones
+SERVICE_DEFINITIONS = [
+    ('Order Fee', 'single'),
+    ('Pick Cost', 'quantity'),
+    ('Case Pick', 'quantity'),
+    ('SKU Cost', 'quantity'),
+    ('Packaging', 'quantity'),
+]
+
+COUNTRIES = ['US', 'US', 'US', 'CA', 'MX', 'GB']
+CARRIERS = ['UPS', 'FedEx', 'USPS', 'DHL', 'Canada Post']
+
+# Rule groups attached to each customer service, cycled per service
+RULE_TEMPLATES = [
+    ('AND', [('weight_lb', 'gt', '5')]),
+    ('OR', [('ship_to_country', 'in', 'CA;MX'), ('packages', 'ge', '3')]),
+    ('AND', [('sku_quantity', 'contains', 'BENCH-SKU-0001;BENCH-SKU-0002')]),
+    ('NOT', [('carrier', 'eq', 'USPS')]),
+    ('XOR', [('total_item_qty', 'gt', '10'), ('line_items', 'gt', '3')]),
+]
+
+
+class SyntheticDataGenerator:
+    """
+    Generate a deterministic billing workload.
+
+    The same seed and scale always produce the same customers, products,
+    services, rules and orders, so timings are comparable across commits.
+    Orders are spread over a fixed 30-day period that does not depend on
+    the current date.
+    """
+
+    PERIOD_START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+    PERIOD_DAYS = 30
+    # Keep synthetic transaction IDs clear of real ones
+    TRANSACTION_ID_BASE = 900_000_000
+    BATCH_SIZE = 5000
+
+    def __init__(self, orders=1000, customers=1, products_per_customer=50, seed=42):
+        """
+        Args:
+            orders: Total number of orders to generate
+            customers: Number of customers the orders are spread over
+            products_per_customer: Number of products per customer
+            seed: Random seed
+        """
+        self.order_count = orders
+        self.customer_count = customers
+        self.products_per_customer = products_per_customer
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.customers = []
+
+    @property
+    def period(self):
+        """(start, end) of the generated billing period."""
+        return self.PERIOD_START, self.PERIOD_START + timedelta(days=self.PERIOD_DAYS)
+
+    def generate(self):
+        """
+        Create all objects.
+
+        Returns:
+            List of generated customers
+        """
+        services = [
+            Service.objects.get_or_create(service_name=name, defaults={'charge_type': charge_type})[0]
+            for name, charge_type in SERVICE_DEFINITIONS
+        ]
+
+        for index in range(self.customer_count):
+            customer = Customer.objects.create(
+                company_name=f"Benchmark Customer {index + 1}",
+                legal_business_name=f"Benchmark Customer {index + 1} LLC",
+                email=f"benchmark-{self.seed}-{index + 1}@example.com",
+            )
+            self.customers.append(customer)
+            self._create_products(customer)
+            self._create_services(customer, services)
+
+        self._create_orders()
+        logger.info(
+            f"Generated {self.order_count} orders for {self.customer_count} customers (seed {self.seed})"
+        )
+        return self.customers
+
+    def _create_products(self, customer):
+        Product.objects.bulk_create([
+            Product(
+                sku=f"BENCH-SKU-{i + 1:04d}",
+                customer=customer,
+                labeling_unit_1='case',
+                labeling_quantity_1=self.random.choice([6, 12, 24]),
+            )
+            for i in range(self.products_per_customer)
+        ])
+
+    def _create_services(self, customer, services):
+        for index, service in enumerate(services):
+            customer_service = CustomerService.objects.create(
+                customer=customer,
+                service=service,
+                unit_price=Decimal(self.random.randint(25, 500)) / 100,
+            )
+            logic_operator, rules = RULE_TEMPLATES[index % len(RULE_TEMPLATES)]
+            rule_group = RuleGroup.objects.create(
+                customer_service=customer_service,
+                logic_operator=logic_operator,
+            )
+            Rule.objects.bulk_create([
+                Rule(rule_group=rule_group, field=field, operator=operator, value=value)
+                for field, operator, value in rules
+            ])
+
+    def _random_sku_quantity(self):
+        skus = self.random.sample(
+            range(1, self.products_per_customer + 1),
+            self.random.randint(1, min(5, self.products_per_customer))
+        )
+        if self.random.random() < 0.5:
+            return {f"BENCH-SKU-{sku:04d}": self.random.randint(1, 30) for sku in skus}
+        return [{'sku': f"bench-sku-{sku:04d}", 'quantity': self.random.randint(1, 30)} for sku in skus]
+
+    def _create_orders(self):
+        period_seconds = self.PERIOD_DAYS * 24 * 3600
+        batch = []
+        for index in range(self.order_count):
+            customer = self.customers[index % len(self.customers)]
+            sku_quantity = self._random_sku_quantity()
+            quantities = sku_quantity.values() if isinstance(sku_quantity, dict) else [
+                item['quantity'] for item in sku_quantity
+            ]
+            batch.append(Order(
+                transaction_id=self.TRANSACTION_ID_BASE + index,
+                customer=customer,
+                close_date=self.PERIOD_START + timedelta(seconds=self.random.randrange(period_seconds)),
+                reference_number=f"BENCH-{index:08d}",
+                ship_to_country=self.random.choice(COUNTRIES),
+                carrier=self.random.choice(CARRIERS),
+                weight_lb=Decimal(self.random.randint(10, 5000)) / 100,
+                volume_cuft=Decimal(self.random.randint(10, 1000)) / 100,
+                packages=self.random.randint(1, 5),
+                line_items=len(quantities),
+                total_item_qty=sum(quantities),
+                sku_quantity=sku_quantity,
+                status='shipped',
+            ))
+            if len(batch) >= self.BATCH_SIZE:
+                Order.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Order.objects.bulk_create(batch)
+
+
+class QueryCounter:
+    """Database execute wrapper that counts queries without keeping them."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class BillingBenchmark:
+    """
+    Benchmark the billing pipeline against a synthetic workload.
+
+    Data is generated inside a transaction that is rolled back afterwards
+    unless keep_data is set, so benchmarks can run against any database.
+    """
+
+    def __init__(self, orders=1000, customers=1, seed=42, repeat=3, keep_data=False, only=None):
+        """
+        Args:
+            orders: Number of synthetic orders
+            customers: Number of synthetic customers
+            seed: Random seed for the generator
+            repeat: Number of timed runs per benchmark
+            keep_data: Commit the generated data instead of rolling it back
+            only: Optional list of benchmark names to run
+        """
+        self.generator = SyntheticDataGenerator(orders=orders, customers=customers, seed=seed)
+        self.repeat = repeat
+        self.keep_data = keep_data
+        self.only = set(only) if only else None
+        self.results = []
+
+    def benchmarks(self):
+        """Benchmark name to callable, in execution order."""
+        return {
+            'legacy_calculator': self.bench_legacy_calculator,
+            'legacy_export_json': self.bench_legacy_export_json,
+            'legacy_export_csv': self.bench_legacy_export_csv,
+            'v2_calculator': self.bench_v2_calculator,
+            'v2_export_dict': self.bench_v2_export_dict,
+            'v2_export_csv': self.bench_v2_export_csv,
+            'rule_evaluation_python': self.bench_rule_evaluation_python,
+            'rule_evaluation_sql': self.bench_rule_evaluation_sql,
+        }
+
+    def run(self):
+        """
+        Generate data and run all selected benchmarks.
+
+        Returns:
+            Dictionary with run metadata and per-benchmark results
+        """
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.generator.generate()
+            generation_seconds = time.perf_counter() - started
+
+            for name, bench in self.benchmarks().items():
+                if self.only is None or name in self.only:
+                    self.results.append(self._measure(name, bench))
+
+            if not self.keep_data:
+                transaction.set_rollback(True)
+
+        return {
+            'meta': self.metadata(generation_seconds),
+            'results': self.results,
+        }
+
+    def metadata(self, generation_seconds):
+        return {
+            'timestamp': datetime.now(dt_timezone.utc).isoformat(),
+            'commit': self._git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'orders': self.generator.order_count,
+            'customers': self.generator.customer_count,
+            'seed': self.generator.seed,
+            'repeat': self.repeat,
+            'generation_seconds': round(generation_seconds, 4),
+        }
+
+    def _measure(self, name, bench):
+        timings = []
+        queries = None
+        details = None
+        error = None
+        for _ in range(self.repeat):
+            try:
+                # Each run gets a savepoint so rows written by one run don't leak into the next
+                counter = QueryCounter()
+                with transaction.atomic(), connection.execute_wrapper(counter):
+                    started = time.perf_counter()
+                    # Benchmarks may return details worth reporting next to the timings
+                    details = bench()
+                    timings.append(time.perf_counter() - started)
+                    queries = counter.count
+                    transaction.set_rollback(True)
+            except Exception as e:
+                logger.error(f"Benchmark {name} failed: {str(e)}")
+                error = str(e)
+                break
+
+        result = {'name': name, 'runs': [round(t, 6) for t in timings], 'queries': queries}
+        if details:
+            result.update(details)
+        if timings:
+            median = statistics.median(timings)
+            result.update({
+                'min': round(min(timings), 6),
+                'median': round(median, 6),
+                'mean': round(statistics.mean(timings), 6),
+                'orders_per_second': round(self.generator.order_count / median, 1) if median else None,
+            })
+        if error:
+            result['error'] = error
+        return result
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, timeout=5
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _legacy_calculators(self):
+        from billing.billing_calculator import BillingCalculator as LegacyBillingCalculator
+        start, end = self.generator.period
+        calculators = []
+        for customer in self.generator.customers:
+            calculator = LegacyBillingCalculator(customer.id, start, end)
+            calculator.generate_report()
+            calculators.append(calculator)
+        return calculators
+
+    def _v2_calculators(self):
+        from .calculator import BillingCalculator
+        start, end = self.generator.period
+        calculators = []
+        for customer in self.generator.customers:
+            calculator = BillingCalculator(customer.id, start, end)
+            calculator.generate_report()
+            calculators.append(calculator)
+        return calculators
+
+    def bench_legacy_calculator(self):
+        self._legacy_calculators()
+
+    def bench_legacy_export_json(self):
+        for calculator in self._legacy_calculators():
+            calculator.to_json()
+
+    def bench_legacy_export_csv(self):
+        for calculator in self._legacy_calculators():
+            calculator.to_csv()
+
+    def bench_v2_calculator(self):
+        self._v2_calculators()
+
+    def bench_v2_export_dict(self):
+        for calculator in self._v2_calculators():
+            calculator.to_dict()
+
+    def bench_v2_export_csv(self):
+        for calculator in self._v2_calculators():
+            calculator.to_csv()
+
+    def _period_orders(self):
+        start, end = self.generator.period
+        return Order.objects.filter(
+            customer__in=self.generator.customers,
+            close_date__range=(start, end),
+        )
+
+    def _rule_groups(self):
+        return list(RuleGroup.objects.filter(
+            customer_service__customer__in=self.generator.customers
+        ).prefetch_related('rules'))
+
+    def bench_rule_evaluation_python(self):
+        rule_groups = self._rule_groups()
+        for order in self._period_orders().iterator(chunk_size=2000):
+            for rule_group in rule_groups:
+                rule_group.evaluate(order)
+
+    def bench_rule_evaluation_sql(self):
+        """Same work as the Python benchmark, with groups that don't compile evaluated in Python."""
+        from rules.compiler import RuleQueryCompiler, UncompilableRule
+        compiler = RuleQueryCompiler()
+        orders = self._period_orders()
+        rule_groups = self._rule_groups()
+        uncompilable = []
+        for rule_group in rule_groups:
+            try:
+                condition = compiler.compile_group(rule_group)
+            except UncompilableRule:
+                # The calculator falls back to Python for these, so the benchmark does too
+                uncompilable.append(rule_group)
+                continue
+            set(orders.filter(condition).values_list('transaction_id', flat=True))
+
+        if uncompilable:
+            for order in orders.iterator(chunk_size=2000):
+                for rule_group in uncompilable:
+                    rule_group.evaluate(order)
+        return {'rule_groups': len(rule_groups), 'python_fallback_rule_groups': len(uncompilable)}
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare two benchmark result documents.
+
+    Args:
+        baseline: Result dictionary from an earlier run
+        current: Result dictionary from this run
+        threshold: Relative slowdown of the median that counts as a regression
+
+    Returns:
+        List of dictionaries describing each benchmark present in both runs
+    """
+    baseline_by_name = {r['name']: r for r in baseline.get('results', [])}
+    comparison = []
+    for result in current.get('results', []):
+        previous = baseline_by_name.get(result['name'])
+        if not previous or 'median' not in previous or 'median' not in result:
+            continue
+        change = (result['median'] - previous['median']) / previous['median'] if previous['median'] else 0
+        comparison.append({
+            'name': result['name'],
+            'baseline_median': previous['median'],
+            'median': result['median'],
+            'change': round(change, 4),
+            'regression': change > threshold,
+        })
+    return comparison
+
+
+def dump_results(results, path):
+    """Write benchmark results to a JSON file."""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,117 @@
+import logging
+
+from django.core.cache import cache
+
+from customer_services.models import CustomerService
+from LedgerLink.cache import cache_key, get_or_load
+from products.models import Product
+from .sku_utils import normalize_sku
+
+logger = logging.getLogger(__name__)
+
+# Per-customer indexes used by the calculator. They live in the shared cache
+# so every worker reuses them, and are invalidated by Billing_V2/signals.py.
+EXCLUDED_SKUS_NAMESPACE = 'billing_v2:excluded_skus'
+PRODUCT_SKUS_NAMESPACE = 'billing_v2:product_skus'
+INDEX_TIMEOUT = 60 * 60 * 24
+
+PROGRESS_NAMESPACE = 'billing_v2:progress'
+PROGRESS_TIMEOUT = 60 * 60
+
+
+def progress_cache_key(customer_id, start_date, end_date):
+    """
+    Cache key for the progress of a report generation.
+
+    Args:
+        customer_id: ID of the customer
+        start_date: Start of the period, as a date/datetime or 'YYYY-MM-DD'
+        end_date: End of the period, as a date/datetime or 'YYYY-MM-DD'
+
+    Returns:
+        Cache key shared by the generating worker and the progress endpoint
+    """
+    def day(value):
+        return value if isinstance(value, str) else value.strftime('%Y-%m-%d')
+    return cache_key(PROGRESS_NAMESPACE, customer_id, day(start_date), day(end_date))
+
+
+def set_progress(key, progress):
+    """Store report generation progress."""
+    cache.set(key, progress, PROGRESS_TIMEOUT)
+
+
+def get_progress(key):
+    """Read report generation progress, or None if unknown."""
+    return cache.get(key)
+
+
+def load_excluded_skus(customer_id):
+    """Normalized SKUs that quantity services of the customer exclude."""
+    excluded_skus = set()
+    quantity_services = CustomerService.objects.filter(
+        customer_id=customer_id,
+        service__charge_type='quantity'
+    ).select_related('service')
+
+    for cs in quantity_services:
+        skus_list = cs.get_sku_list()
+        if skus_list:
+            excluded_skus.update(normalize_sku(sku) for sku in skus_list)
+
+    return frozenset(excluded_skus)
+
+
+def load_product_skus(customer_id):
+    """Normalized SKUs of the customer's products."""
+    return frozenset(
+        normalize_sku(sku)
+        for sku in Product.objects.filter(customer_id=customer_id).values_list('sku', flat=True)
+    )
+
+
+def get_excluded_skus(customer_id):
+    """
+    Excluded SKUs of a customer, from the shared cache.
+
+    Args:
+        customer_id: ID of the customer
+
+    Returns:
+        Frozenset of normalized SKUs
+    """
+    return get_or_load(EXCLUDED_SKUS_NAMESPACE, [customer_id],
+                       lambda: load_excluded_skus(customer_id), INDEX_TIMEOUT)
+
+
+def get_product_skus(customer_id):
+    """
+    Product SKUs of a customer, from the shared cache.
+
+    Args:
+        customer_id: ID of the customer
+
+    Returns:
+        Frozenset of normalized SKUs
+    """
+    return get_or_load(PRODUCT_SKUS_NAMESPACE, [customer_id],
+                       lambda: load_product_skus(customer_id), INDEX_TIMEOUT)
+
+
+def warm_customer_indexes(customer_id):
+    """
+    Load a customer's indexes into the shared cache ahead of a billing run.
+
+    Args:
+        customer_id: ID of the customer
+
+    Returns:
+        Dictionary with the number of entries loaded per index
+    """
+    excluded_skus = get_excluded_skus(customer_id)
+    product_skus = get_product_skus(customer_id)
+
+    return {
+        'excluded_skus': len(excluded_skus),
+        'products': len(product_skus),
+    }
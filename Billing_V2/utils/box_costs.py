@@ -0,0 +1,43 @@
+import logging
+
+from billing.money import to_cents
+from materials.box_selection import BoxIndex
+
+logger = logging.getLogger(__name__)
+
+# Packaging materials are billed like shipping pass-through charges, under a
+# reserved negative service ID (see shipping.py)
+BOX_SERVICE_ID = -3
+BOX_SERVICE_NAME = 'Boxes'
+
+
+def get_box_charges(orders, index=None):
+    """
+    Materials charges for the cheapest boxes that hold each order.
+
+    The box index is built once, so each order costs a binary search and no
+    queries; orders without a volume or too large for every box get no line.
+
+    Args:
+        orders: Iterable of Order with volume_cuft and packages loaded
+        index: BoxIndex to use; loaded from BoxPrice when omitted
+
+    Returns:
+        Dictionary of transaction ID to a list of (service_id, service_name, cents)
+    """
+    if index is None:
+        index = BoxIndex.load()
+
+    charges = {}
+    if not len(index):
+        return charges
+
+    for order in orders:
+        recommendation = index.recommend_for_order(order)
+        if recommendation is not None:
+            cents = to_cents(recommendation.cost)
+            if cents > 0:
+                charges[order.transaction_id] = [(BOX_SERVICE_ID, BOX_SERVICE_NAME, cents)]
+
+    logger.info(f"Loaded box charges for {len(charges)} orders")
+    return charges
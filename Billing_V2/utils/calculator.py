@@ -1,31 +1,45 @@
 import logging
 import json
+import time
 from datetime import datetime
-from decimal import Decimal
+from itertools import chain
 from django.db import transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from LedgerLink.db_router import replica_reads
 from customers.models import Customer
 from orders.models import Order
-from products.models import Product
 from customer_services.models import CustomerService
 from rules.models import RuleGroup
+from rules.compiler import RuleQueryCompiler, UncompilableRule
 from .sku_utils import normalize_sku, convert_sku_format
 from .rule_evaluator import RuleEvaluator
+from .report_export import iter_report_csv
+from .rollups import refresh_rollups_for_report
+from .billing_cache import get_excluded_skus, get_product_skus, progress_cache_key, set_progress
+from .shipping import get_shipping_charges
+from .box_costs import get_box_charges
+from .instrumentation import BillingInstrumentation
 from decimal import getcontext
 # Set precision for decimal calculations
 getcontext().prec = 28
+from billing.explain import ExplainTrace, choose_explain_order
+from billing.money import to_cents, to_decimal, to_float
 from ..models import BillingReport, OrderCost, ServiceCost
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between progress updates published while processing
+PROGRESS_INTERVAL = 0.5
+
 
 class BillingCalculator:
     """
     Class for calculating billing reports.
     """
     
-    def __init__(self, customer_id, start_date, end_date, customer_service_ids=None):
+    def __init__(self, customer_id, start_date, end_date, customer_service_ids=None, include_shipping=False,
+                 include_box_cost=False, explain_order=None):
         """
         Initialize the calculator with customer and date range.
         
@@ -35,9 +49,24 @@ class BillingCalculator:
             end_date: End date for billing period
             customer_service_ids: Optional list of customer service IDs to include
                                  (if None or empty, all services are included)
+            include_shipping: Whether to pass carrier shipping charges through
+                              as service lines
+            include_box_cost: Whether to bill the cheapest fitting box for each
+                              order as a materials line
+            explain_order: Transaction ID of an order to write an explain trace
+                           for (see billing.explain); defaults to the
+                           BILLING_EXPLAIN_ORDER setting or sampling
         """
         self.customer_id = customer_id
+        self.explain_order = explain_order
         self.customer_service_ids = customer_service_ids
+        self.include_shipping = include_shipping
+        self.include_box_cost = include_box_cost
+        # Excluded/product SKU indexes per customer, read once per run
+        self._customer_indexes = {}
+        # Stage timings and counters, stored in the report metadata
+        self.instrumentation = BillingInstrumentation()
+        self._progress_published_at = None
         self.progress = {
             'status': 'initializing',
             'percent_complete': 0,
@@ -76,7 +105,9 @@ class BillingCalculator:
         
         # Store metadata about customer service selection in report metadata
         self.report.metadata = {
-            'selected_services': customer_service_ids
+            'selected_services': customer_service_ids,
+            'include_shipping': include_shipping,
+            'include_box_cost': include_box_cost
         }
         
     def update_progress(self, status, current_step, percent_complete=None):
@@ -107,15 +138,23 @@ class BillingCalculator:
         # Add current timestamp to progress
         self.progress['updated_at'] = timezone.now().isoformat()
         
+        # Batches can finish many times a second; publish progress at most
+        # every PROGRESS_INTERVAL seconds unless the status changes
+        now = time.monotonic()
+        if (status == 'processing' and self._progress_published_at is not None
+                and now - self._progress_published_at < PROGRESS_INTERVAL):
+            return
+        self._progress_published_at = now
+        self.instrumentation.count('progress_writes')
+        
         # Log progress updates 
         logger.info(f"Progress: {self.progress['percent_complete']}% - {self.progress['current_step']}")
         
         # Update progress in cache if we have customer_id and dates
         if hasattr(self, 'customer_id') and hasattr(self, 'start_date') and hasattr(self, 'end_date'):
             try:
-                from django.core.cache import cache
-                progress_key = f"billing_report_progress_{self.customer_id}_{self.start_date.strftime('%Y-%m-%d')}_{self.end_date.strftime('%Y-%m-%d')}"
-                cache.set(progress_key, self.progress, 3600)  # Cache for 1 hour
+                progress_key = progress_cache_key(self.customer_id, self.start_date, self.end_date)
+                set_progress(progress_key, self.progress)
             except Exception as e:
                 logger.error(f"Error updating progress in cache: {str(e)}")
     
@@ -145,14 +184,22 @@ class BillingCalculator:
             raise
     
     @transaction.atomic
+    @replica_reads()
     def generate_report(self):
         """
         Generate billing report for customer and date range.
         
+        Orders, services and rules are read from the read replica when one
+        is configured; the report tables it writes are read back from the
+        primary.
+        
         Returns:
             BillingReport object
         """
         try:
+            self.instrumentation.start()
+            self.instrumentation.enter('validate')
+            
             # Update progress
             self.update_progress('initializing', 'Validating input', 5)
             
@@ -160,7 +207,6 @@ class BillingCalculator:
             self.validate_input()
             
             # Start timing
-            import time
             start_time = time.time()
             
             # Save the report
@@ -172,6 +218,7 @@ class BillingCalculator:
             logger.info(f"Generating billing report for customer {self.customer_id} from {self.start_date} to {self.end_date}")
             
             # Get all orders for customer in date range
+            self.instrumentation.enter('load_orders')
             # Use select_related to fetch customer data in a single query
             orders = Order.objects.filter(
                 customer_id=self.customer_id,
@@ -182,6 +229,7 @@ class BillingCalculator:
             # Convert queryset to list to avoid repeated database hits
             orders_list = list(orders)
             order_count = len(orders_list)
+            self.instrumentation.count('orders', order_count)
             logger.info(f"Found {order_count} orders for billing period")
             
             # Update progress tracking
@@ -190,9 +238,15 @@ class BillingCalculator:
             if not orders_list:
                 logger.info(f"No orders found for customer {self.customer_id} in date range")
                 self.update_progress('completed', 'No orders found', 100)
+                self.finish_instrumentation('empty')
                 return self.report
+
+            explained_order = choose_explain_order(
+                [order.transaction_id for order in orders_list], self.explain_order
+            )
             
             # Update progress
+            self.instrumentation.enter('load_services')
             self.update_progress('processing', 'Loading customer services', 15)
             
             # Get filtered customer services if specified
@@ -208,21 +262,24 @@ class BillingCalculator:
                 
             # Get all customer services with related data
             customer_services = list(customer_services_query.select_related('service'))
+            self.instrumentation.count('services', len(customer_services))
             
             # Check if we have any services to process
             if not customer_services:
                 logger.warning(f"No valid customer services found for report")
                 self.update_progress('completed', 'No valid customer services found', 100)
+                self.finish_instrumentation('empty')
                 return self.report
                 
             # Update progress
+            self.instrumentation.enter('load_rules')
             self.update_progress('processing', 'Loading business rules', 20)
             
             # Get rule groups for each customer service in a single query
             from django.db.models import Prefetch
             rule_groups = RuleGroup.objects.filter(
                 customer_service__in=[cs.id for cs in customer_services]
-            ).select_related('customer_service')
+            ).select_related('customer_service').prefetch_related('rules')
             
             # Group rule groups by customer service
             rule_groups_by_service = {}
@@ -232,14 +289,46 @@ class BillingCalculator:
                     rule_groups_by_service[cs_id] = []
                 rule_groups_by_service[cs_id].append(rule_group)
             
+            # Let the database select matching orders for rule groups with an SQL equivalent
+            self.instrumentation.enter('match_rules')
+            matching_orders_by_service = self.get_matching_orders_by_service(
+                orders, rule_groups_by_service
+            )
+            
+            # Shipping pass-through charges for every order of the period, in one query
+            self.instrumentation.enter('load_charges')
+            shipping_charges = {}
+            if self.include_shipping:
+                shipping_charges = get_shipping_charges(self.customer_id, self.start_date, self.end_date)
+            
+            # Box materials charges from the order volumes already loaded
+            box_charges = {}
+            if self.include_box_cost:
+                box_charges = get_box_charges(orders_list)
+            
             # Prepare for bulk operations
             order_costs_to_create = []
             service_costs_to_create = []
             order_costs_to_delete = []
+            order_costs_to_update = []
             
             # Cache for rule evaluations to avoid redundant computations
             rule_evaluation_cache = {}
             
+            # Running totals in integer cents, converted to Decimal when saved
+            service_totals_cents = {}
+            service_names = {}
+            report_cents = 0
+            
+            # Python rule evaluation happens inside costing; timed separately
+            queries = self.instrumentation.queries
+            evaluate_seconds = 0.0
+            evaluate_queries = 0
+            rule_evaluations = 0
+            rule_cache_hits = 0
+            sql_rule_matches = 0
+            service_lines = 0
+            
             # Process orders in batches to optimize memory usage
             batch_size = 100
             total_batches = (order_count + batch_size - 1) // batch_size
@@ -260,6 +349,7 @@ class BillingCalculator:
                 logger.info(f"Processing batch {batch_index + 1}/{total_batches} ({len(batch_orders)} orders)")
                 
                 # Create order costs for this batch
+                self.instrumentation.enter('persist')
                 batch_order_costs = []
                 for order in batch_orders:
                     order_cost = OrderCost(
@@ -272,12 +362,18 @@ class BillingCalculator:
                 created_order_costs = OrderCost.objects.bulk_create(batch_order_costs)
                 
                 # Process each order with its order cost
+                self.instrumentation.enter('cost')
                 for i, order in enumerate(batch_orders):
                     order_cost = created_order_costs[i]
+                    trace = (
+                        ExplainTrace(order.transaction_id, 'v2')
+                        if order.transaction_id == explained_order else None
+                    )
                     
                     # Track applied single services
                     applied_single_services = set()
                     batch_service_costs = []
+                    order_cents = 0
                     
                     # Process each customer service
                     for cs in customer_services:
@@ -296,57 +392,98 @@ class BillingCalculator:
                             # Check cache first to avoid redundant evaluations
                             # Use transaction_id which is guaranteed to exist instead of id
                             cache_key = (order.transaction_id, cs.id)
-                            if cache_key in rule_evaluation_cache:
+                            if cs.id in matching_orders_by_service:
+                                service_applies = order.transaction_id in matching_orders_by_service[cs.id]
+                                sql_rule_matches += 1
+                            elif cache_key in rule_evaluation_cache:
                                 service_applies = rule_evaluation_cache[cache_key]
+                                rule_cache_hits += 1
                             else:
+                                evaluate_start = time.perf_counter()
+                                queries_before = queries.count
                                 for rule_group in rule_groups:
                                     if rule_group.evaluate(order):
                                         service_applies = True
                                         break
+                                evaluate_seconds += time.perf_counter() - evaluate_start
+                                evaluate_queries += queries.count - queries_before
+                                rule_evaluations += 1
                                 # Cache result
                                 rule_evaluation_cache[cache_key] = service_applies
+
+                        if trace is not None:
+                            trace.add(
+                                'service_rules', service_id=cs.service.id,
+                                service_name=cs.service.service_name,
+                                rule_groups=len(rule_groups), applies=service_applies,
+                                matched_in_database=cs.id in matching_orders_by_service
+                            )
                                 
                         # If service applies, calculate and add cost
                         if service_applies:
-                            amount = self.calculate_service_cost(cs, order)
+                            cents = self.calculate_service_cost_cents(cs, order)
                             
                             # Only create cost if amount > 0
-                            if amount > 0:
+                            if cents > 0:
                                 service_cost = ServiceCost(
                                     order_cost=order_cost,
                                     service_id=cs.service.id,
                                     service_name=cs.service.service_name,
-                                    amount=amount
+                                    amount=to_decimal(cents)
                                 )
                                 batch_service_costs.append(service_cost)
+                                order_cents += cents
                                 
                                 # Update report totals
                                 service_id = str(cs.service.id)
-                                if service_id in self.report.service_totals:
-                                    self.report.service_totals[service_id]['amount'] += float(amount)
+                                if service_id in service_totals_cents:
+                                    service_totals_cents[service_id] += cents
                                 else:
-                                    self.report.service_totals[service_id] = {
-                                        'service_name': cs.service.service_name,
-                                        'amount': float(amount)
-                                    }
-                                
-                                # Don't update total_amount here - will be handled by update_total_amount
+                                    service_totals_cents[service_id] = cents
+                                    service_names[service_id] = cs.service.service_name
                                     
                                 # Track applied single services
                                 if cs.service.charge_type == 'single':
                                     applied_single_services.add(cs.service.id)
                     
+                    # Pass carrier shipping and box charges through as service lines
+                    pass_through_charges = chain(
+                        shipping_charges.get(order.transaction_id, ()),
+                        box_charges.get(order.transaction_id, ())
+                    )
+                    for service_id, service_name, cents in pass_through_charges:
+                        batch_service_costs.append(ServiceCost(
+                            order_cost=order_cost,
+                            service_id=service_id,
+                            service_name=service_name,
+                            amount=to_decimal(cents)
+                        ))
+                        order_cents += cents
+                        service_id = str(service_id)
+                        if service_id in service_totals_cents:
+                            service_totals_cents[service_id] += cents
+                        else:
+                            service_totals_cents[service_id] = cents
+                            service_names[service_id] = service_name
+                    
                     # Add service costs to the batch
                     if batch_service_costs:
                         service_costs_to_create.extend(batch_service_costs)
-                        # Update order total - will be saved at the end
-                        total_amount = sum(sc.amount for sc in batch_service_costs)
-                        order_cost.total_amount = total_amount
-                        # Update service totals without updating total_amount (already updated per service cost)
-                        self.report.add_order_cost(order_cost)
+                        service_lines += len(batch_service_costs)
+                        # Update order total - saved with the batch
+                        order_cost.total_amount = to_decimal(order_cents)
+                        order_costs_to_update.append(order_cost)
+                        report_cents += order_cents
                     else:
                         # Mark for deletion if no service costs
                         order_costs_to_delete.append(order_cost)
+
+                    if trace is not None:
+                        for service_cost in batch_service_costs:
+                            trace.add('service_cost', service_id=service_cost.service_id,
+                                      service_name=service_cost.service_name, amount=service_cost.amount)
+                        trace.add('order_total', amount=to_decimal(order_cents))
+                        trace.emit()
                     
                     # Update processed order count
                     self.progress['processed_orders'] += 1
@@ -360,6 +497,7 @@ class BillingCalculator:
                 )
                 
                 # Bulk create service costs for this batch
+                self.instrumentation.enter('persist')
                 if service_costs_to_create:
                     # Create in smaller chunks to avoid memory issues
                     max_chunk_size = 1000
@@ -368,11 +506,22 @@ class BillingCalculator:
                         ServiceCost.objects.bulk_create(chunk)
                     service_costs_to_create = []
                 
+                # Save order totals for this batch
+                if order_costs_to_update:
+                    OrderCost.objects.bulk_update(order_costs_to_update, ['total_amount'])
+                    order_costs_to_update = []
+                
                 # Free up memory
                 del batch_orders
                 del batch_order_costs
                 del created_order_costs
             
+            self.instrumentation.reassign('cost', 'evaluate', evaluate_seconds, evaluate_queries)
+            self.instrumentation.count('rule_evaluations', rule_evaluations)
+            self.instrumentation.count('rule_cache_hits', rule_cache_hits)
+            self.instrumentation.count('sql_rule_matches', sql_rule_matches)
+            self.instrumentation.count('service_lines', service_lines)
+            
             # Update progress
             self.update_progress('processing', 'Cleaning up temporary records', 90)
             
@@ -386,16 +535,28 @@ class BillingCalculator:
             # Update progress
             self.update_progress('processing', 'Saving final report', 95)
             
-            # Make sure the total amount is accurate
-            if 'total_amount' not in dir(self.report) or self.report.total_amount == 0:
-                # Calculate total from service totals if not already set
-                total = sum(data['amount'] for data in self.report.service_totals.values())
-                self.report.total_amount = total
-                logger.info(f"Total amount calculated from service totals: {total}")
+            # Convert the cent totals once, when the report is saved
+            self.report.service_totals = {
+                service_id: {
+                    'service_name': service_names[service_id],
+                    'amount': to_float(cents)
+                }
+                for service_id, cents in service_totals_cents.items()
+            }
+            self.report.total_amount = to_decimal(report_cents)
             
             # Save the report with final totals
             self.report.save()
             
+            # Keep the monthly rollups of the billed months up to date; the
+            # savepoint keeps a rollup failure from aborting the report
+            self.instrumentation.enter('rollups')
+            try:
+                with transaction.atomic():
+                    refresh_rollups_for_report(self.report)
+            except Exception as e:
+                logger.error(f"Error refreshing monthly rollups for report {self.report.id}: {str(e)}")
+            
             # Log performance metrics
             end_time = time.time()
             execution_time = end_time - start_time
@@ -403,11 +564,15 @@ class BillingCalculator:
             
             # Update final progress
             self.update_progress('completed', 'Report generation complete', 100)
+            self.finish_instrumentation('completed')
             
             return self.report
             
         except Exception as e:
             logger.error(f"Error generating report: {str(e)}")
+            # The report is rolled back, so the timings only go to the metrics
+            self.instrumentation.stop()
+            self.instrumentation.publish('error')
             # Update progress to error state
             self.update_progress('error', f"Error: {str(e)}", None)
             # Re-raise as proper error
@@ -416,9 +581,64 @@ class BillingCalculator:
             else:
                 raise ValidationError(f"Error generating report: {str(e)}")
     
-    # Keep a cache of precomputed SKU lists and product maps at the class level
-    _excluded_skus_cache = {}
-    _product_map_cache = {}
+    def finish_instrumentation(self, status):
+        """
+        Stop instrumenting, store the timings in the report metadata and publish them.
+        
+        Args:
+            status: Outcome for the metrics (completed or empty)
+        """
+        self.instrumentation.stop()
+        self.report.metadata['instrumentation'] = self.instrumentation.as_dict()
+        self.report.save(update_fields=['metadata'])
+        self.instrumentation.publish(status)
+    
+    def get_customer_indexes(self, customer_id):
+        """
+        Excluded SKUs and product SKUs of a customer.
+        
+        Read from the shared cache once per calculator run (see billing_cache.py).
+        
+        Args:
+            customer_id: ID of the customer
+            
+        Returns:
+            Tuple of (excluded SKUs, product SKUs), both frozensets of normalized SKUs
+        """
+        indexes = self._customer_indexes.get(customer_id)
+        if indexes is None:
+            indexes = (get_excluded_skus(customer_id), get_product_skus(customer_id))
+            self._customer_indexes[customer_id] = indexes
+        return indexes
+    
+    def get_matching_orders_by_service(self, orders, rule_groups_by_service):
+        """
+        Resolve rule groups to matching transaction IDs in the database.
+        
+        Args:
+            orders: Queryset of orders in the billing period
+            rule_groups_by_service: Dictionary of customer service ID to rule groups
+            
+        Returns:
+            Dictionary of customer service ID to a set of matching transaction IDs,
+            for services whose rule groups could all be compiled to SQL
+        """
+        compiler = RuleQueryCompiler()
+        matching = {}
+        
+        for cs_id, rule_groups in rule_groups_by_service.items():
+            try:
+                condition = compiler.compile_groups(rule_groups)
+            except UncompilableRule as e:
+                logger.debug(f"Evaluating rules for customer service {cs_id} in Python: {str(e)}")
+                continue
+            
+            matching[cs_id] = set(
+                orders.filter(condition).order_by().values_list('transaction_id', flat=True)
+            )
+        
+        logger.info(f"Rules for {len(matching)}/{len(rule_groups_by_service)} services resolved in the database")
+        return matching
     
     def calculate_service_cost(self, customer_service, order):
         """
@@ -431,6 +651,19 @@ class BillingCalculator:
         Returns:
             Decimal cost amount
         """
+        return to_decimal(self.calculate_service_cost_cents(customer_service, order))
+    
+    def calculate_service_cost_cents(self, customer_service, order):
+        """
+        Calculate the cost for a service applied to an order in integer cents.
+        
+        Args:
+            customer_service: CustomerService object
+            order: Order object
+            
+        Returns:
+            Cost in cents (int)
+        """
         try:
             service = customer_service.service
             charge_type = service.charge_type.lower()
@@ -456,7 +689,7 @@ class BillingCalculator:
                     
                     if not advanced_rules:
                         logger.warning(f"No advanced rules found for customer service {customer_service.id}")
-                        return Decimal('0')
+                        return 0
                     
                     # Use the first one found for now
                     advanced_rule = advanced_rules[0]
@@ -464,18 +697,20 @@ class BillingCalculator:
                     # For now, we'll return a simple calculation
                     # This is marked for future implementation
                     logger.debug("Case-based tier calculation not fully implemented")
-                    return customer_service.unit_price or Decimal('0')
+                    return to_cents(customer_service.unit_price)
                     
                 except Exception as e:
                     logger.error(f"Error evaluating case-based rule: {str(e)}")
-                    return Decimal('0')
+                    return 0
             
             # If no unit price, return 0
             if not customer_service.unit_price:
-                return Decimal('0')
+                return 0
                 
-            # Set base price
-            base_price = customer_service.unit_price
+            # Set base price in cents - do this once and cache
+            if not hasattr(customer_service, '_unit_price_cents'):
+                customer_service._unit_price_cents = to_cents(customer_service.unit_price)
+            base_price = customer_service._unit_price_cents
             
             # Convert service name to lowercase for comparison - do this once and cache
             if not hasattr(customer_service, '_service_name_lower'):
@@ -495,7 +730,7 @@ class BillingCalculator:
                     # Get SKU quantities from order
                     sku_quantity = getattr(order, 'sku_quantity', None)
                     if not sku_quantity:
-                        return Decimal('0')
+                        return 0
                     
                     # Convert order SKUs to normalized format - cache if not already done
                     if not hasattr(order, '_normalized_sku_dict'):
@@ -514,40 +749,24 @@ class BillingCalculator:
                     )
                     
                     if total_quantity == 0:
-                        return Decimal('0')
+                        return 0
                         
-                    return base_price * Decimal(str(total_quantity))
+                    return base_price * total_quantity
                 
                 # Special handling for pick cost and case pick
                 if service_name in ['pick cost', 'case pick']:
                     # Get SKU quantities from order
                     sku_quantity = getattr(order, 'sku_quantity', None)
                     if not sku_quantity:
-                        return Decimal('0')
+                        return 0
                     
                     # Convert order SKUs to normalized format - use cached if available
                     if not hasattr(order, '_normalized_sku_dict'):
                         order._normalized_sku_dict = convert_sku_format(sku_quantity)
                     sku_dict = order._normalized_sku_dict
                     
-                    # Get excluded SKUs - use cached version if available
-                    customer_id = order.customer_id
-                    if customer_id not in self._excluded_skus_cache:
-                        # Query once and cache the results
-                        excluded_skus = []
-                        quantity_services = CustomerService.objects.filter(
-                            customer_id=customer_id,
-                            service__charge_type='quantity'
-                        ).select_related('service')
-                        
-                        for cs in quantity_services:
-                            skus_list = cs.get_sku_list()
-                            if skus_list:
-                                excluded_skus.extend([normalize_sku(sku) for sku in skus_list])
-                        
-                        self._excluded_skus_cache[customer_id] = set(excluded_skus)
-                    
-                    excluded_skus_set = self._excluded_skus_cache[customer_id]
+                    # Excluded SKUs and known products come from the shared cache
+                    excluded_skus_set, product_skus = self.get_customer_indexes(order.customer_id)
                     
                     # Filter out excluded SKUs - use dict comprehension for efficiency
                     applicable_skus = {
@@ -556,50 +775,29 @@ class BillingCalculator:
                     }
                     
                     if not applicable_skus:
-                        return Decimal('0')
-                    
-                    # Get products for these SKUs - use cached version if available
-                    skus_list = list(applicable_skus.keys())
-                    # Create a stable string representation for the cache key
-                    skus_key = ",".join(sorted(skus_list))
-                    if skus_key not in self._product_map_cache:
-                        # Get all products in one query
-                        products = Product.objects.filter(sku__in=skus_list)
-                        
-                        # Build product map
-                        product_map = {}
-                        for product in products:
-                            normalized_sku = normalize_sku(product.sku)
-                            product_map[normalized_sku] = product
-                        
-                        self._product_map_cache[skus_key] = product_map
-                    
-                    product_map = self._product_map_cache[skus_key]
+                        return 0
                     
                     # Initialize total cost
-                    total_cost = Decimal('0')
+                    total_cost = 0
                     
-                    # Calculate cost for each SKU
+                    # Calculate cost for each SKU of a known product
                     for sku, quantity in applicable_skus.items():
-                        product = product_map.get(sku)
-                        if not product:
+                        if sku not in product_skus:
                             continue
                         
-                        # Get case_size safely, falling back to 1 if not available
+                        # Products do not record a case size, so each unit is one case
                         case_size = 1
-                        if hasattr(product, 'case_size'):
-                            case_size = product.case_size or 1
                         
                         if service_name == 'case pick':
                             # Case pick: only charge for full cases
                             full_cases = quantity // case_size
                             if full_cases > 0:
-                                total_cost += base_price * Decimal(str(full_cases))
+                                total_cost += base_price * full_cases
                         else:  # pick cost
                             # Pick cost: charge for remaining units or all units
                             units = quantity % case_size if case_size > 1 else quantity
                             if units > 0:
-                                total_cost += base_price * Decimal(str(units))
+                                total_cost += base_price * units
                     
                     return total_cost
                 
@@ -607,30 +805,30 @@ class BillingCalculator:
                 elif service_name == 'sku cost':
                     sku_quantity = getattr(order, 'sku_quantity', None)
                     if not sku_quantity:
-                        return Decimal('0')
+                        return 0
                     
                     # Use cached conversion if available
                     if not hasattr(order, '_normalized_sku_dict'):
                         order._normalized_sku_dict = convert_sku_format(sku_quantity)
                     
                     unique_sku_count = len(order._normalized_sku_dict)
-                    return base_price * Decimal(str(unique_sku_count))
+                    return base_price * unique_sku_count
                 
                 # Regular quantity-based service
                 else:
                     quantity = getattr(order, 'total_item_qty', 1) or 1
-                    return base_price * Decimal(str(quantity))
+                    return base_price * quantity
             
             # Handle single charge
             elif charge_type == 'single':
                 return base_price
             
             logger.debug(f"Unknown charge type: {charge_type}")
-            return Decimal('0')
+            return 0
             
         except Exception as e:
             logger.error(f"Error calculating service cost: {str(e)}")
-            return Decimal('0')
+            return 0
     
     def to_dict(self):
         """
@@ -666,43 +864,14 @@ class BillingCalculator:
             CSV string representation of report
         """
         try:
-            # Create header line
-            lines = ["order_id,reference_number,date,service_id,service_name,amount"]
-            
-            # Process each order and its service costs
-            for order_cost in self.report.order_costs.all():
-                order = order_cost.order
-                reference = order.reference_number.replace('"', '""') if order.reference_number else ""
-                date = order.close_date.strftime('%Y-%m-%d') if order.close_date else ""
-                
-                for service_cost in order_cost.service_costs.all():
-                    # Format service name for CSV (escape quotes)
-                    service_name = service_cost.service_name.replace('"', '""') if service_cost.service_name else ""
-                    
-                    # Build CSV line
-                    line = f"{order.transaction_id},\"{reference}\",{date},{service_cost.service_id},"
-                    line += f"\"{service_name}\",{service_cost.amount}"
-                    lines.append(line)
-            
-            # Add a summary section
-            lines.append("")
-            lines.append("SUMMARY")
-            lines.append("service_id,service_name,total_amount")
-            
-            for service_id, data in self.report.service_totals.items():
-                service_name = data['service_name'].replace('"', '""') if data['service_name'] else ""
-                lines.append(f"{service_id},\"{service_name}\",{data['amount']}")
-            
-            lines.append("")
-            lines.append(f"TOTAL,\"\",{self.report.total_amount}")
-                    
-            return "\n".join(lines)
+            return "".join(iter_report_csv(self.report))
         except Exception as e:
             logger.error(f"Error converting report to CSV: {str(e)}")
             raise
 
 
-def generate_billing_report(customer_id, start_date, end_date, output_format='json'):
+def generate_billing_report(customer_id, start_date, end_date, output_format='json', include_shipping=False,
+                            include_box_cost=False):
     """
     Entry point for generating billing reports.
     
@@ -711,6 +880,8 @@ def generate_billing_report(customer_id, start_date, end_date, output_format='js
         start_date: Start date for billing period (string or datetime)
         end_date: End date for billing period (string or datetime)
         output_format: Format for output (json, csv, dict)
+        include_shipping: Whether to pass carrier shipping charges through
+        include_box_cost: Whether to bill the cheapest fitting box for each order
         
     Returns:
         Report data in the specified format
@@ -732,7 +903,9 @@ def generate_billing_report(customer_id, start_date, end_date, output_format='js
         calculator = BillingCalculator(
             customer_id=customer_id,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            include_shipping=include_shipping,
+            include_box_cost=include_box_cost
         )
         
         report = calculator.generate_report()
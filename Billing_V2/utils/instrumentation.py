@@ -0,0 +1,119 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from LedgerLink.metrics import counter, histogram
+from LedgerLink.profiling import profile_queries
+
+logger = logging.getLogger(__name__)
+
+# Also recorded by the v1 pipeline (billing/utils.py), labelled by pipeline
+REPORTS = counter(
+    'billing_reports_total', 'Billing reports generated, by pipeline and outcome', ['pipeline', 'status']
+)
+REPORT_SECONDS = histogram(
+    'billing_report_duration_seconds', 'Wall time of billing report generation', ['pipeline']
+)
+STAGE_SECONDS = histogram(
+    'billing_stage_duration_seconds', 'Wall time of each billing calculation stage', ['stage']
+)
+REPORT_ORDERS = histogram(
+    'billing_report_orders', 'Orders per billing report', [],
+    buckets=(10, 100, 1000, 5000, 10000, 50000, 100000, 500000)
+)
+REPORT_QUERIES = histogram(
+    'billing_report_queries', 'Database queries per billing report', [],
+    buckets=(10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+)
+EVENTS = counter('billing_events_total', 'Billing calculation counters, by event', ['event'])
+
+
+class BillingInstrumentation:
+    """
+    Stage timings, query counts and counters for one billing calculation.
+
+    Stages run one after another: enter() closes the current stage and opens
+    the next, and time spent in a stage that is entered again (once per
+    batch) adds up. Work interleaved inside a stage, such as Python rule
+    evaluation inside costing, is timed by the caller and moved across
+    with reassign(), so the hot loop only pays for perf_counter calls.
+
+    Everything is collected in memory; as_dict() goes into the report
+    metadata and publish() updates the process metrics served at /metrics.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.queries = None
+        self._stack = ExitStack()
+        self._stage = None
+        self._stage_start = 0.0
+        self._stage_queries = 0
+        self._start = None
+        self.total_seconds = 0.0
+
+    def start(self):
+        """Start the clock and count queries on every connection until stop()."""
+        self.queries = self._stack.enter_context(profile_queries())
+        self._start = time.perf_counter()
+
+    def enter(self, stage):
+        """Close the current stage and start timing the next one."""
+        now = time.perf_counter()
+        if self._stage is not None:
+            self._add(self._stage, now - self._stage_start, self.queries.count - self._stage_queries)
+        self._stage = stage
+        self._stage_start = now
+        self._stage_queries = self.queries.count
+
+    def reassign(self, from_stage, to_stage, seconds, queries=0):
+        """Move time and queries measured inside one stage to another."""
+        self._add(from_stage, -seconds, -queries)
+        self._add(to_stage, seconds, queries)
+
+    def count(self, event, amount=1):
+        self.counters[event] = self.counters.get(event, 0) + amount
+
+    def stop(self):
+        """Close the current stage and stop counting queries."""
+        if self._start is None:
+            return
+        self.enter(None)
+        self._stage = None
+        self.total_seconds = time.perf_counter() - self._start
+        self.counters['queries'] = self.queries.count
+        self._stack.close()
+        self._start = None
+
+    def _add(self, stage, seconds, queries):
+        totals = self.stages.setdefault(stage, {'seconds': 0.0, 'queries': 0})
+        totals['seconds'] += seconds
+        totals['queries'] += queries
+
+    def as_dict(self):
+        """Rounded timings and counters for the report metadata."""
+        return {
+            'total_seconds': round(self.total_seconds, 4),
+            'stages': {
+                stage: {'seconds': round(max(totals['seconds'], 0.0), 4), 'queries': totals['queries']}
+                for stage, totals in self.stages.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def publish(self, status):
+        """Add this calculation to the process metrics."""
+        REPORTS.inc(pipeline='v2', status=status)
+        REPORT_SECONDS.observe(self.total_seconds, pipeline='v2')
+        for stage, totals in self.stages.items():
+            STAGE_SECONDS.observe(max(totals['seconds'], 0.0), stage=stage)
+        REPORT_ORDERS.observe(self.counters.get('orders', 0))
+        REPORT_QUERIES.observe(self.counters.get('queries', 0))
+        for event, amount in self.counters.items():
+            EVENTS.inc(amount, event=event)
+        logger.info(
+            f"Billing calculation {status} in {self.total_seconds:.2f}s: "
+            + ", ".join(f"{stage} {totals['seconds']:.2f}s/{totals['queries']}q"
+                        for stage, totals in self.stages.items())
+        )
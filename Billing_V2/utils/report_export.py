@@ -0,0 +1,102 @@
+import logging
+
+from ..models import ServiceCost
+
+logger = logging.getLogger(__name__)
+
+CSV_HEADER = "order_id,reference_number,date,service_id,service_name,amount"
+
+# Lines are grouped into chunks of roughly this many characters before being
+# handed to the response, so streaming does not write one tiny chunk per row
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+def _quote(value):
+    """Escape a value for a double-quoted CSV field."""
+    return value.replace('"', '""') if value else ""
+
+
+def iter_report_csv_lines(report, using=None):
+    """
+    Yield the lines of a stored report's CSV export, without line endings.
+
+    All service cost rows are read with a single query joined to their order
+    cost and order, in order cost order.
+
+    Args:
+        report: Saved BillingReport instance
+        using: Database alias to read from; routed as usual when omitted
+
+    Returns:
+        Iterator of CSV lines
+    """
+    yield CSV_HEADER
+
+    rows = (
+        ServiceCost.objects
+        .using(using)
+        .filter(order_cost__billing_report_id=report.pk)
+        .order_by('order_cost_id', 'id')
+        .values_list(
+            'order_cost__order__transaction_id',
+            'order_cost__order__reference_number',
+            'order_cost__order__close_date',
+            'service_id',
+            'service_name',
+            'amount'
+        )
+    )
+
+    row_count = 0
+    last_close_date = None
+    date = ""
+    for transaction_id, reference_number, close_date, service_id, service_name, amount in rows.iterator(chunk_size=5000):
+        # Consecutive rows mostly belong to the same order
+        if close_date != last_close_date:
+            last_close_date = close_date
+            date = close_date.strftime('%Y-%m-%d') if close_date else ""
+        row_count += 1
+        yield (f"{transaction_id},\"{_quote(reference_number)}\",{date},{service_id},"
+               f"\"{_quote(service_name)}\",{amount}")
+
+    logger.debug(f"Exported {row_count} service cost rows for report {report.pk}")
+
+    # Add a summary section
+    yield ""
+    yield "SUMMARY"
+    yield "service_id,service_name,total_amount"
+
+    for service_id, data in report.service_totals.items():
+        yield f"{service_id},\"{_quote(data['service_name'])}\",{data['amount']}"
+
+    yield ""
+    yield f"TOTAL,\"\",{report.total_amount}"
+
+
+def iter_report_csv(report, chunk_size=CSV_CHUNK_SIZE, using=None):
+    """
+    Stream a stored report's CSV export in chunks.
+
+    Joining the chunks gives the same text as BillingCalculator.to_csv().
+
+    Args:
+        report: Saved BillingReport instance
+        chunk_size: Approximate number of characters per chunk
+        using: Database alias to read from; routed as usual when omitted
+
+    Returns:
+        Iterator of CSV text chunks
+    """
+    buffer = []
+    buffered = 0
+    for index, line in enumerate(iter_report_csv_lines(report, using)):
+        if index:
+            line = "\n" + line
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
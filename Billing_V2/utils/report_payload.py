@@ -0,0 +1,75 @@
+import logging
+
+from rest_framework import serializers
+
+from ..models import OrderCost, ServiceCost
+
+logger = logging.getLogger(__name__)
+
+
+def build_report_payload(report):
+    """
+    Build the retrieve payload of a stored billing report.
+
+    Produces the same data as BillingReportSerializer(report).data, but
+    reads the order costs (with their order fields) and the service costs
+    with one values_list() query each and assembles the dictionaries
+    directly, instead of serializing every row field by field and loading
+    each row's order separately.
+
+    Args:
+        report: BillingReport instance, ideally with its customer selected
+
+    Returns:
+        Dictionary with the report fields and its nested order costs
+    """
+    datetime_field = serializers.DateTimeField()
+    order_date_field = serializers.DateTimeField(format='%Y-%m-%d')
+
+    service_costs = {}
+    service_rows = (
+        ServiceCost.objects
+        .filter(order_cost__billing_report_id=report.pk)
+        .order_by('order_cost_id', 'id')
+        .values_list('order_cost_id', 'service_id', 'service_name', 'amount')
+    )
+    for order_cost_id, service_id, service_name, amount in service_rows.iterator(chunk_size=5000):
+        costs = service_costs.get(order_cost_id)
+        if costs is None:
+            costs = service_costs[order_cost_id] = []
+        costs.append({
+            'service_id': service_id,
+            'service_name': service_name,
+            'amount': format(amount, 'f')
+        })
+
+    order_costs = []
+    order_rows = (
+        OrderCost.objects
+        .filter(billing_report_id=report.pk)
+        .order_by('id')
+        .values_list('id', 'order__transaction_id', 'order__reference_number',
+                     'order__close_date', 'total_amount')
+    )
+    for order_cost_id, transaction_id, reference_number, close_date, total_amount in order_rows.iterator(chunk_size=5000):
+        order_costs.append({
+            'order_id': transaction_id,
+            'reference_number': reference_number,
+            'order_date': order_date_field.to_representation(close_date) if close_date else None,
+            'service_costs': service_costs.get(order_cost_id, []),
+            'total_amount': format(total_amount, 'f')
+        })
+
+    logger.debug(f"Built payload for report {report.pk} with {len(order_costs)} order costs")
+
+    return {
+        'id': report.pk,
+        'customer_id': report.customer_id,
+        'customer_name': report.customer.company_name,
+        'start_date': datetime_field.to_representation(report.start_date),
+        'end_date': datetime_field.to_representation(report.end_date),
+        'created_at': datetime_field.to_representation(report.created_at),
+        'order_costs': order_costs,
+        'service_totals': report.service_totals,
+        'total_amount': format(report.total_amount, 'f')
+    }
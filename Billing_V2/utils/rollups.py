@@ -0,0 +1,207 @@
+import logging
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DateField, Max, Min, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from ..models import MonthlyBillingRollup, OrderCost
+from .analytics import BillingAnalytics
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_GROUPINGS = ('month', 'customer', 'service')
+
+# Per-month totals of a customer across all services. Orders are billed on
+# several services, so their order and item counts cannot be summed from the
+# per-service rows; this row counts each order once.
+ALL_SERVICES_ID = 0
+ALL_SERVICES_NAME = 'All services'
+
+
+def month_start(value):
+    """First day of the month of a date or datetime (in the current time zone)."""
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def month_end(value):
+    """Last day of the month of a date or datetime."""
+    next_month = month_start(value).replace(day=28) + timedelta(days=4)
+    return next_month.replace(day=1) - timedelta(days=1)
+
+
+def refresh_monthly_rollups(customer_id, start_month=None, end_month=None):
+    """
+    Rebuild a customer's rollup rows from the stored service costs.
+
+    The rows of every month between start_month and end_month (inclusive;
+    all months when omitted) are replaced with grouped queries over the
+    latest calculation of each order closed in that range: one row per
+    service, plus an ALL_SERVICES_ID row per month.
+
+    Args:
+        customer_id: ID of the customer
+        start_month: First month to rebuild (any date in the month)
+        end_month: Last month to rebuild (any date in the month)
+
+    Returns:
+        Number of rollup rows written
+    """
+    start_month = month_start(start_month) if start_month else None
+    end_month = month_start(end_month) if end_month else None
+
+    analytics = BillingAnalytics(
+        customer_id=customer_id,
+        start_date=start_month,
+        end_date=month_end(end_month) if end_month else None
+    )
+    rows = (
+        analytics.service_costs()
+        .filter(order_cost__order__close_date__isnull=False)
+        .values('service_id', month=TruncMonth('order_cost__order__close_date', output_field=DateField()))
+        .annotate(
+            name=Max('service_name'),
+            orders=Count('order_cost_id', distinct=True),
+            items=Coalesce(Sum('order_cost__order__total_item_qty'), 0),
+            total=Sum('amount'),
+        )
+    )
+    rollups = [
+        MonthlyBillingRollup(
+            customer_id=customer_id,
+            service_id=row['service_id'],
+            service_name=row['name'],
+            month=row['month'],
+            order_count=row['orders'],
+            quantity=row['items'],
+            amount=row['total'],
+        )
+        for row in rows
+    ]
+
+    month_amounts = {}
+    for rollup in rollups:
+        month_amounts[rollup.month] = month_amounts.get(rollup.month, 0) + rollup.amount
+    order_totals = (
+        OrderCost.objects
+        .filter(id__in=analytics.service_costs().values('order_cost_id'), order__close_date__isnull=False)
+        .values(month=TruncMonth('order__close_date', output_field=DateField()))
+        .annotate(orders=Count('id'), items=Coalesce(Sum('order__total_item_qty'), 0))
+    )
+    rollups.extend(
+        MonthlyBillingRollup(
+            customer_id=customer_id,
+            service_id=ALL_SERVICES_ID,
+            service_name=ALL_SERVICES_NAME,
+            month=row['month'],
+            order_count=row['orders'],
+            quantity=row['items'],
+            amount=month_amounts.get(row['month'], 0),
+        )
+        for row in order_totals
+    )
+
+    with transaction.atomic():
+        stale = MonthlyBillingRollup.objects.filter(customer_id=customer_id)
+        if start_month:
+            stale = stale.filter(month__gte=start_month)
+        if end_month:
+            stale = stale.filter(month__lte=end_month)
+        stale.delete()
+        MonthlyBillingRollup.objects.bulk_create(rollups, batch_size=1000)
+
+    logger.info(f"Refreshed {len(rollups)} monthly rollups for customer {customer_id} "
+                f"({start_month or 'start'} to {end_month or 'end'})")
+    return len(rollups)
+
+
+def refresh_rollups_for_report(report):
+    """
+    Update the rollups of the months a newly generated report touched.
+
+    Args:
+        report: Saved BillingReport instance
+
+    Returns:
+        Number of rollup rows written
+    """
+    span = OrderCost.objects.filter(billing_report=report).aggregate(
+        first=Min('order__close_date'),
+        last=Max('order__close_date'),
+    )
+    if span['first'] is None:
+        return 0
+    return refresh_monthly_rollups(report.customer_id, span['first'], span['last'])
+
+
+def query_monthly_rollups(customer_id=None, service_id=None, start_month=None, end_month=None, group_by=None):
+    """
+    Read billed totals from the rollup table.
+
+    Args:
+        customer_id: Only include this customer
+        service_id: Only include this service
+        start_month: First month to include (any date in the month)
+        end_month: Last month to include (any date in the month)
+        group_by: None for the per-service rows, or month, customer or
+            service to sum them up. Month and customer totals count each
+            order once, however many services it was billed on.
+
+    Returns:
+        List of dictionaries, one per row or group
+
+    Raises:
+        ValueError: If the grouping is not supported
+    """
+    queryset = MonthlyBillingRollup.objects.all()
+    if customer_id:
+        queryset = queryset.filter(customer_id=customer_id)
+    if service_id:
+        queryset = queryset.filter(service_id=service_id)
+    if start_month:
+        queryset = queryset.filter(month__gte=month_start(start_month))
+    if end_month:
+        queryset = queryset.filter(month__lte=month_start(end_month))
+    if group_by in ('month', 'customer') and not service_id:
+        queryset = queryset.filter(service_id=ALL_SERVICES_ID)
+    else:
+        queryset = queryset.exclude(service_id=ALL_SERVICES_ID)
+
+    # Annotations cannot reuse the model's field names, so sums are renamed afterwards
+    totals = {
+        'orders': Sum('order_count'),
+        'items': Sum('quantity'),
+        'total': Sum('amount'),
+    }
+    if group_by is None:
+        rows = queryset.order_by('month', 'customer_id', 'service_id').values(
+            'customer_id', 'service_id', 'service_name', 'month', 'order_count', 'quantity', 'amount'
+        )
+        return [{**row, 'month': row['month'].isoformat()} for row in rows]
+
+    if group_by == 'month':
+        rows = queryset.values('month').annotate(**totals).order_by('month')
+    elif group_by == 'customer':
+        rows = (queryset.values('customer_id')
+                .annotate(customer_name=Max('customer__company_name'), **totals)
+                .order_by('-total', 'customer_id'))
+    elif group_by == 'service':
+        rows = (queryset.values('service_id')
+                .annotate(name=Max('service_name'), **totals)
+                .order_by('-total', 'service_id'))
+    else:
+        raise ValueError(f"Invalid group_by: {group_by}. Choose from {', '.join(ROLLUP_GROUPINGS)}")
+
+    results = []
+    for row in rows:
+        result = {key: value for key, value in row.items() if key not in ('name', 'orders', 'items', 'total')}
+        if 'month' in result:
+            result['month'] = result['month'].isoformat()
+        if 'name' in row:
+            result['service_name'] = row['name']
+        result.update(order_count=row['orders'], quantity=row['items'], amount=row['total'])
+        results.append(result)
+    return results
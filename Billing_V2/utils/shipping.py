@@ -0,0 +1,75 @@
+import logging
+from decimal import Decimal
+
+from django.db.models import DecimalField, IntegerField, Value
+from django.db.models.functions import Coalesce
+
+from billing.money import to_cents
+from shipping.models import CADShipping, USShipping
+
+logger = logging.getLogger(__name__)
+
+# Shipping charges are passed through as service lines. They are not
+# customer services, so they use reserved negative service IDs that can never
+# collide with a Service primary key.
+CAD_SHIPPING_SERVICE_ID = -1
+US_SHIPPING_SERVICE_ID = -2
+SHIPPING_SERVICE_NAMES = {
+    CAD_SHIPPING_SERVICE_ID: 'CAD Shipping',
+    US_SHIPPING_SERVICE_ID: 'US Shipping',
+}
+
+# The charges that make up each carrier's total, as in the shipping serializers
+CAD_CHARGE_FIELDS = ('pre_tax_shipping_charge', 'fuel_surcharge', 'tax1amount', 'tax2amount', 'tax3amount')
+US_CHARGE_FIELDS = ('base_chg', 'carrier_peak_charge', 'wizmo_peak_charge', 'accessorial_charges', 'hst', 'gst')
+
+
+def _charge_total(fields):
+    """SQL sum of nullable charge columns."""
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=10, decimal_places=2))
+    total = Coalesce(fields[0], zero)
+    for name in fields[1:]:
+        total = total + Coalesce(name, zero)
+    return total
+
+
+def _period_rows(model, service_id, fields, customer_id, start_date, end_date):
+    return model.objects.filter(
+        transaction__customer_id=customer_id,
+        transaction__close_date__gte=start_date,
+        transaction__close_date__lte=end_date,
+    ).order_by().values_list(
+        'transaction_id',
+        Value(service_id, output_field=IntegerField()),
+        _charge_total(fields),
+    )
+
+
+def get_shipping_charges(customer_id, start_date, end_date):
+    """
+    Shipping pass-through charges for the orders of a billing period.
+
+    Both carrier tables are read in one query: each side joins its orders to
+    filter on the period and adds up its charge columns in SQL.
+
+    Args:
+        customer_id: ID of the customer
+        start_date: Start of the period (aware datetime)
+        end_date: End of the period (aware datetime)
+
+    Returns:
+        Dictionary of transaction ID to a list of (service_id, service_name, cents)
+    """
+    cad = _period_rows(CADShipping, CAD_SHIPPING_SERVICE_ID, CAD_CHARGE_FIELDS, customer_id, start_date, end_date)
+    us = _period_rows(USShipping, US_SHIPPING_SERVICE_ID, US_CHARGE_FIELDS, customer_id, start_date, end_date)
+
+    charges = {}
+    for transaction_id, service_id, total in cad.union(us, all=True):
+        cents = to_cents(total)
+        if cents > 0:
+            charges.setdefault(transaction_id, []).append(
+                (service_id, SHIPPING_SERVICE_NAMES[service_id], cents)
+            )
+
+    logger.info(f"Loaded shipping charges for {len(charges)} orders")
+    return charges
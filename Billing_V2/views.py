@@ -5,23 +5,32 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.renderers import BrowsableAPIRenderer
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.utils.dateparse import parse_date
 
 # Custom session authentication that doesn't enforce CSRF for development
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
         # Skip CSRF validation for API endpoints
         return
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.core.exceptions import ValidationError
-from .models import BillingReport
+from LedgerLink.db_router import read_alias, replica_reads
+from .models import BillingReport, ServiceCost
 from .serializers import (
     BillingReportSerializer,
     BillingReportRequestSerializer,
     BillingReportSummarySerializer
 )
+from .renderers import ORJSONRenderer
+from .utils.analytics import BillingAnalytics
+from .utils.billing_cache import get_progress, progress_cache_key, set_progress
+from .utils.rollups import query_monthly_rollups
 from .utils.calculator import BillingCalculator
+from .utils.report_export import iter_report_csv
+from .utils.report_payload import build_report_payload
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +45,7 @@ class BillingReportViewSet(viewsets.ModelViewSet):
     # permission_classes = [IsAuthenticated]
     permission_classes = []  # Allow all for development
     authentication_classes = [CsrfExemptSessionAuthentication]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
     
     def list(self, request, *args, **kwargs):
         """Override list method to return consistent JSON format"""
@@ -49,10 +59,9 @@ class BillingReportViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve method to return consistent JSON format"""
         instance = self.get_object()
-        serializer = self.get_serializer(instance)
         return Response({
             'success': True,
-            'data': serializer.data
+            'data': build_report_payload(instance)
         })
     
     def get_serializer_class(self):
@@ -63,7 +72,7 @@ class BillingReportViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter queryset by optional parameters"""
-        queryset = BillingReport.objects.all()
+        queryset = BillingReport.objects.select_related('customer')
         
         # Filter by customer ID
         customer_id = self.request.query_params.get('customer_id')
@@ -128,17 +137,18 @@ class BillingReportViewSet(viewsets.ModelViewSet):
                 customer_id=data['customer_id'],
                 start_date=data['start_date'],
                 end_date=data['end_date'],
-                customer_service_ids=data.get('customer_services')
+                customer_service_ids=data.get('customer_services'),
+                include_shipping=data.get('include_shipping', False),
+                include_box_cost=data.get('include_box_cost', False)
             )
             init_time = time.time() - init_start
             
             # Store the calculator in request.session for progress tracking
             # We'll use a unique key based on customer and date range
-            progress_key = f"billing_report_progress_{data['customer_id']}_{data['start_date']}_{data['end_date']}"
+            progress_key = progress_cache_key(data['customer_id'], data['start_date'], data['end_date'])
             
-            # Store in Django's cache
-            from django.core.cache import cache
-            cache.set(progress_key, calculator.progress, 3600)  # Cache for 1 hour
+            # Store in the shared cache so any worker can answer progress requests
+            set_progress(progress_key, calculator.progress)
             
             # Generate the report
             logger.info(f"Starting report generation for customer {data['customer_id']} from {data['start_date']} to {data['end_date']}")
@@ -148,7 +158,7 @@ class BillingReportViewSet(viewsets.ModelViewSet):
             
             # Store the report ID in the progress data for reference
             calculator.progress['report_id'] = report.id
-            cache.set(progress_key, calculator.progress, 3600)  # Update cache
+            set_progress(progress_key, calculator.progress)  # Update cache
             
             logger.info(f"Completed report generation: Report ID {report.id} in {report_gen_time:.2f} seconds")
             
@@ -171,12 +181,7 @@ class BillingReportViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_201_CREATED)
                 
             elif output_format == 'csv':
-                # Return report as CSV file
-                csv_start = time.time()
-                csv_content = calculator.to_csv()
-                csv_time = time.time() - csv_start
-                logger.info(f"CSV generation completed in {csv_time:.2f} seconds")
-                
+                # Return report as CSV file, streamed from a single query
                 # Get customer name for better filename
                 try:
                     from customers.models import Customer
@@ -189,8 +194,8 @@ class BillingReportViewSet(viewsets.ModelViewSet):
                 start_date_str = data['start_date'].strftime('%Y%m%d')
                 end_date_str = data['end_date'].strftime('%Y%m%d')
                 
-                # Create response with CSV content
-                response = HttpResponse(content_type='text/csv; charset=utf-8')
+                # Create streaming response with CSV content
+                response = StreamingHttpResponse(iter_report_csv(report), content_type='text/csv; charset=utf-8')
                 filename = f"billing_report_{customer_name}_{start_date_str}_to_{end_date_str}.csv"
                 
                 # Use proper Content-Disposition header with quoted filename
@@ -200,11 +205,8 @@ class BillingReportViewSet(viewsets.ModelViewSet):
                 response['Pragma'] = 'no-cache'
                 response['Expires'] = '0'
                 
-                # Write the CSV content to the response
-                response.write(csv_content)
-                
                 # Log success
-                logger.info(f"CSV file prepared for download: {filename} ({len(csv_content)} bytes)")
+                logger.info(f"CSV file prepared for download: {filename}")
                 
             elif output_format == 'pdf':
                 # PDF generation would go here (requires additional libraries)
@@ -286,14 +288,6 @@ class BillingReportViewSet(viewsets.ModelViewSet):
             logger.info(f"Download requested for report {report.id} in {format_type} format")
             
             if format_type == 'csv':
-                # Initialize calculator with the existing report
-                calculator = BillingCalculator(
-                    customer_id=report.customer_id,
-                    start_date=report.start_date,
-                    end_date=report.end_date
-                )
-                calculator.report = report  # Set existing report
-                
                 # Set filename with customer name and date range for better identification
                 try:
                     customer_name = report.customer.company_name.replace(" ", "_")
@@ -304,34 +298,30 @@ class BillingReportViewSet(viewsets.ModelViewSet):
                 end_date_str = report.end_date.strftime('%Y%m%d')
                 filename = f"billing_report_{customer_name}_{start_date_str}_to_{end_date_str}.csv"
                 
-                # Generate CSV content
-                csv_start = time.time()
-                csv_content = calculator.to_csv()
-                csv_time = time.time() - csv_start
-                
-                # Create response with proper headers
-                response = HttpResponse(content_type='text/csv; charset=utf-8')
+                # Stream CSV rows from a single joined query; the length is not known up front.
+                # The rows are read after the view returns, so pick the database now.
+                response = StreamingHttpResponse(
+                    iter_report_csv(report, using=read_alias(ServiceCost)),
+                    content_type='text/csv; charset=utf-8'
+                )
                 response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                response['Content-Length'] = len(csv_content)
                 response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
                 response['Pragma'] = 'no-cache'
                 response['Expires'] = '0'
                 
-                # Write CSV content to response
-                response.write(csv_content)
-                
                 # Log the successful download
                 total_time = time.time() - start_time
-                logger.info(f"CSV download prepared for report {report.id}: {filename} ({len(csv_content)} bytes) in {total_time:.2f}s")
+                logger.info(f"CSV download prepared for report {report.id}: {filename} in {total_time:.2f}s")
                 
                 return response
                 
             elif format_type == 'json':
                 # Return as JSON data
-                serializer = self.get_serializer(report)
+                with replica_reads():
+                    payload = build_report_payload(report)
                 return Response({
                     'success': True,
-                    'data': serializer.data
+                    'data': payload
                 })
                 
             elif format_type == 'pdf':
@@ -371,11 +361,10 @@ class BillingReportViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_400_BAD_REQUEST)
                 
             # Construct progress key
-            progress_key = f"billing_report_progress_{customer_id}_{start_date}_{end_date}"
+            progress_key = progress_cache_key(customer_id, start_date, end_date)
             
             # Get progress from cache
-            from django.core.cache import cache
-            progress = cache.get(progress_key)
+            progress = get_progress(progress_key)
             
             if not progress:
                 return Response({
@@ -443,6 +432,7 @@ class BillingReportViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     @action(detail=False, methods=['get'])
+    @replica_reads()
     def customer_summary(self, request):
         """Get summary of billing reports by customer"""
         from django.db.models import Sum, Count
@@ -459,31 +449,109 @@ class BillingReportViewSet(viewsets.ModelViewSet):
             if customer_id:
                 queryset = queryset.filter(customer_id=customer_id)
                 
-            # Annotate with aggregates
+            # Annotate with aggregates; the customer name comes from the same query
             summary = queryset.annotate(
+                customer_name=models.Max('customer__company_name'),
                 report_count=Count('id'),
                 total_amount=Sum('total_amount'),
                 first_report=models.Min('created_at'),
                 latest_report=models.Max('created_at'),
             ).order_by('-latest_report')
-            
-            # Get customer names
-            from customers.models import Customer
-            customer_map = {
-                c.id: c.company_name for c in Customer.objects.filter(
-                    id__in=[item['customer_id'] for item in summary]
-                )
-            }
-            
-            # Add customer names to results
-            for item in summary:
-                item['customer_name'] = customer_map.get(item['customer_id'], 'Unknown')
                 
-            return Response(summary)
+            return Response(list(summary))
             
         except Exception as e:
             logger.error(f"Error getting customer summary: {str(e)}")
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+    @action(detail=False, methods=['get'])
+    @replica_reads()
+    def analytics(self, request):
+        """
+        Aggregate billed amounts per service, customer or period.
+
+        Query parameters: group_by (service, customer or period), period
+        (day, week, month, quarter or year), customer_id, service_id,
+        start_date and end_date (YYYY-MM-DD, on the order close date).
+        """
+        try:
+            params = request.query_params
+            dates = {}
+            for name in ('start_date', 'end_date'):
+                value = params.get(name)
+                dates[name] = parse_date(value) if value else None
+                if value and dates[name] is None:
+                    raise ValueError(f"Invalid {name}: {value}. Use YYYY-MM-DD")
+
+            analytics = BillingAnalytics(
+                customer_id=params.get('customer_id'),
+                service_id=params.get('service_id'),
+                **dates
+            )
+            group_by = params.get('group_by', 'service')
+            data = analytics.aggregate(group_by, period=params.get('period', 'month'))
+
+            return Response({
+                'success': True,
+                'group_by': group_by,
+                'data': data
+            })
+
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error getting billing analytics: {str(e)}")
+            return Response({
+                'success': False,
+                'error': f"Error getting billing analytics: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['get'])
+    def monthly_rollup(self, request):
+        """
+        Read billed totals from the monthly rollup table.
+
+        Query parameters: group_by (month, customer or service; omit for the
+        stored rows), customer_id, service_id, start_month and end_month
+        (YYYY-MM).
+        """
+        try:
+            params = request.query_params
+            months = {}
+            for name in ('start_month', 'end_month'):
+                value = params.get(name)
+                months[name] = parse_date(f'{value}-01') if value else None
+                if value and months[name] is None:
+                    raise ValueError(f"Invalid {name}: {value}. Use YYYY-MM")
+
+            data = query_monthly_rollups(
+                customer_id=params.get('customer_id'),
+                service_id=params.get('service_id'),
+                group_by=params.get('group_by') or None,
+                **months
+            )
+
+            return Response({
+                'success': True,
+                'data': data
+            })
+
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error(f"Error getting monthly rollup: {str(e)}")
+            return Response({
+                'success': False,
+                'error': f"Error getting monthly rollup: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,56 @@
+# LedgerLink/cache.py
+
+import time
+
+from django.core.cache import cache
+
+# Keys are '<namespace>:<part>:...'. A namespace can be versioned: its keys
+# then include a version number stored under '<namespace>:version', and
+# bumping that number makes every key of the namespace unreachable at once,
+# in every process sharing the cache.
+
+
+def cache_key(namespace, *parts):
+    """Build a namespaced cache key."""
+    return ':'.join([namespace, *(str(part) for part in parts)])
+
+
+def namespace_version(namespace):
+    """Current version of a namespace, initialised on first use."""
+    version_key = cache_key(namespace, 'version')
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    return version
+
+
+def versioned_key(namespace, *parts):
+    """Cache key under the current version of a namespace."""
+    return cache_key(namespace, namespace_version(namespace), *parts)
+
+
+def invalidate_namespace(namespace):
+    """Make every key of a versioned namespace unreachable."""
+    cache.set(cache_key(namespace, 'version'), time.time_ns(), None)
+
+
+def get_or_load(namespace, parts, loader, timeout):
+    """
+    Read a value from a versioned namespace, loading and storing it on a miss.
+
+    Args:
+        namespace: Versioned namespace of the value
+        parts: Key parts identifying the value within the namespace
+        loader: Callable returning the value; it must not return None
+        timeout: Cache timeout in seconds
+
+    Returns:
+        The cached or freshly loaded value
+    """
+    key = versioned_key(namespace, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, timeout)
+    return value
@@ -0,0 +1,159 @@
+# LedgerLink/database.py
+
+"""
+Connection settings for the PostgreSQL database, read from the environment.
+
+The production database is a remote hosted PostgreSQL, so opening a
+connection costs a TCP and TLS handshake plus authentication. By default
+connections are kept open between requests (CONN_MAX_AGE) and checked before
+reuse (CONN_HEALTH_CHECKS). Two alternatives are supported:
+
+- DB_POOL=true uses Django's psycopg 3 connection pool; the pool keeps the
+  connections, so CONN_MAX_AGE is forced to 0.
+- DB_PGBOUNCER=true for a PgBouncer in transaction pooling mode. Server-side
+  cursors do not survive between transactions there, so they are disabled and
+  QuerySet.iterator() fetches whole results client side. PgBouncer rejects the
+  `options` startup parameter, so timeouts must be set on the database role
+  (ALTER ROLE ... SET statement_timeout = ...) instead.
+
+Environment variables:
+    DB_CONN_MAX_AGE: Seconds to keep a connection open, 0 to close after each
+                     request (default 600)
+    DB_CONN_HEALTH_CHECKS: Check persistent connections before reuse (default true)
+    DB_CONNECT_TIMEOUT: Seconds to wait for a new connection (default 10)
+    DB_SSLMODE: libpq sslmode, e.g. 'require' (default: libpq's default)
+    DB_STATEMENT_TIMEOUT: Milliseconds before a statement is cancelled, 0 for
+                          none (default 0)
+    DB_IDLE_IN_TRANSACTION_TIMEOUT: Milliseconds a session may sit idle inside
+                                    a transaction, 0 for none (default 0)
+    DB_KEEPALIVES_IDLE: Seconds of inactivity before TCP keepalives are sent,
+                        so dead persistent connections are noticed (default 60)
+    DB_POOL: Use the psycopg 3 connection pool (default false)
+    DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE: Pool size (default 2 / 10)
+    DB_POOL_TIMEOUT: Seconds to wait for a pooled connection (default 30)
+    DB_PGBOUNCER: Connect through PgBouncer in transaction mode (default false)
+    DB_REPLICA_HOST: Host of a read replica; enables the 'replica' alias
+    DB_REPLICA_NAME / DB_REPLICA_USER / DB_REPLICA_PASSWORD / DB_REPLICA_PORT:
+        Replica connection parameters (default: the primary's)
+    DB_REPLICA_PIN_SECONDS: Seconds a client reads from the primary after a
+                            write, to cover replication lag (default 10)
+"""
+
+import importlib.util
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+
+
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be an integer, got {value!r}")
+
+
+def database_settings(name, user, password, host, port):
+    """
+    Build a DATABASES entry for PostgreSQL with connection handling from the environment.
+
+    Args:
+        name, user, password, host, port: Connection parameters
+
+    Returns:
+        Dictionary for DATABASES['default']
+
+    Raises:
+        ImproperlyConfigured: If the pool is requested without psycopg 3, or
+                              timeouts are requested through PgBouncer
+    """
+    use_pool = env_bool('DB_POOL')
+    use_pgbouncer = env_bool('DB_PGBOUNCER')
+    statement_timeout = env_int('DB_STATEMENT_TIMEOUT', 0)
+    idle_timeout = env_int('DB_IDLE_IN_TRANSACTION_TIMEOUT', 0)
+
+    options = {
+        'connect_timeout': env_int('DB_CONNECT_TIMEOUT', 10),
+        'keepalives': 1,
+        'keepalives_idle': env_int('DB_KEEPALIVES_IDLE', 60),
+    }
+    if os.environ.get('DB_SSLMODE'):
+        options['sslmode'] = os.environ['DB_SSLMODE']
+
+    # Server settings applied to every new session
+    session_settings = []
+    if statement_timeout:
+        session_settings.append(f'-c statement_timeout={statement_timeout}')
+    if idle_timeout:
+        session_settings.append(f'-c idle_in_transaction_session_timeout={idle_timeout}')
+    if session_settings:
+        if use_pgbouncer:
+            raise ImproperlyConfigured(
+                "DB_STATEMENT_TIMEOUT and DB_IDLE_IN_TRANSACTION_TIMEOUT cannot be sent through "
+                "PgBouncer; set them on the database role instead"
+            )
+        options['options'] = ' '.join(session_settings)
+
+    conn_max_age = env_int('DB_CONN_MAX_AGE', 600)
+    if use_pool:
+        if importlib.util.find_spec('psycopg_pool') is None:
+            raise ImproperlyConfigured("DB_POOL requires psycopg 3 with the pool extra: pip install 'psycopg[pool]'")
+        options['pool'] = {
+            'min_size': env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': env_int('DB_POOL_TIMEOUT', 30),
+        }
+        # Pooled connections are returned to the pool, not kept per thread
+        conn_max_age = 0
+
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': name,
+        'USER': user,
+        'PASSWORD': password,
+        'HOST': host,
+        'PORT': port,
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', True),
+        'DISABLE_SERVER_SIDE_CURSORS': use_pgbouncer,
+        'OPTIONS': options,
+    }
+
+
+def replica_settings(primary):
+    """
+    Build a DATABASES entry for the read replica, if DB_REPLICA_HOST is set.
+
+    The replica uses the same connection handling as the primary. In tests
+    it mirrors the primary, so code routed to it sees the test data.
+
+    Args:
+        primary: DATABASES entry of the primary
+
+    Returns:
+        Dictionary for DATABASES['replica'], or None without a replica
+    """
+    host = os.environ.get('DB_REPLICA_HOST')
+    if not host:
+        return None
+
+    replica = database_settings(
+        name=os.environ.get('DB_REPLICA_NAME', primary['NAME']),
+        user=os.environ.get('DB_REPLICA_USER', primary['USER']),
+        password=os.environ.get('DB_REPLICA_PASSWORD', primary['PASSWORD']),
+        host=host,
+        port=os.environ.get('DB_REPLICA_PORT', primary['PORT']),
+    )
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
@@ -0,0 +1,144 @@
+# LedgerLink/db_router.py
+
+"""
+Read replica routing with read-your-writes.
+
+Nothing reads from the replica unless asked: read-heavy code paths opt in
+with replica_reads(), as a context manager or decorator. Inside it, reads go
+to settings.READ_REPLICA_ALIAS, except
+
+- reads of a model this request or task has already written, which stay on
+  the primary so code reads back what it just saved, and
+- everything while pinned to the primary, either explicitly with
+  read_from_primary() or by ReplicaPinningMiddleware for a few seconds after
+  a client's request wrote to the database, so replication lag never hides
+  a client's own changes from it.
+
+Without a replica configured every query goes to the default database.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'll_primary_pin'
+DEFAULT_PIN_SECONDS = 10
+
+_replica_reads = ContextVar('ledgerlink_replica_reads', default=False)
+_pinned = ContextVar('ledgerlink_primary_pinned', default=False)
+# Labels of the models written in the current request or task
+_written_models = ContextVar('ledgerlink_written_models', default=frozenset())
+
+
+def replica_alias():
+    """Alias of the configured read replica, or None."""
+    return getattr(settings, 'READ_REPLICA_ALIAS', None)
+
+
+@contextmanager
+def replica_reads():
+    """Send reads inside the block to the replica, subject to read-your-writes."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Keep every read inside the block on the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def routing_scope(pinned=False):
+    """
+    Fresh read-your-writes state for a request or task.
+
+    Args:
+        pinned: Keep every read inside the scope on the primary
+
+    Yields:
+        Callable returning whether anything was written inside the scope
+    """
+    pinned_token = _pinned.set(pinned)
+    written_token = _written_models.set(frozenset())
+    try:
+        yield lambda: bool(_written_models.get())
+    finally:
+        _written_models.reset(written_token)
+        _pinned.reset(pinned_token)
+
+
+def read_alias(model):
+    """
+    Database a replica read of the model should use right now.
+
+    For querysets evaluated after the current context is gone, such as the
+    body of a streaming response.
+    """
+    alias = replica_alias()
+    if alias is None or _pinned.get() or model._meta.label in _written_models.get():
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+class ReadReplicaRouter:
+    """Route opted-in reads to the read replica; writes and migrations stay on the primary."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return read_alias(model)
+        return None
+
+    def db_for_write(self, model, **hints):
+        written = _written_models.get()
+        if model._meta.label not in written:
+            _written_models.set(written | {model._meta.label})
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Give each request fresh routing state, and pin clients to the primary after writes.
+
+    A request that writes sets a short-lived cookie; while it is present the
+    client's reads skip the replica, covering the replication lag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = replica_alias() is not None and PIN_COOKIE in request.COOKIES
+        with routing_scope(pinned) as has_written:
+            response = self.get_response(request)
+            wrote = has_written()
+
+        if wrote and replica_alias() is not None:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'READ_REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,197 @@
+# LedgerLink/faceting.py
+
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Count, Max, Min, Sum
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .cache import cache_key
+from .db_router import replica_reads
+
+FACETS_NAMESPACE = 'facets'
+
+
+def _add(total, value):
+    if value is None:
+        return total
+    return value if total is None else total + value
+
+
+def _min(total, value):
+    if value is None:
+        return total
+    return value if total is None else min(total, value)
+
+
+def _max(total, value):
+    if value is None:
+        return total
+    return value if total is None else max(total, value)
+
+
+# How the per-group values of an aggregate combine into the overall value.
+# Averages and distinct counts do not combine this way, so they are rejected.
+COMBINERS = {
+    Count: _add,
+    Sum: _add,
+    Min: _min,
+    Max: _max,
+}
+
+
+def _combiner(name, aggregate):
+    combine = COMBINERS.get(type(aggregate))
+    if combine is None or getattr(aggregate, 'distinct', False):
+        raise ImproperlyConfigured(
+            f"Facet aggregate '{name}' must be a non-distinct Count, Sum, Min or Max"
+        )
+    return combine
+
+
+def _initial_counts(model, field):
+    """Zero counts for every choice of a field, so unused choices still show up."""
+    try:
+        choices = model._meta.get_field(field).choices
+    except FieldDoesNotExist:
+        choices = None
+    return {value: 0 for value, _label in choices or ()}
+
+
+def facet_counts(queryset, fields=(), aggregates=None):
+    """
+    Count rows per value of each field, plus overall aggregates, in one query.
+
+    The queryset is grouped by all fields at once. Per-field counts and the
+    aggregates are then added up from those groups, so the database does a
+    single grouped scan however many facets are requested.
+
+    Args:
+        queryset: Filtered queryset to facet
+        fields: Field names to count the values of
+        aggregates: Dictionary of name to Count, Sum, Min or Max expression
+
+    Returns:
+        Dictionary with 'total', 'facets' ({field: {value: count}}) and
+        'aggregates' ({name: value})
+    """
+    aggregates = aggregates or {}
+    combiners = {name: _combiner(name, aggregate) for name, aggregate in aggregates.items()}
+    queryset = queryset.order_by()
+
+    if not fields:
+        row = queryset.aggregate(_total=Count('pk'), **aggregates)
+        return {
+            'total': row.pop('_total'),
+            'facets': {},
+            'aggregates': row,
+        }
+
+    facets = {field: _initial_counts(queryset.model, field) for field in fields}
+    totals = dict.fromkeys(aggregates)
+    total = 0
+
+    for row in queryset.values(*fields).annotate(_count=Count('pk'), **aggregates):
+        count = row['_count']
+        total += count
+        for field in fields:
+            value = row[field]
+            facets[field][value] = facets[field].get(value, 0) + count
+        for name, combine in combiners.items():
+            totals[name] = combine(totals[name], row[name])
+
+    return {
+        'total': total,
+        'facets': facets,
+        'aggregates': totals,
+    }
+
+
+class FacetedCountsMixin:
+    """
+    Faceted counts for the filtered queryset of a viewset.
+
+    Set `facet_fields` to the fields clients may facet on and
+    `facet_aggregates` to the aggregates computed alongside. Clients pick
+    facets with `?facets=a,b` (all of them by default) on the `facets`
+    action. Results are cached for `facet_cache_timeout` seconds per set of
+    query parameters, so counts can lag writes by that long.
+    """
+    facet_fields = ()
+    facet_aggregates = {}
+    facet_cache_timeout = None
+
+    def get_facet_queryset(self):
+        """Queryset to facet; the same filters as the list endpoint."""
+        return self.get_queryset()
+
+    def get_requested_facets(self):
+        """Facet fields named in the `facets` query parameter."""
+        requested = self.request.query_params.get('facets')
+        if not requested:
+            return list(self.facet_fields)
+
+        fields = [field.strip() for field in requested.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in self.facet_fields]
+        if unknown:
+            raise ValueError(
+                f"Unknown facets: {', '.join(unknown)}. Available: {', '.join(self.facet_fields)}"
+            )
+        return fields
+
+    def get_facet_cache_key(self, fields):
+        params = sorted(
+            (name, value)
+            for name, values in self.request.query_params.lists()
+            for value in values
+        )
+        digest = hashlib.md5(repr((fields, params)).encode()).hexdigest()
+        return cache_key(FACETS_NAMESPACE, self.get_facet_queryset().model._meta.label_lower, digest)
+
+    def get_facets(self, fields=None):
+        """
+        Facet counts and aggregates for the current request.
+
+        Args:
+            fields: Fields to facet on; defaults to the requested facets
+
+        Returns:
+            Dictionary as returned by facet_counts
+        """
+        if fields is None:
+            fields = self.get_requested_facets()
+
+        key = None
+        if self.facet_cache_timeout:
+            key = self.get_facet_cache_key(fields)
+            result = cache.get(key)
+            if result is not None:
+                return result
+
+        with replica_reads():
+            result = facet_counts(self.get_facet_queryset(), fields, self.facet_aggregates)
+
+        if key is not None:
+            cache.set(key, result, self.facet_cache_timeout)
+        return result
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Get facet counts and aggregates for the current filters.
+        """
+        try:
+            data = self.get_facets()
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'data': data
+        })
@@ -0,0 +1,51 @@
+# LedgerLink/logging_handlers.py
+
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class QueuedRotatingFileHandler(QueueHandler):
+    """
+    Rotating file output written by a background thread.
+
+    Logging calls only put the record on a queue; a QueueListener thread
+    formats it and writes it to the file, so request and billing threads
+    never wait on disk I/O. Unlike QueueHandler, records are queued without
+    being formatted first, so logged arguments must not be modified after
+    the call. When the queue is full the record is written directly rather
+    than dropped.
+
+    Usable from dictConfig like RotatingFileHandler:
+
+        'class': 'LedgerLink.logging_handlers.QueuedRotatingFileHandler',
+        'filename': ..., 'maxBytes': ..., 'backupCount': ..., 'formatter': ...
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        self.target = RotatingFileHandler(
+            filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True
+        )
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens in the listener thread
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.target.handle(record)
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
@@ -0,0 +1,228 @@
+# LedgerLink/profiling.py
+
+"""
+Per-request query profiling and N+1 detection.
+
+profile_queries() wraps every database connection of the current thread and
+records each statement's SQL fingerprint and duration. QueryProfilingMiddleware
+uses it for every request when QUERY_PROFILING is on: it adds a Server-Timing
+header (database time, Python time, query count) and writes a JSON line to
+the 'LedgerLink.profiling' logger for a sample of requests, and for every
+request that repeats a statement often enough to look like an N+1 pattern.
+Streaming responses stay profiled until their body has been sent: the header,
+sent first, only counts the queries run before streaming, while the log line
+covers the whole response.
+
+assert_query_budget() gives tests the same numbers, failing when a block runs
+more queries than budgeted.
+"""
+
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# A statement repeated this many times in one request is reported as N+1
+DEFAULT_DUPLICATE_THRESHOLD = 5
+DEFAULT_SAMPLE_RATE = 0.1
+
+_PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_ROW_LIST = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement so repeats differing only in their values compare equal.
+
+    Parameters are already placeholders; IN lists and multi-row VALUES are
+    collapsed, and literal numbers and strings are replaced.
+    """
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    sql = _ROW_LIST.sub('(...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryProfile:
+    """Queries executed while profiling, with their total duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold=DEFAULT_DUPLICATE_THRESHOLD):
+        """
+        Statements repeated at least threshold times, most repeated first.
+
+        Returns:
+            List of (fingerprint, count)
+        """
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+
+@contextmanager
+def profile_queries():
+    """
+    Profile the queries run inside the block on every database connection.
+
+    Yields:
+        QueryProfile, complete once the block exits
+    """
+    profile = QueryProfile()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        yield profile
+
+
+@contextmanager
+def assert_query_budget(max_queries, max_repeats=None):
+    """
+    Fail when the block runs more queries than budgeted.
+
+    Unlike assertNumQueries, the budget is an upper bound, so tests keep
+    passing when a query is optimized away, and the failure lists the
+    statements that ran most often.
+
+    Args:
+        max_queries: Maximum number of queries
+        max_repeats: Maximum number of times any one statement may run,
+                     to catch per-row (N+1) queries; not checked when None
+
+    Raises:
+        AssertionError: If the budget is exceeded
+    """
+    with profile_queries() as profile:
+        yield profile
+
+    repeated = profile.fingerprints.most_common(5)
+    details = '\n'.join(f"  {count}x {sql}" for sql, count in repeated)
+    if profile.count > max_queries:
+        raise AssertionError(f"{profile.count} queries executed, budget is {max_queries}:\n{details}")
+    if max_repeats is not None and repeated and repeated[0][1] > max_repeats:
+        raise AssertionError(
+            f"A statement ran {repeated[0][1]} times, at most {max_repeats} allowed:\n{details}"
+        )
+
+
+class _ProfiledStream:
+    """Streaming content that keeps profiling until it is exhausted or closed."""
+
+    def __init__(self, content, on_finish):
+        self.content = iter(content)
+        self.on_finish = on_finish
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        # Called by the server once the body is sent, even if the client went away
+        if self.on_finish is not None:
+            on_finish, self.on_finish = self.on_finish, None
+            on_finish()
+
+
+class QueryProfilingMiddleware:
+    """
+    Report query counts and database time for each request.
+
+    Enabled with the QUERY_PROFILING setting. Every profiled response gets
+    a Server-Timing header; QUERY_PROFILING_SAMPLE_RATE of the requests, and
+    all requests with N+1 patterns, are logged as JSON. Streaming responses
+    are logged once their body has been sent, including its queries.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_PROFILING', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_PROFILING_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+        self.duplicate_threshold = getattr(
+            settings, 'QUERY_PROFILING_DUPLICATE_THRESHOLD', DEFAULT_DUPLICATE_THRESHOLD
+        )
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        stack = ExitStack()
+        profile = stack.enter_context(profile_queries())
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            stack.close()
+            raise
+
+        # Async streams are consumed outside this thread's connections
+        streamed = response.streaming and not response.is_async
+        if not streamed:
+            stack.close()
+
+        total = time.perf_counter() - start
+        queries = 'queries before streaming' if streamed else 'queries'
+        response['Server-Timing'] = (
+            f'db;dur={profile.duration * 1000:.1f};desc="{profile.count} {queries}", '
+            f'app;dur={max(total - profile.duration, 0) * 1000:.1f}, total;dur={total * 1000:.1f}'
+        )
+
+        if not streamed:
+            self.log(request, response, profile, total)
+            return response
+
+        def finish():
+            stack.close()
+            self.log(request, response, profile, time.perf_counter() - start, streamed=True)
+
+        response.streaming_content = _ProfiledStream(response.streaming_content, finish)
+        return response
+
+    def log(self, request, response, profile, total, streamed=False):
+        """Log the request as JSON if it is sampled or has N+1 patterns."""
+        duplicates = profile.duplicates(self.duplicate_threshold)
+        if not duplicates and random.random() >= self.sample_rate:
+            return
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.count,
+            'db_ms': round(profile.duration * 1000, 1),
+            'python_ms': round(max(total - profile.duration, 0) * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'streamed': streamed,
+            'duplicates': [{'sql': sql[:500], 'count': count} for sql, count in duplicates[:5]],
+        }
+        if duplicates:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'LedgerLink.profiling.QueryProfilingMiddleware',  # Only active with QUERY_PROFILING
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -54,6 +55,7 @@ MIDDLEWARE = [
     # Disabled for development - enable in production:
     # 'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'LedgerLink.db_router.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,37 +80,118 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'LedgerLink.wsgi.application'
 
-# Database
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+#
+# Persistent connections, pooling and timeouts are configured from the
+# environment; see LedgerLink/database.py for the variables.
 
 import sys
 
+from LedgerLink.database import database_settings, env_bool, env_int, replica_settings
+
 # Use appropriate database for the current environment
 if 'test' in sys.argv or os.environ.get('IN_DOCKER') == 'true':
     # Use environment variables or fall back to defaults for test/Docker environment
     DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.environ.get('DB_NAME', 'ledgerlink_test'),
-            'USER': os.environ.get('DB_USER', 'postgres'),
-            'PASSWORD': os.environ.get('DB_PASSWORD', 'postgres'),
-            'HOST': os.environ.get('DB_HOST', 'db'),
-            'PORT': os.environ.get('DB_PORT', '5432'),
-        }
+        'default': database_settings(
+            name=os.environ.get('DB_NAME', 'ledgerlink_test'),
+            user=os.environ.get('DB_USER', 'postgres'),
+            password=os.environ.get('DB_PASSWORD', 'postgres'),
+            host=os.environ.get('DB_HOST', 'db'),
+            port=os.environ.get('DB_PORT', '5432'),
+        )
     }
 else:
-    # Production database settings
+    # Production database settings; the password only comes from the environment,
+    # so tooling still imports the settings and only a real connection fails without it
     DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': 'postgres',
-            'USER': 'postgres',
-            'PASSWORD': 'Hassan8488$',
-            'HOST': 'db.dorunzumqoeiozqiyiux.supabase.co',
-            'PORT': '5432',
-        }
+        'default': database_settings(
+            name=os.environ.get('DB_NAME', 'postgres'),
+            user=os.environ.get('DB_USER', 'postgres'),
+            password=os.environ.get('DB_PASSWORD', ''),
+            host=os.environ.get('DB_HOST', 'db.dorunzumqoeiozqiyiux.supabase.co'),
+            port=os.environ.get('DB_PORT', '5432'),
+        )
+    }
+
+# Read replica
+# Read-heavy paths (billing scans, summaries, facet counts, exports) opt in to
+# the replica with LedgerLink.db_router.replica_reads(); see db_router.py.
+_replica = replica_settings(DATABASES['default'])
+if _replica:
+    DATABASES['replica'] = _replica
+    READ_REPLICA_ALIAS = 'replica'
+else:
+    READ_REPLICA_ALIAS = None
+READ_REPLICA_PIN_SECONDS = env_int('DB_REPLICA_PIN_SECONDS', 10)
+DATABASE_ROUTERS = ['LedgerLink.db_router.ReadReplicaRouter']
+
+# Query profiling
+# Server-Timing headers on every response and a sampled JSON log of query
+# counts, database time and repeated (N+1) statements; see LedgerLink/profiling.py.
+QUERY_PROFILING = env_bool('QUERY_PROFILING')
+QUERY_PROFILING_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILING_SAMPLE_RATE', '0.1'))
+QUERY_PROFILING_DUPLICATE_THRESHOLD = env_int('QUERY_PROFILING_DUPLICATE_THRESHOLD', 5)
+
+# Prometheus metrics at /metrics, for staff users and scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>"; open to anyone only with DEBUG on
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Billing logging
+# Per-service cost detail is logged at DEBUG; set BILLING_LOG_LEVEL=DEBUG to
+# see it. For a full step-by-step record of one order, set
+# BILLING_EXPLAIN_ORDER to its transaction ID, or BILLING_EXPLAIN_SAMPLE_RATE
+# to trace a random order in that share of runs; see billing/explain.py.
+BILLING_LOG_LEVEL = os.environ.get('BILLING_LOG_LEVEL', 'INFO').upper()
+BILLING_EXPLAIN_ORDER = os.environ.get('BILLING_EXPLAIN_ORDER') or None
+BILLING_EXPLAIN_SAMPLE_RATE = float(os.environ.get('BILLING_EXPLAIN_SAMPLE_RATE', '0'))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+#
+# Billing indexes, rule group snapshots and report progress are shared between
+# workers, so the cache must be shared too: Redis in production, a file or
+# database cache on a single machine. CACHE_BACKEND picks one of
+# 'redis', 'file', 'db', 'locmem' or 'dummy'; it defaults to Redis when
+# REDIS_URL is set, and to no caching under `manage.py test` so tests never
+# see each other's cached values.
+# The 'db' backend needs `python manage.py createcachetable` once.
+if 'test' in sys.argv:
+    _default_cache_backend = 'dummy'
+elif os.environ.get('REDIS_URL'):
+    _default_cache_backend = 'redis'
+else:
+    _default_cache_backend = 'file'
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', _default_cache_backend)
+CACHE_BACKENDS = {
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/1'),
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, '.cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'ledgerlink_cache',
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'ledgerlink'),
+        'VERSION': int(os.environ.get('CACHE_VERSION', '1')),
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', '300')),
     }
+}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -247,6 +330,7 @@ timestamp = datetime.now().strftime('%Y%m%d')
 DEBUG_LOG = os.path.join(LOGS_DIR, f'debug_{timestamp}.log')
 ERROR_LOG = os.path.join(LOGS_DIR, f'error_{timestamp}.log')
 API_LOG = os.path.join(LOGS_DIR, f'api_{timestamp}.log')
+PROFILING_LOG = os.path.join(LOGS_DIR, f'profiling_{timestamp}.log')
 
 # Logging Configuration
 LOGGING = {
@@ -261,6 +345,10 @@ LOGGING = {
             'format': '[{asctime}] [{levelname}] [{name}] Method: {message}',
             'style': '{',
         },
+        'json_lines': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'filters': {
         'require_debug_true': {
@@ -275,8 +363,9 @@ LOGGING = {
             'formatter': 'verbose',
         },
         'file_debug': {
+            # Written from a background thread so logging calls don't wait on disk
             'level': 'DEBUG',
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': 'LedgerLink.logging_handlers.QueuedRotatingFileHandler',
             'filename': DEBUG_LOG,
             'formatter': 'verbose',
             'maxBytes': 1024 * 1024 * 5,  # 5MB
@@ -299,6 +388,14 @@ LOGGING = {
             'maxBytes': 1024 * 1024 * 5,  # 5MB
             'backupCount': 5,
         },
+        'file_profiling': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': PROFILING_LOG,
+            'formatter': 'json_lines',
+            'maxBytes': 1024 * 1024 * 5,  # 5MB
+            'backupCount': 5,
+        },
     },
     'loggers': {
         'django': {
@@ -316,6 +413,17 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'LedgerLink.profiling': {
+            'handlers': ['file_profiling'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'billing.explain': {
+            # Explain traces are requested explicitly, so log them whatever BILLING_LOG_LEVEL is
+            'handlers': ['console', 'file_debug'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'api': {
             'handlers': ['console', 'file_api', 'file_error'],
             'level': 'DEBUG',
@@ -343,7 +451,7 @@ LOGGING = {
         },
         'billing': {
             'handlers': ['console', 'file_debug', 'file_error'],
-            'level': 'DEBUG',
+            'level': BILLING_LOG_LEVEL,
             'propagate': False,
         },
         'shipping': {
@@ -363,7 +471,7 @@ LOGGING['loggers']['bulk_operations'] = {
 
 LOGGING['loggers']['Billing_V2'] = {
     'handlers': ['console', 'file_debug', 'file_error'],
-    'level': 'DEBUG',
+    'level': BILLING_LOG_LEVEL,
     'propagate': False,
 }
 
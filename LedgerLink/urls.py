@@ -11,6 +11,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 from api.views.api_root import api_root
+from LedgerLink.metrics import metrics_view
 
 # Swagger/OpenAPI documentation setup
 schema_view = get_schema_view(
@@ -53,6 +54,7 @@ api_patterns = [
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('billing/', include('billing.urls')),
     path('billing-v2/', include('Billing_V2.urls')),
 
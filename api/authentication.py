@@ -5,6 +5,7 @@ from rest_framework import authentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
 from django.utils import timezone
+from LedgerLink.cache import cache_key
 from .utils import get_client_ip
 import jwt
 import logging
@@ -67,7 +68,7 @@ class CustomJWTAuthentication(JWTAuthentication):
         """
         from django.core.cache import cache
         jti = validated_token.get('jti')
-        return cache.get(f'blacklisted_token_{jti}') is not None
+        return cache.get(cache_key('auth:blacklisted_token', jti)) is not None
 
     def track_authentication(self, request, user, token):
         """
@@ -121,8 +122,8 @@ class APIKeyAuthentication(authentication.BaseAuthentication):
         """
         from django.core.cache import cache
         # Check cache first
-        cache_key = f'api_key_{api_key}'
-        if cache.get(cache_key):
+        api_key_cache_key = cache_key('auth:api_key', api_key)
+        if cache.get(api_key_cache_key):
             return True
 
         # Check database
@@ -132,7 +133,7 @@ class APIKeyAuthentication(authentication.BaseAuthentication):
 
         if valid:
             # Cache the result
-            cache.set(cache_key, True, timeout=300)  # 5 minutes
+            cache.set(api_key_cache_key, True, timeout=300)  # 5 minutes
 
         return valid
 
@@ -174,7 +175,7 @@ def blacklist_token(token):
         jti = decoded_token.get('jti')
         if jti:
             cache.set(
-                f'blacklisted_token_{jti}',
+                cache_key('auth:blacklisted_token', jti),
                 True,
                 timeout=settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
             )
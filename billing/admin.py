@@ -1,5 +1,6 @@
 # Register your models here.
 from django.contrib import admin
+from LedgerLink.paginators import EstimatedCountPaginator
 from .models import BillingReport, BillingReportDetail
 
 @admin.register(BillingReport)
@@ -8,10 +9,14 @@ class BillingReportAdmin(admin.ModelAdmin):
     list_filter = ('customer', 'generated_at')
     search_fields = ('customer__company_name',)
     date_hierarchy = 'generated_at'
+    list_select_related = ('customer',)
 
 @admin.register(BillingReportDetail)
 class BillingReportDetailAdmin(admin.ModelAdmin):
     list_display = ('report', 'order', 'total_amount')
     list_filter = ('report__customer',)
     search_fields = ('report__customer__company_name', 'order__transaction_id')
+    list_select_related = ('report__customer', 'order')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
\ No newline at end of file
@@ -5,7 +5,6 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Union, Any
 import json
-import re
 from django.core.exceptions import ValidationError
 from django.db.models import Q
 import logging
@@ -14,12 +13,16 @@ from orders.models import Order
 from customers.models import Customer
 from services.models import Service
 from rules.models import Rule, RuleGroup
+from products.sku import normalize_sku, normalize_sku_quantity as convert_sku_format, validate_sku_quantity
+from .explain import ExplainTrace, choose_explain_order
+from .money import multiply, to_cents, to_decimal
+from .report_serializer import ReportSerializer, SerializedReport
 from customer_services.models import CustomerService
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceCost:
     """
     Represents the cost details of a specific service.
@@ -40,7 +43,7 @@ class ServiceCost:
     amount: Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderCost:
     """
     Represents the cost details of an order.
@@ -62,7 +65,7 @@ class OrderCost:
     total_amount: Decimal = Decimal('0')
 
 
-@dataclass
+@dataclass(slots=True)
 class BillingReport:
     """
     Represents a billing report for a specific customer over a given time period.
@@ -95,150 +98,6 @@ class BillingReport:
     total_amount: Decimal = Decimal('0')
 
 
-def normalize_sku(sku: str) -> str:
-    """
-    Normalize a given SKU (Stock Keeping Unit) by removing hyphens and spaces,
-    converting it to uppercase, and ensuring the result is a valid string.
-    The function handles empty or invalid inputs gracefully by returning an
-    empty string.
-
-    :param sku: The SKU to normalize.
-    :type sku: str
-    :return: A normalized SKU where hyphens and spaces are removed, and all letters
-        are in uppercase. If the input is invalid or empty, returns an
-        empty string.
-    :rtype: str
-    """
-    if sku is None:
-        return ""
-    # Remove hyphens and spaces, convert to uppercase
-    try:
-        return re.sub(r'[-\s]', '', str(sku).upper())
-    except (AttributeError, TypeError):
-        return ''
-
-
-def convert_sku_format(sku_data) -> Dict:
-    """
-    Converts SKU data into a normalized dictionary format. The input SKU data can be
-    provided as a JSON-encoded string or a list of dictionaries. Each dictionary should 
-    contain two keys: 'sku' and 'quantity'. The function normalizes SKUs and aggregates 
-    quantities for duplicate SKUs. Invalid entries are logged and excluded from the result.
-
-    :param sku_data: Input SKU data that can be of type `str` (JSON-encoded) 
-        or a `list` of dictionaries, where each dictionary must include 
-        'sku' and 'quantity' keys.
-    :rtype: Dict
-    :return: A dictionary where keys are normalized SKUs and values are 
-        the aggregated quantities. Returns an empty dictionary if the input 
-        is invalid or contains errors.
-    """
-    result = {}
-    
-    if sku_data is None:
-        return result
-        
-    try:
-        if isinstance(sku_data, str):
-            data = json.loads(sku_data)
-        else:
-            data = sku_data
-            
-        if not isinstance(data, list):
-            logger.error(f"SKU data must be a list, got {type(data)}")
-            return {}
-            
-        for item in data:
-            if not isinstance(item, dict):
-                logger.error(f"Each SKU item must be a dictionary, got {type(item)}")
-                continue
-
-            if 'sku' not in item or 'quantity' not in item:
-                logger.error("SKU item missing required fields 'sku' or 'quantity'")
-                continue
-
-            # Normalize SKU format
-            sku = normalize_sku(item.get('sku'))
-            if not sku:
-                logger.error("SKU cannot be empty")
-                continue
-
-            try:
-                quantity = item.get('quantity')
-                if quantity is None:
-                    logger.error(f"Missing quantity for SKU {sku}")
-                    continue
-                    
-                # Convert to integer for tests to pass
-                quantity = int(quantity)
-            except (TypeError, ValueError):
-                logger.error(f"Invalid quantity for SKU {sku}: {item.get('quantity')}")
-                continue
-
-            if quantity <= 0:
-                logger.error(f"Invalid quantity {quantity} for SKU {sku}")
-                continue
-
-            # If the same SKU appears multiple times (with different formats),
-            # add the quantities together
-            result[sku] = result.get(sku, 0) + quantity
-
-        return result
-    except (json.JSONDecodeError, TypeError, KeyError) as e:
-        logger.error(f"Error converting SKU format: {str(e)}")
-        return {}
-
-
-def validate_sku_quantity(sku_data) -> bool:
-    """
-    Validates the SKU data to ensure that each SKU is a non-empty string and each associated
-    quantity is a positive numeric value. Allows input in stringified JSON or list format and 
-    processes it to dictionary form for validation.
-
-    :param sku_data: SKU data to be validated. It can be a stringified JSON or a list of SKUs 
-        and their quantities.
-    :type sku_data: Union[str, list]
-
-    :return: True if the SKU data is valid, otherwise False.
-    :rtype: bool
-    """
-    # Special case for test mocks with string JSON
-    if isinstance(sku_data, str) and sku_data.startswith('{') and sku_data.endswith('}'):
-        try:
-            json_data = json.loads(sku_data)
-            return isinstance(json_data, dict)
-        except json.JSONDecodeError:
-            return False
-    try:
-        if isinstance(sku_data, str):
-            sku_data = json.loads(sku_data)
-
-        if not isinstance(sku_data, list):
-            return False
-
-        # Convert to dictionary
-        sku_dict = convert_sku_format(sku_data)
-        if not sku_dict:
-            return False
-
-        # Validate the converted dictionary
-        for sku, quantity in sku_dict.items():
-            if not isinstance(sku, str) or not sku.strip():
-                return False
-
-            try:
-                qty = float(quantity)
-                if qty <= 0:
-                    return False
-            except (TypeError, ValueError):
-                return False
-
-        return True
-    except Exception as e:
-        logger.error(f"Error validating SKU quantity: {str(e)}")
-        return False
-
-
 class RuleEvaluator:
     """
     Responsible for evaluating rules and rule groups in the given context.
@@ -436,12 +295,19 @@ class BillingCalculator:
     :ivar report: The generated BillingReport object containing summarized billing details for the
         specified parameters.
     :type report: BillingReport
+    :ivar explain_order: Transaction ID of an order to write an explain trace for; defaults to the
+        BILLING_EXPLAIN_ORDER setting or sampling (see billing.explain).
+    :type explain_order: Optional[int]
     """
-    def __init__(self, customer_id: int, start_date: datetime, end_date: datetime):
+    def __init__(self, customer_id: int, start_date: datetime, end_date: datetime,
+                 explain_order: Optional[int] = None):
         self.customer_id = customer_id
         self.start_date = start_date
         self.end_date = end_date
+        self.explain_order = explain_order
         self.report = BillingReport(customer_id, start_date, end_date)
+        # Explain trace of the order being calculated, when it is the traced one
+        self._trace = None
 
     def validate_input(self) -> None:
         """Validate input parameters"""
@@ -476,13 +342,16 @@ class BillingCalculator:
                 logger.info(f"No orders found for customer {self.customer_id} in date range")
                 return self.report
 
+            explained_order = choose_explain_order(
+                [order.transaction_id for order in orders], self.explain_order
+            )
+
             # Prefetch customer services with related service and rule groups
             customer_services = CustomerService.objects.filter(
                 customer_id=self.customer_id
             ).select_related('service').prefetch_related(
                 'rulegroup_set',  # Prefetch rule groups
-                'rulegroup_set__rules',  # Prefetch rules within rule groups
-                'advanced_rules'  # Prefetch advanced rules
+                'rulegroup_set__rules'  # Prefetch rules within rule groups
             )
 
             # Get all rule groups for the customer's services in a single query
@@ -500,13 +369,25 @@ class BillingCalculator:
                         rule_groups_by_cs[rg.customer_service_id] = []
                     rule_groups_by_cs[rg.customer_service_id].append(rg)
 
+            # Running totals in integer cents, converted to Decimal on the report
+            service_totals_cents = {}
+            report_cents = 0
+
             for order in orders:
+                trace = self._trace = (
+                    ExplainTrace(order.transaction_id, 'v1')
+                    if order.transaction_id == explained_order else None
+                )
                 try:
                     order_cost = OrderCost(order_id=order.transaction_id)
                     applied_single_services = set()
+                    order_service_cents = {}
 
                     for cs in customer_services:
                         if cs.service.charge_type == 'single' and cs.service.id in applied_single_services:
+                            if trace is not None:
+                                trace.add('service_skipped', service_id=cs.service.id,
+                                          reason='single charge already applied')
                             continue
 
                         # Get rule groups for this customer service from our prefetched dictionary
@@ -521,31 +402,56 @@ class BillingCalculator:
                                     service_applies = True
                                     break
 
+                        if trace is not None:
+                            trace.add(
+                                'service_rules', service_id=cs.service.id,
+                                service_name=cs.service.service_name,
+                                rule_groups=len(rule_groups), applies=service_applies
+                            )
+
                         if service_applies:
-                            cost = self.calculate_service_cost(cs, order)
+                            cents = self.calculate_service_cost_cents(cs, order)
+                            if trace is not None:
+                                trace.add('service_cost', service_id=cs.service.id, amount=to_decimal(cents))
 
                             service_cost = ServiceCost(
                                 service_id=cs.service.id,
                                 service_name=cs.service.service_name,
-                                amount=cost
+                                amount=to_decimal(cents)
                             )
                             order_cost.service_costs.append(service_cost)
-                            order_cost.total_amount += cost
-
-                            self.report.service_totals[cs.service.id] = (
-                                    self.report.service_totals.get(cs.service.id, Decimal('0')) + cost
-                            )
+                            order_service_cents[cs.service.id] = order_service_cents.get(cs.service.id, 0) + cents
 
                             if cs.service.charge_type == 'single':
                                 applied_single_services.add(cs.service.id)
 
+                    order_cents = sum(order_service_cents.values())
+                    order_cost.total_amount = to_decimal(order_cents)
                     self.report.order_costs.append(order_cost)
-                    self.report.total_amount += order_cost.total_amount
+
+                    # Only count orders that were processed completely
+                    for service_id, cents in order_service_cents.items():
+                        service_totals_cents[service_id] = service_totals_cents.get(service_id, 0) + cents
+                    report_cents += order_cents
+
+                    if trace is not None:
+                        trace.add('order_total', amount=order_cost.total_amount)
 
                 except Exception as e:
                     logger.error(f"Error processing order {order.transaction_id}: {str(e)}")
+                    if trace is not None:
+                        trace.add('order_error', error=str(e))
                     continue
 
+                finally:
+                    self._trace = None
+                    if trace is not None:
+                        trace.emit()
+
+            self.report.service_totals = {
+                service_id: to_decimal(cents) for service_id, cents in service_totals_cents.items()
+            }
+            self.report.total_amount = to_decimal(report_cents)
             return self.report
 
         except Exception as e:
@@ -554,37 +460,52 @@ class BillingCalculator:
 
     def calculate_service_cost(self, customer_service: CustomerService, order: Order) -> Decimal:
         """Calculate the cost for a service"""
+        return to_decimal(self.calculate_service_cost_cents(customer_service, order))
+
+    def calculate_service_cost_cents(self, customer_service: CustomerService, order: Order) -> int:
+        """
+        Calculate the cost for a service in integer cents.
+
+        :param customer_service: The customer service being charged.
+        :type customer_service: CustomerService
+        :param order: The order the service applies to.
+        :type order: Order
+        :return: The cost in cents, rounded half-up where a rate is fractional.
+        :rtype: int
+        """
         try:
             if customer_service.service.charge_type == 'case_based_tier':
                 rule = customer_service.advanced_rules.first()
                 if not rule:
-                    return Decimal('0')
+                    return 0
                 
                 applies, multiplier, case_summary = RuleEvaluator.evaluate_case_based_rule(
                     rule, order
                 )
                 
                 if applies:
-                    cost = customer_service.unit_price * multiplier
-                    
-                    # Log detailed breakdown for auditing
-                    logger.info(
-                        f"Case-based calculation for Order {order.transaction_id}:\n"
-                        f"Service: {customer_service.service.service_name}\n"
-                        f"Base Price: ${customer_service.unit_price}\n"
-                        f"Multiplier: {multiplier}\n"
-                        f"Total Cost: ${cost}\n"
-                        f"Case Summary: {case_summary}"
+                    cost = multiply(to_cents(customer_service.unit_price), multiplier)
+
+                    if self._trace is not None:
+                        self._trace.add(
+                            'case_based_tier', service_name=customer_service.service.service_name,
+                            base_price=customer_service.unit_price, multiplier=multiplier,
+                            case_summary=case_summary, cost=to_decimal(cost)
+                        )
+                    logger.debug(
+                        "Case-based cost for order %s, service %s: %s x %s",
+                        order.transaction_id, customer_service.service.service_name,
+                        customer_service.unit_price, multiplier
                     )
-                    
+
                     return cost
-                return Decimal('0')
+                return 0
 
             if not customer_service.unit_price:
-                logger.warning(f"No unit price set for customer service {customer_service}")
-                return Decimal('0')
+                logger.warning("No unit price set for customer service %s", customer_service)
+                return 0
 
-            base_price = customer_service.unit_price
+            base_price = to_cents(customer_service.unit_price)
             service_name = customer_service.service.service_name.lower()
 
             # Handle SKU-specific quantity-based services
@@ -597,54 +518,41 @@ class BillingCalculator:
                     try:
                         sku_quantity = getattr(order, 'sku_quantity', None)
                         if sku_quantity is None:
-                            logger.warning(f"No sku_quantity found for order {order.transaction_id}")
-                            return Decimal('0')
+                            logger.warning("No sku_quantity found for order %s", order.transaction_id)
+                            return 0
 
                         sku_dict = convert_sku_format(sku_quantity)
                         if not sku_dict:
-                            logger.error(f"Invalid SKU quantity format for order {order.transaction_id}")
-                            return Decimal('0')
+                            logger.error("Invalid SKU quantity format for order %s", order.transaction_id)
+                            return 0
 
                         # Calculate total quantity for matching SKUs
                         matched_skus = {}
                         original_skus = {}  # Keep track of original SKU formats
-                        total_quantity = Decimal('0')
-
-                        # Log SKU matching details for debugging
-                        matching_details = []
+                        total_quantity = 0
 
                         for sku, quantity in sku_dict.items():
                             normalized_sku = normalize_sku(sku)
                             if normalized_sku in assigned_skus:
                                 matched_skus[normalized_sku] = quantity
                                 original_skus[normalized_sku] = sku  # Store original format
-                                total_quantity += Decimal(str(quantity))
-                                matching_details.append(
-                                    f"Matched: Order SKU '{sku}' with normalized form '{normalized_sku}'"
-                                )
-                            else:
-                                matching_details.append(
-                                    f"No match: Order SKU '{sku}' with normalized form '{normalized_sku}'"
-                                )
-
-                        # Detailed logging for debugging
-                        logger.info(
-                            f"SKU-specific service calculation for {service_name} "
-                            f"(Service ID: {customer_service.service.id}):\n"
-                            f"- Customer Service ID: {customer_service.id}\n"
-                            f"- Base Price: ${base_price}\n"
-                            f"- Assigned SKUs (normalized): {sorted(assigned_skus)}\n"
-                            f"- Order SKUs (original): {sorted(sku_dict.keys())}\n"
-                            f"- Matching Details:\n  " + "\n  ".join(matching_details) + "\n"
-                                                                                         f"- Matched SKUs: {matched_skus}\n"
-                                                                                         f"- Original SKU formats: {original_skus}\n"
-                                                                                         f"- Total Quantity: {total_quantity}\n"
-                                                                                         f"- Calculated Cost: ${base_price * total_quantity}"
+                                total_quantity += quantity
+
+                        if self._trace is not None:
+                            self._trace.add(
+                                'sku_match', service_name=service_name,
+                                customer_service_id=customer_service.id, base_price=to_decimal(base_price),
+                                assigned_skus=sorted(assigned_skus), order_skus=sorted(sku_dict),
+                                matched_skus=original_skus, total_quantity=total_quantity,
+                                cost=to_decimal(base_price * total_quantity)
+                            )
+                        logger.debug(
+                            "SKU-specific %s for order %s: %s of %s order SKUs matched, quantity %s",
+                            service_name, order.transaction_id, len(matched_skus), len(sku_dict), total_quantity
                         )
 
                         if not matched_skus:
-                            logger.info(f"No matching SKUs found for service {service_name} in order {order.transaction_id}")
-                            return Decimal('0')
+                            return 0
 
                         return base_price * total_quantity
 
@@ -654,7 +562,7 @@ class BillingCalculator:
                             f"{service_name} (Service ID: {customer_service.service.id}) "
                             f"in order {order.transaction_id}: {str(e)}"
                         )
-                        return Decimal('0')
+                        return 0
 
                 # Handle Pick Cost and Case Pick services
                 elif service_name in ['pick cost', 'case pick']:
@@ -676,13 +584,13 @@ class BillingCalculator:
 
                         sku_quantity = getattr(order, 'sku_quantity', None)
                         if sku_quantity is None:
-                            logger.warning(f"No sku_quantity found for order {order.transaction_id}")
-                            return Decimal('0')
+                            logger.warning("No sku_quantity found for order %s", order.transaction_id)
+                            return 0
 
                         sku_dict = convert_sku_format(sku_quantity)
                         if not sku_dict:
-                            logger.error(f"Invalid SKU quantity format for order {order.transaction_id}")
-                            return Decimal('0')
+                            logger.error("Invalid SKU quantity format for order %s", order.transaction_id)
+                            return 0
 
                         # Filter out SKUs that are assigned to quantity-based services
                         filtered_sku_dict = {
@@ -692,8 +600,8 @@ class BillingCalculator:
                         }
 
                         if not filtered_sku_dict:
-                            logger.info(f"No applicable SKUs for {service_name} after filtering")
-                            return Decimal('0')
+                            logger.debug("No applicable SKUs for %s after filtering", service_name)
+                            return 0
 
                         # Get all products in a single query
                         sku_list = list(filtered_sku_dict.keys())
@@ -706,13 +614,14 @@ class BillingCalculator:
                             )
                         }
 
-                        total_cost = Decimal('0')
-                        calculation_details = []
+                        total_cost = 0
+                        trace = self._trace
+                        calculation_details = [] if trace is not None else None
 
                         for sku, quantity in filtered_sku_dict.items():
                             product = products.get(sku)
                             if not product:
-                                logger.warning(f"Product not found for SKU {sku}")
+                                logger.warning("Product not found for SKU %s", sku)
                                 continue
 
                             case_size = None
@@ -725,128 +634,104 @@ class BillingCalculator:
                                 if case_size:
                                     cases = quantity // case_size
                                     if cases > 0:
-                                        case_cost = base_price * Decimal(str(cases))
+                                        case_cost = base_price * cases
                                         total_cost += case_cost
-                                        calculation_details.append(
-                                            f"SKU {sku}:\n"
-                                            f"  - Quantity: {quantity}\n"
-                                            f"  - Case size: {case_size}\n"
-                                            f"  - Full cases: {cases}\n"
-                                            f"  - Cost: ${case_cost}"
-                                        )
+                                        if trace is not None:
+                                            calculation_details.append({
+                                                'sku': sku, 'quantity': quantity, 'case_size': case_size,
+                                                'cases': cases, 'cost': to_decimal(case_cost),
+                                            })
                             else:  # pick cost
                                 if case_size:
                                     remaining_units = quantity % case_size
                                     if remaining_units > 0:
-                                        unit_cost = base_price * Decimal(str(remaining_units))
+                                        unit_cost = base_price * remaining_units
                                         total_cost += unit_cost
-                                        calculation_details.append(
-                                            f"SKU {sku}:\n"
-                                            f"  - Quantity: {quantity}\n"
-                                            f"  - Remaining units: {remaining_units}\n"
-                                            f"  - Cost: ${unit_cost}"
-                                        )
+                                        if trace is not None:
+                                            calculation_details.append({
+                                                'sku': sku, 'quantity': quantity, 'case_size': case_size,
+                                                'remaining_units': remaining_units, 'cost': to_decimal(unit_cost),
+                                            })
                                 else:
-                                    unit_cost = base_price * Decimal(str(quantity))
+                                    unit_cost = base_price * quantity
                                     total_cost += unit_cost
-                                    calculation_details.append(
-                                        f"SKU {sku}:\n"
-                                        f"  - Quantity: {quantity}\n"
-                                        f"  - Cost: ${unit_cost}"
-                                    )
-
-                        logger.info(
-                            f"{service_name} calculation details:\n"
-                            f"- Original SKUs: {sku_dict}\n"
-                            f"- Excluded SKUs: {excluded_skus}\n"
-                            f"- Filtered SKUs: {filtered_sku_dict}\n"
-                            f"- Calculations:\n{chr(10).join(calculation_details)}\n"
-                            f"- Total cost: ${total_cost}"
+                                    if trace is not None:
+                                        calculation_details.append({
+                                            'sku': sku, 'quantity': quantity, 'cost': to_decimal(unit_cost),
+                                        })
+
+                        if trace is not None:
+                            trace.add(
+                                'pick_cost', service_name=service_name, order_skus=sku_dict,
+                                excluded_skus=sorted(excluded_skus), calculations=calculation_details,
+                                cost=to_decimal(total_cost)
+                            )
+                        logger.debug(
+                            "%s for order %s: %s of %s SKUs charged, total %s cents",
+                            service_name, order.transaction_id, len(filtered_sku_dict), len(sku_dict), total_cost
                         )
 
                         return total_cost
 
                     except Exception as e:
                         logger.error(f"Error processing {service_name}: {str(e)}")
-                        return Decimal('0')
+                        return 0
 
                 # Handle SKU Cost service
                 elif service_name == 'sku cost':
                     try:
                         sku_quantity = getattr(order, 'sku_quantity', None)
                         if sku_quantity is None:
-                            return Decimal('0')
+                            return 0
 
                         sku_dict = convert_sku_format(sku_quantity)
                         if not sku_dict:
-                            return Decimal('0')
+                            return 0
 
                         unique_sku_count = len(sku_dict.keys())
-                        return base_price * Decimal(str(unique_sku_count))
+                        return base_price * unique_sku_count
 
                     except Exception as e:
                         logger.error(f"Error processing SKU Cost: {str(e)}")
-                        return Decimal('0')
+                        return 0
 
                 # Regular quantity-based service without specific SKUs
                 else:
                     quantity = getattr(order, 'total_item_qty', 1)
                     if quantity is None:
                         quantity = 1
-                    return base_price * Decimal(str(quantity))
+                    return base_price * quantity
 
             # Handle single charge type
             elif customer_service.service.charge_type == 'single':
                 return base_price
 
-            logger.warning(f"Unknown charge type {customer_service.service.charge_type}")
-            return Decimal('0')
+            logger.warning("Unknown charge type %s", customer_service.service.charge_type)
+            return 0
 
         except Exception as e:
             logger.error(f"Error calculating service cost: {str(e)}")
-            return Decimal('0')
+            return 0
 
-    # In billing_calculator.py, update the to_dict method
     def to_dict(self) -> dict:
         """Convert the report to a dictionary format"""
         try:
-            service_names = {}  # Create a mapping of service IDs to names
-            for oc in self.report.order_costs:
-                for sc in oc.service_costs:
-                    service_names[sc.service_id] = sc.service_name
-    
-            return {
-                'customer_id': self.report.customer_id,
-                'start_date': self.report.start_date.isoformat(),
-                'end_date': self.report.end_date.isoformat(),
-                'orders': [
-                    {
-                        'order_id': oc.order_id,
-                        'services': [
-                            {
-                                'service_id': sc.service_id,
-                                'service_name': sc.service_name,
-                                'amount': str(sc.amount)
-                            }
-                            for sc in oc.service_costs
-                        ],
-                        'total_amount': str(oc.total_amount)
-                    }
-                    for oc in self.report.order_costs
-                ],
-                'service_totals': {
-                    service_id: {
-                        'name': service_names.get(service_id, f'Service {service_id}'),
-                        'amount': str(amount)
-                    }
-                    for service_id, amount in self.report.service_totals.items()
-                },
-                'total_amount': str(self.report.total_amount)
-            }
+            return self.serialize().data
         except Exception as e:
             logger.error(f"Error converting report to dict: {str(e)}")
             raise
 
+    def serialize(self, include_orders: bool = True) -> SerializedReport:
+        """
+        Serialize the report in one pass over its orders.
+
+        :param include_orders: Keep the order dictionaries in the report data.
+        :type include_orders: bool
+        :return: Report data together with preview totals, amount sums and JSON size.
+        :rtype: SerializedReport
+        """
+        return ReportSerializer(self.report).serialize(include_orders)
+
     def to_json(self) -> str:
         """
         Convert the report to JSON format
@@ -889,6 +774,39 @@ class BillingCalculator:
             raise
 
 
+def serialize_billing_report(
+        customer_id: int,
+        start_date: Union[datetime, str],
+        end_date: Union[datetime, str],
+        include_orders: bool = True
+) -> SerializedReport:
+    """
+    Calculates a billing report and serializes it in a single pass.
+
+    :param customer_id: Identifier of the customer for whom the billing report is being generated.
+    :type customer_id: int
+    :param start_date: Start date of the report. Can be provided as a datetime object or ISO 8601 string.
+    :type start_date: Union[datetime, str]
+    :param end_date: End date of the report. Can be provided as a datetime object or ISO 8601 string.
+    :type end_date: Union[datetime, str]
+    :param include_orders: Keep the order dictionaries in the report data; without
+        them the orders are streamed from the calculated report.
+    :type include_orders: bool
+    :return: The report data together with its preview totals, amount sums and JSON size
+    :rtype: SerializedReport
+    """
+    logger.info(f"Generating report for customer {customer_id} from {start_date} to {end_date}")
+
+    if isinstance(start_date, str):
+        start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+    if isinstance(end_date, str):
+        end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+
+    calculator = BillingCalculator(customer_id, start_date, end_date)
+    calculator.generate_report()
+    return calculator.serialize(include_orders)
+
+
 def generate_billing_report(
         customer_id: int,
         start_date: Union[datetime, str],
@@ -910,18 +828,7 @@ def generate_billing_report(
     :rtype: Dict[str, Any]
     """
     try:
-        logger.info(f"Generating report for customer {customer_id} from {start_date} to {end_date}")
-
-        if isinstance(start_date, str):
-            start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        if isinstance(end_date, str):
-            end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-
-        calculator = BillingCalculator(customer_id, start_date, end_date)
-        calculator.generate_report()
-
-        # Return the dictionary representation directly
-        return calculator.to_dict()
+        return serialize_billing_report(customer_id, start_date, end_date).data
 
     except Exception as e:
         logger.error(f"Error in generate_billing_report: {str(e)}")
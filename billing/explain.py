@@ -0,0 +1,88 @@
+# billing/explain.py
+
+"""
+Explain traces: a step-by-step record of how a single order was billed.
+
+Per-order detail is too expensive to log for every order of a month-end
+run, so calculators trace at most one order per run and write the trace as
+one structured record to the 'billing.explain' logger. The traced order is
+chosen with choose_explain_order(): an explicitly requested transaction
+ID, the BILLING_EXPLAIN_ORDER setting, or, with BILLING_EXPLAIN_SAMPLE_RATE,
+a random order in that share of runs.
+
+Calculators check ``trace is not None`` before building any detail, so
+orders that are not traced pay nothing.
+"""
+
+import json
+import logging
+import random
+
+from django.conf import settings
+
+logger = logging.getLogger('billing.explain')
+
+
+class LazyJSON:
+    """Serialize a value to JSON only when a log record is actually formatted."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return json.dumps(self.value, default=str, sort_keys=True)
+
+
+class ExplainTrace:
+    """
+    Steps taken to bill one order.
+
+    :ivar transaction_id: The traced order.
+    :ivar steps: Recorded steps, each a dict with a 'step' name and its details.
+    """
+
+    def __init__(self, transaction_id, pipeline):
+        self.transaction_id = transaction_id
+        self.pipeline = pipeline
+        self.steps = []
+
+    def add(self, step, **details):
+        """Record a step; the details must not be modified afterwards."""
+        self.steps.append({'step': step, **details})
+
+    def as_dict(self):
+        return {'transaction_id': self.transaction_id, 'pipeline': self.pipeline, 'steps': self.steps}
+
+    def emit(self):
+        """Write the trace as a single structured log record."""
+        trace = self.as_dict()
+        logger.info(
+            "Billing explain for order %s: %s", self.transaction_id, LazyJSON(trace),
+            extra={'explain': trace}
+        )
+
+
+def choose_explain_order(transaction_ids, requested=None):
+    """
+    Pick the order to trace in a calculation run, if any.
+
+    :param transaction_ids: Transaction IDs of the run's orders, in processing order.
+    :param requested: Transaction ID asked for by the caller; defaults to the
+        BILLING_EXPLAIN_ORDER setting.
+    :return: A transaction ID present in the run, or None.
+    """
+    if requested is None:
+        requested = getattr(settings, 'BILLING_EXPLAIN_ORDER', None)
+    if requested is not None:
+        requested = str(requested)
+        for transaction_id in transaction_ids:
+            if str(transaction_id) == requested:
+                return transaction_id
+        return None
+
+    sample_rate = getattr(settings, 'BILLING_EXPLAIN_SAMPLE_RATE', 0)
+    if transaction_ids and sample_rate and random.random() < sample_rate:
+        return random.choice(transaction_ids)
+    return None
@@ -0,0 +1,72 @@
+"""
+Integer-cents money arithmetic for the billing calculators.
+
+Amounts are carried through the calculation loop as ``int`` cents, so
+multiplying a unit price by a quantity and summing order and service
+totals is exact and never builds a Decimal or a float. Values are
+converted to Decimal only where they are persisted or serialized.
+
+Rounding policy: anything that does not land on a whole cent (prices
+with more than two decimal places, fractional multipliers) is rounded
+once, half-up, to the cent. Totals are sums of already rounded amounts.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+CENTS = 100
+ROUNDING = ROUND_HALF_UP
+
+
+def to_cents(value):
+    """
+    Convert an amount to integer cents.
+
+    Args:
+        value: Decimal, int, float or numeric string amount (None counts as 0)
+
+    Returns:
+        Amount in cents, rounded half-up to the cent
+    """
+    if value is None:
+        return 0
+    if value.__class__ is int:
+        return value * CENTS
+    if isinstance(value, Decimal):
+        # Prices are stored with two decimal places, so this is usually exact
+        exponent = value.as_tuple().exponent
+        if isinstance(exponent, int) and exponent >= -2:
+            return int(value * CENTS)
+    elif isinstance(value, float):
+        # repr() gives the shortest string that round-trips, e.g. 0.1 -> '0.1'
+        value = repr(value)
+    return int((Decimal(value) * CENTS).to_integral_value(rounding=ROUNDING))
+
+
+def multiply(cents, factor):
+    """
+    Multiply an amount in cents by a quantity or rate.
+
+    Args:
+        cents: Amount in cents
+        factor: Integer quantity, or a Decimal/float/str rate
+
+    Returns:
+        Product in cents, rounded half-up when the factor is fractional
+    """
+    if factor.__class__ is int:
+        return cents * factor
+    if isinstance(factor, float):
+        factor = repr(factor)
+    return int((cents * Decimal(factor)).to_integral_value(rounding=ROUNDING))
+
+
+def to_decimal(cents):
+    """Convert integer cents to a Decimal with two decimal places."""
+    return Decimal(cents).scaleb(-2)
+
+
+def to_float(cents):
+    """
+    Convert integer cents to the closest float, for JSON fields that hold numbers.
+    """
+    return cents / CENTS
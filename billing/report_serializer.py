@@ -0,0 +1,247 @@
+"""
+Single-pass serialization of calculated billing reports.
+
+ReportSerializer walks a billing_calculator.BillingReport once and produces
+everything the report service needs from it: the report data dictionary,
+the preview service totals, the sums ReportDataValidator checks, and the
+exact size of the JSON document. iter_json() then streams that JSON
+order by order instead of building one large string. To keep only the
+calculated report in memory, serialize with include_orders=False and pass
+the orders to iter_json() as order_data() of each of report.order_costs;
+each order dictionary is then built just before its chunk is written.
+"""
+import json
+from dataclasses import dataclass, field
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from django.core.exceptions import ValidationError
+
+from .money import to_cents, to_float
+
+# Separators used by json.dumps() by default
+ITEM_SEPARATOR = ', '
+KEY_SEPARATOR = ': '
+
+
+def json_size(value) -> int:
+    """
+    Length of json.dumps(value) with default settings, without encoding it.
+
+    :param value: A JSON-serializable value made of dicts, lists, strings,
+        numbers, booleans and None.
+    :type value: Any
+    :return: Number of characters json.dumps() would produce.
+    :rtype: int
+    """
+    if isinstance(value, str):
+        return len(encode_basestring_ascii(value))
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, int):
+        return len(int.__repr__(value))
+    if isinstance(value, float):
+        return len(json.dumps(value))
+    if isinstance(value, dict):
+        size = 2 + (len(ITEM_SEPARATOR) * (len(value) - 1) if value else 0)
+        for key, item in value.items():
+            # Non-string keys are written as quoted JSON scalars, e.g. 5 -> "5"
+            key_size = json_size(key) if isinstance(key, str) else json_size(key) + 2
+            size += key_size + len(KEY_SEPARATOR) + json_size(item)
+        return size
+    if isinstance(value, (list, tuple)):
+        return 2 + (len(ITEM_SEPARATOR) * (len(value) - 1) if value else 0) + sum(json_size(item) for item in value)
+    return len(json.dumps(value))
+
+
+def order_data(order_cost) -> Dict[str, Any]:
+    """
+    Report data entry of one calculated order.
+
+    :param order_cost: An order of the calculated report.
+    :type order_cost: billing.billing_calculator.OrderCost
+    :return: The order ID, its services and its total amount.
+    :rtype: Dict[str, Any]
+    """
+    return {
+        'order_id': order_cost.order_id,
+        'services': [
+            {
+                'service_id': service_cost.service_id,
+                'service_name': service_cost.service_name,
+                'amount': str(service_cost.amount)
+            }
+            for service_cost in order_cost.service_costs
+        ],
+        'total_amount': str(order_cost.total_amount)
+    }
+
+
+@dataclass(slots=True)
+class SerializedReport:
+    """
+    Result of serializing a report.
+
+    :ivar data: Report dictionary, as returned by BillingCalculator.to_dict().
+        Its 'orders' list is empty when serialized with include_orders=False.
+    :type data: Dict[str, Any]
+    :ivar service_totals: Preview totals keyed by service ID, each with the
+        service name, amount and number of orders it was applied to.
+    :type service_totals: Dict[int, Dict[str, Any]]
+    :ivar json_size: Exact length of json.dumps(data), including the orders
+        even when they were not kept.
+    :type json_size: int
+    :ivar total_cents: Report total in cents.
+    :type total_cents: int
+    :ivar order_total_cents: Sum of the order totals in cents.
+    :type order_total_cents: int
+    :ivar report: The calculated report the data was built from.
+    :type report: billing.billing_calculator.BillingReport
+    """
+    data: Dict[str, Any]
+    service_totals: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    json_size: int = 0
+    total_cents: int = 0
+    order_total_cents: int = 0
+    report: Any = None
+
+    def validate(self):
+        """
+        Apply the amount checks of ReportDataValidator.validate_report_data().
+
+        The structure checks are not needed: the data was built by the serializer.
+
+        :raises ValidationError: If the total is negative or does not match
+            the sum of the order totals.
+        """
+        if self.total_cents < 0:
+            raise ValidationError("Total amount cannot be negative")
+        if self.total_cents != self.order_total_cents:
+            raise ValidationError("Order amounts do not sum up to total amount")
+
+    @property
+    def estimated_file_size(self) -> float:
+        """Same estimate as ReportFileHandler.estimate_file_size(data)."""
+        return self.json_size * 1.5
+
+
+class ReportSerializer:
+    """
+    Serialize a calculated BillingReport in a single walk over its orders.
+
+    :ivar report: The report produced by BillingCalculator.generate_report().
+    :type report: billing.billing_calculator.BillingReport
+    """
+
+    def __init__(self, report):
+        self.report = report
+
+    def serialize(self, include_orders: bool = True) -> SerializedReport:
+        """
+        Build the report data, preview totals, amount sums and JSON size together.
+
+        :param include_orders: Keep the order dictionaries in the report data.
+            Without them each order is only measured, so the data stays small
+            and the orders can be streamed from the report with iter_json().
+        :type include_orders: bool
+        :return: The serialized report.
+        :rtype: SerializedReport
+        """
+        report = self.report
+        orders = []
+        preview_totals = {}
+        preview_cents = {}
+        order_cents_sum = 0
+        orders_size = 0
+
+        order_count = 0
+
+        for order_cost in report.order_costs:
+            for service_cost in order_cost.service_costs:
+                service_id = service_cost.service_id
+                if service_id not in preview_totals:
+                    preview_totals[service_id] = {
+                        'name': service_cost.service_name,
+                        'amount': 0,
+                        'order_count': 0
+                    }
+                    preview_cents[service_id] = 0
+                preview_cents[service_id] += to_cents(service_cost.amount)
+                preview_totals[service_id]['order_count'] += 1
+
+            order = order_data(order_cost)
+            if include_orders:
+                orders.append(order)
+            order_count += 1
+            order_cents_sum += to_cents(order_cost.total_amount)
+            orders_size += json_size(order)
+
+        for service_id, totals in preview_totals.items():
+            totals['amount'] = to_float(preview_cents[service_id])
+
+        data = {
+            'customer_id': report.customer_id,
+            'start_date': report.start_date.isoformat(),
+            'end_date': report.end_date.isoformat(),
+            'orders': orders,
+            'service_totals': {
+                service_id: {
+                    'name': preview_totals[service_id]['name'] if service_id in preview_totals
+                    else f'Service {service_id}',
+                    'amount': str(amount)
+                }
+                for service_id, amount in report.service_totals.items()
+            },
+            'total_amount': str(report.total_amount)
+        }
+
+        # Everything but the orders is small; the orders were measured as they were built
+        size = json_size({**data, 'orders': []}) + orders_size
+        if order_count:
+            size += len(ITEM_SEPARATOR) * (order_count - 1)
+
+        return SerializedReport(
+            data=data,
+            service_totals=preview_totals,
+            json_size=size,
+            total_cents=to_cents(report.total_amount),
+            order_total_cents=order_cents_sum,
+            report=report
+        )
+
+
+def iter_json(data: Dict[str, Any], orders: Optional[Iterable[Dict[str, Any]]] = None) -> Iterator[str]:
+    """
+    Stream the JSON encoding of report data one order at a time.
+
+    The concatenated chunks equal json.dumps(data), with data['orders']
+    replaced by orders when they are given. Streaming only lowers peak
+    memory when the orders are produced lazily, e.g.
+    ``map(order_data, report.order_costs)``; a full data['orders'] list is
+    merely re-encoded in chunks.
+
+    :param data: Report data as produced by ReportSerializer.
+    :type data: Dict[str, Any]
+    :param orders: Order dictionaries to write instead of data['orders'].
+    :type orders: Optional[Iterable[Dict[str, Any]]]
+    :return: Iterator of JSON text chunks.
+    :rtype: Iterator[str]
+    """
+    encoder = json.JSONEncoder()
+    yield '{'
+    for index, (key, value) in enumerate(data.items()):
+        if index:
+            yield ITEM_SEPARATOR
+        yield encoder.encode(str(key)) + KEY_SEPARATOR
+        if key == 'orders':
+            yield '['
+            for order_index, order in enumerate(value if orders is None else orders):
+                if order_index:
+                    yield ITEM_SEPARATOR
+                yield encoder.encode(order)
+            yield ']'
+        else:
+            yield encoder.encode(value)
+    yield '}'
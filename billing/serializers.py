@@ -36,7 +36,7 @@ class ReportRequestSerializer(serializers.Serializer):
     start_date = serializers.DateField()
     end_date = serializers.DateField()
     output_format = serializers.ChoiceField(
-        choices=['preview', 'excel', 'pdf', 'csv'],
+        choices=['preview', 'excel', 'pdf', 'csv', 'json'],
         default='preview'
     )
 
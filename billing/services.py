@@ -2,8 +2,9 @@ from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .models import BillingReport
-from .utils import ReportDataValidator, ReportCache, ReportFileHandler, log_report_generation
-from .billing_calculator import generate_billing_report
+from .utils import ReportCache, ReportFileHandler, log_report_generation
+from .billing_calculator import serialize_billing_report
+from .report_serializer import iter_json, order_data
 import logging
 
 logger = logging.getLogger('billing')
@@ -27,16 +28,21 @@ class BillingReportService:
                     logger.info(f"Returning cached report for customer {customer_id}")
                     return cached_report
 
-            # Generate report data
-            report_data = self._generate_report_data(customer_id, start_date, end_date)
-            
+            # Generate report data; preview totals, amount sums and the JSON
+            # size are collected in the same pass. Unsaved JSON reports do not
+            # keep the order dictionaries: they are built while streaming.
+            stream_orders = output_format == 'json' and not self.user
+            serialized = self._generate_report_data(
+                customer_id, start_date, end_date, include_orders=not stream_orders
+            )
+            report_data = serialized.data
+
             # Validate report data
-            ReportDataValidator.validate_report_data(report_data)
-            
+            serialized.validate()
+
             # Check file size for non-preview formats
             if output_format != 'preview':
-                estimated_size = ReportFileHandler.estimate_file_size(report_data)
-                ReportFileHandler.validate_file_size(estimated_size)
+                ReportFileHandler.validate_file_size(serialized.estimated_file_size)
 
             # Save report (skip in development if no user)
             if self.user:
@@ -45,7 +51,7 @@ class BillingReportService:
             # Generate output based on format
             result = None
             if output_format == 'preview':
-                result = self._generate_preview(report_data)
+                result = self._generate_preview(report_data, serialized.service_totals)
                 # Cache the preview result
                 ReportCache.cache_report(
                     customer_id, start_date, end_date, result, output_format
@@ -56,6 +62,11 @@ class BillingReportService:
                 result = self._generate_pdf(report_data)
             elif output_format == 'csv':
                 result = self._generate_csv(report_data)
+            elif output_format == 'json':
+                if stream_orders:
+                    result = iter_json(report_data, map(order_data, serialized.report.order_costs))
+                else:
+                    result = iter_json(report_data)
             else:
                 raise ValidationError(f"Unsupported output format: {output_format}")
 
@@ -89,38 +100,25 @@ class BillingReportService:
             logger.error(f"Error saving report: {str(e)}")
             raise
 
-    def _generate_report_data(self, customer_id, start_date, end_date):
-        """Generate the raw report data"""
+    def _generate_report_data(self, customer_id, start_date, end_date, include_orders=True):
+        """Generate the raw report data, serialized in a single pass"""
         try:
-            report_data = generate_billing_report(
+            serialized = serialize_billing_report(
                 customer_id=customer_id,
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                include_orders=include_orders
             )
             logger.info(f"Generated report data for customer {customer_id}")
-            return report_data
+            return serialized
         except Exception as e:
             logger.error(f"Error generating report data: {str(e)}")
             raise
 
-    def _generate_preview(self, report_data):
-        """Generate preview format of the report"""
+    def _generate_preview(self, report_data, service_totals):
+        """Generate preview format of the report from the serializer's service totals"""
         try:
             orders_data = report_data.get('orders', [])
-            service_totals = {}
-
-            # Calculate service totals
-            for order in orders_data:
-                for service in order.get('services', []):
-                    service_id = service['service_id']
-                    if service_id not in service_totals:
-                        service_totals[service_id] = {
-                            'name': service['service_name'],
-                            'amount': 0,
-                            'order_count': 0
-                        }
-                    service_totals[service_id]['amount'] += float(service['amount'])
-                    service_totals[service_id]['order_count'] += 1
 
             preview = {
                 'orders': orders_data,
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from billing.billing_calculator import BillingCalculator
+from billing.explain import LazyJSON, choose_explain_order
+from customer_services.models import CustomerService
+from customers.models import Customer
+from LedgerLink.logging_handlers import QueuedRotatingFileHandler
+from orders.models import Order
+from products.models import Product
+from services.models import Service
+
+
+class ExplainTraceTests(TestCase):
+    """Only the traced order builds per-service detail; it is logged as one record."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Explain Co",
+            legal_business_name="Explain Co LLC",
+            email="explain@example.com"
+        )
+        handling = Service.objects.create(service_name="Handling", charge_type="single")
+        CustomerService.objects.create(customer=self.customer, service=handling, unit_price=Decimal('1.00'))
+        insert = Service.objects.create(service_name="Insert", charge_type="quantity")
+        insert_service = CustomerService.objects.create(
+            customer=self.customer, service=insert, unit_price=Decimal('0.25')
+        )
+        insert_service.skus.add(Product.objects.create(customer=self.customer, sku="FLYER-1"))
+        for i in range(3):
+            Order.objects.create(
+                transaction_id=91000 + i,
+                customer=self.customer,
+                reference_number=f"EXPLAIN-{i}",
+                close_date=datetime(2024, 6, 10 + i, 12, tzinfo=dt_timezone.utc),
+                sku_quantity=[{"sku": "flyer-1", "quantity": 4}, {"sku": "OTHER", "quantity": 1}],
+            )
+
+    def calculator(self, explain_order=None):
+        return BillingCalculator(
+            self.customer.id,
+            datetime(2024, 6, 1, tzinfo=dt_timezone.utc),
+            datetime(2024, 6, 30, tzinfo=dt_timezone.utc),
+            explain_order=explain_order
+        )
+
+    def test_traced_order(self):
+        with self.assertLogs('billing.explain', level='INFO') as logs:
+            report = self.calculator(explain_order=91001).generate_report()
+
+        self.assertEqual(report.total_amount, Decimal('6.00'))
+        self.assertEqual(len(logs.records), 1)
+        trace = logs.records[0].explain
+        self.assertEqual(trace['transaction_id'], 91001)
+        steps = {step['step']: step for step in trace['steps']}
+        self.assertEqual(steps['sku_match']['matched_skus'], {'FLYER1': 'FLYER1'})
+        self.assertEqual(steps['sku_match']['cost'], Decimal('1.00'))
+        self.assertEqual(steps['order_total']['amount'], Decimal('2.00'))
+        # The message serializes the same trace
+        self.assertEqual(json.loads(logs.output[0].split(': ', 1)[1])['transaction_id'], 91001)
+
+    @override_settings(BILLING_EXPLAIN_ORDER=None, BILLING_EXPLAIN_SAMPLE_RATE=0)
+    def test_untraced_run_logs_no_detail(self):
+        with self.assertNoLogs('billing.explain'):
+            with self.assertLogs('billing.billing_calculator', level='DEBUG') as logs:
+                self.calculator().generate_report()
+
+        self.assertFalse([record for record in logs.records if record.levelno > logging.DEBUG])
+        self.assertIn('1 of 2 order SKUs matched', logs.output[0])
+
+    @override_settings(BILLING_EXPLAIN_ORDER='91002', BILLING_EXPLAIN_SAMPLE_RATE=0)
+    def test_choose_explain_order(self):
+        self.assertEqual(choose_explain_order([91000, 91002]), 91002)
+        self.assertIsNone(choose_explain_order([91000]))
+        self.assertEqual(choose_explain_order([91000, 91002], requested=91000), 91000)
+        with self.settings(BILLING_EXPLAIN_ORDER=None, BILLING_EXPLAIN_SAMPLE_RATE=1):
+            self.assertIn(choose_explain_order([91000, 91002]), [91000, 91002])
+            self.assertIsNone(choose_explain_order([]))
+
+
+class LazyLoggingTests(SimpleTestCase):
+    def test_lazy_json_is_only_serialized_when_emitted(self):
+        class Unserializable:
+            def __str__(self):
+                raise AssertionError("formatted while the level is disabled")
+
+        logger = logging.getLogger('billing.test_lazy')
+        logger.setLevel(logging.INFO)
+        logger.debug("Detail %s", LazyJSON({'value': Unserializable()}))
+        self.assertEqual(str(LazyJSON({'b': Decimal('1.50'), 'a': 1})), '{"a": 1, "b": "1.50"}')
+
+    def test_queued_file_handler(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'debug.log')
+            handler = QueuedRotatingFileHandler(path, maxBytes=1024 * 1024, backupCount=1)
+            handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+            logger = logging.getLogger('billing.test_queued')
+            logger.addHandler(handler)
+            logger.propagate = False
+            try:
+                for i in range(100):
+                    logger.warning("line %s", i)
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+
+            with open(path) as log_file:
+                lines = log_file.read().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(lines[-1], 'WARNING line 99')
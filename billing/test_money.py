@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from billing.money import multiply, to_cents, to_decimal, to_float
+
+
+class MoneyTests(SimpleTestCase):
+    def test_to_cents(self):
+        self.assertEqual(to_cents(Decimal('12.34')), 1234)
+        self.assertEqual(to_cents(Decimal('12')), 1200)
+        self.assertEqual(to_cents(7), 700)
+        self.assertEqual(to_cents('2.5'), 250)
+        self.assertEqual(to_cents(None), 0)
+
+    def test_to_cents_rounds_half_up(self):
+        self.assertEqual(to_cents(Decimal('1.005')), 101)
+        self.assertEqual(to_cents(Decimal('1.004')), 100)
+        # 1.005 is 1.00499999... as a binary float; its shortest repr is used
+        self.assertEqual(to_cents(1.005), 101)
+        self.assertEqual(to_cents(0.1), 10)
+
+    def test_multiply(self):
+        self.assertEqual(multiply(1999, 3), 5997)
+        self.assertEqual(multiply(1000, Decimal('1.3335')), 1334)
+        self.assertEqual(multiply(5, 0.5), 3)
+
+    def test_conversions_back(self):
+        self.assertEqual(to_decimal(1234), Decimal('12.34'))
+        self.assertEqual(str(to_decimal(0)), '0.00')
+        self.assertEqual(to_float(30), 0.3)
+
+    def test_sums_do_not_drift(self):
+        cents = sum(to_cents(Decimal('0.10')) for _ in range(3))
+        self.assertEqual(to_float(cents), 0.3)
+        self.assertNotEqual(sum(float(Decimal('0.10')) for _ in range(3)), 0.3)
@@ -0,0 +1,92 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from billing.billing_calculator import BillingReport, OrderCost, ServiceCost
+from billing.report_serializer import ReportSerializer, iter_json, json_size, order_data
+from billing.utils import ReportDataValidator, ReportFileHandler
+
+
+def make_report():
+    orders = [
+        OrderCost(order_id=1001, service_costs=[
+            ServiceCost(1, 'Pick & Pack', Decimal('2.50')),
+            ServiceCost(2, 'Étiquette "label"', Decimal('0.10')),
+        ], total_amount=Decimal('2.60')),
+        OrderCost(order_id=1002, service_costs=[
+            ServiceCost(1, 'Pick & Pack', Decimal('2.50')),
+        ], total_amount=Decimal('2.50')),
+        OrderCost(order_id=1003),
+    ]
+    return BillingReport(
+        customer_id=7,
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 31),
+        order_costs=orders,
+        service_totals={1: Decimal('5.00'), 2: Decimal('0.10')},
+        total_amount=Decimal('5.10'),
+    )
+
+
+class ReportSerializerTests(SimpleTestCase):
+    def test_report_structures_are_slotted(self):
+        self.assertFalse(hasattr(ServiceCost(1, 'x', Decimal('1')), '__dict__'))
+        self.assertFalse(hasattr(OrderCost(order_id=1), '__dict__'))
+        self.assertFalse(hasattr(make_report(), '__dict__'))
+
+    def test_data_is_valid_and_sized_exactly(self):
+        serialized = ReportSerializer(make_report()).serialize()
+
+        ReportDataValidator.validate_report_data(serialized.data)
+        serialized.validate()
+        self.assertEqual(serialized.data['service_totals'][2], {'name': 'Étiquette "label"', 'amount': '0.10'})
+        self.assertEqual(serialized.json_size, len(json.dumps(serialized.data)))
+        self.assertEqual(serialized.estimated_file_size, ReportFileHandler.estimate_file_size(serialized.data))
+
+    def test_preview_totals(self):
+        serialized = ReportSerializer(make_report()).serialize()
+
+        self.assertEqual(serialized.service_totals, {
+            1: {'name': 'Pick & Pack', 'amount': 5.0, 'order_count': 2},
+            2: {'name': 'Étiquette "label"', 'amount': 0.1, 'order_count': 1},
+        })
+
+    def test_amount_checks_match_the_validator(self):
+        report = make_report()
+        report.total_amount = Decimal('5.11')
+        serialized = ReportSerializer(report).serialize()
+        with self.assertRaisesMessage(ValidationError, 'Order amounts do not sum up to total amount'):
+            serialized.validate()
+        with self.assertRaisesMessage(ValidationError, 'Order amounts do not sum up to total amount'):
+            ReportDataValidator.validate_report_data(serialized.data)
+
+        report = make_report()
+        report.order_costs = []
+        report.total_amount = Decimal('-1')
+        with self.assertRaisesMessage(ValidationError, 'Total amount cannot be negative'):
+            ReportSerializer(report).serialize().validate()
+
+    def test_streamed_json_matches_dumps(self):
+        for report in [make_report(), BillingReport(7, datetime(2024, 1, 1), datetime(2024, 1, 2))]:
+            data = ReportSerializer(report).serialize().data
+            with self.subTest(orders=len(data['orders'])):
+                self.assertEqual(''.join(iter_json(data)), json.dumps(data))
+
+    def test_orders_streamed_from_the_report(self):
+        report = make_report()
+        data = ReportSerializer(report).serialize().data
+        serialized = ReportSerializer(report).serialize(include_orders=False)
+
+        self.assertEqual(serialized.data['orders'], [])
+        self.assertEqual(serialized.json_size, len(json.dumps(data)))
+        serialized.validate()
+        streamed = ''.join(iter_json(serialized.data, map(order_data, serialized.report.order_costs)))
+        self.assertEqual(streamed, json.dumps(data))
+
+    def test_json_size(self):
+        for value in [{}, [], {1: None, 'a': [True, False, 1.5, -3]}, '  "q" \\', {2.5: 'x'}]:
+            with self.subTest(value=value):
+                self.assertEqual(json_size(value), len(json.dumps(value)))
@@ -1,9 +1,11 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.utils import timezone
 from decimal import Decimal, InvalidOperation
 import logging
 import json
+import time
+
+from Billing_V2.utils.instrumentation import REPORT_SECONDS, REPORTS
 
 logger = logging.getLogger('billing')
 
@@ -90,7 +92,8 @@ class ReportFileHandler:
         format_extensions = {
             'excel': 'xlsx',
             'pdf': 'pdf',
-            'csv': 'csv'
+            'csv': 'csv',
+            'json': 'json'
         }
         return format_extensions.get(format, '')
 
@@ -100,7 +103,8 @@ class ReportFileHandler:
         content_types = {
             'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             'pdf': 'application/pdf',
-            'csv': 'text/csv'
+            'csv': 'text/csv',
+            'json': 'application/json'
         }
         return content_types.get(format, 'application/octet-stream')
 
@@ -110,7 +114,8 @@ class ReportCache:
     @staticmethod
     def get_cache_key(customer_id, start_date, end_date, format='preview'):
         """Generate a cache key for the report"""
-        return f'billing_report_{customer_id}_{start_date}_{end_date}_{format}'
+        from LedgerLink.cache import cache_key
+        return cache_key('billing:report', customer_id, start_date, end_date, format)
 
     @staticmethod
     def get_cached_report(customer_id, start_date, end_date, format='preview'):
@@ -152,18 +157,22 @@ class ReportFormatter:
         return f"{service['service_name']}: {ReportFormatter.format_currency(service['amount'])}"
 
 def log_report_generation(func):
-    """Decorator to log report generation details"""
+    """Decorator to log report generation details and record them in the /metrics endpoint"""
     def wrapper(*args, **kwargs):
-        start_time = timezone.now()
+        start_time = time.perf_counter()
         logger.info(f"Starting report generation with args: {args}, kwargs: {kwargs}")
         
         try:
             result = func(*args, **kwargs)
-            duration = (timezone.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
+            REPORTS.inc(pipeline='v1', status='completed')
+            REPORT_SECONDS.observe(duration, pipeline='v1')
             logger.info(f"Report generation completed in {duration:.2f} seconds")
             return result
         except Exception as e:
-            duration = (timezone.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
+            REPORTS.inc(pipeline='v1', status='error')
+            REPORT_SECONDS.observe(duration, pipeline='v1')
             logger.error(f"Report generation failed after {duration:.2f} seconds: {str(e)}")
             raise
     
@@ -1,5 +1,5 @@
 from django.views.generic import TemplateView
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.core.exceptions import ValidationError
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.utils.decorators import method_decorator
@@ -105,10 +105,14 @@ class GenerateReportAPIView(APIView):
                 content_type = ReportFileHandler.get_content_type(output_format)
                 file_extension = ReportFileHandler.get_file_extension(output_format)
                 
-                response = HttpResponse(
-                    result.getvalue(),
-                    content_type=content_type
-                )
+                if output_format == 'json':
+                    # JSON is streamed one order at a time
+                    response = StreamingHttpResponse(result, content_type=content_type)
+                else:
+                    response = HttpResponse(
+                        result.getvalue(),
+                        content_type=content_type
+                    )
                 response['Content-Disposition'] = f'attachment; filename="billing_report.{file_extension}"'
                 return response
 
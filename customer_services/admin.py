@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.forms import ModelForm
 from .models import CustomerService
 
@@ -33,13 +34,15 @@ class CustomerServiceAdmin(admin.ModelAdmin):
     list_filter = ('service', 'customer')
     search_fields = ('customer__company_name', 'service__service_name', 'skus__sku')
     filter_horizontal = ('skus',)  # Improved interface for selecting multiple SKUs
+    list_select_related = ('customer', 'service')
 
     def sku_count(self, obj):
-        return obj.skus.count()
+        return obj._sku_count
     sku_count.short_description = 'SKU Count'
+    sku_count.admin_order_field = '_sku_count'
 
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('skus')
+        return super().get_queryset(request).annotate(_sku_count=Count('skus'))
 
     class Media:
         js = ('admin/js/customer_service_admin.js',)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Insert
+from .models import Insert, InsertMovement
 
 
 # Register your models here.
@@ -8,3 +8,20 @@ from .models import Insert
 class InsertAdmin(admin.ModelAdmin):
     list_display = ('sku', 'insert_name', 'insert_quantity', 'customer', 'created_at', 'updated_at')
     search_fields = ('sku', 'insert_name', 'customer__company_name')
+
+
+@admin.register(InsertMovement)
+class InsertMovementAdmin(admin.ModelAdmin):
+    list_display = ('insert', 'quantity_change', 'balance_after', 'reason', 'reference', 'created_at')
+    list_filter = ('reason',)
+    search_fields = ('insert__sku', 'reference')
+
+    # The ledger is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,142 @@
+# inserts/inventory.py
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import Insert, InsertMovement
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = {
+    'add': 1,
+    'subtract': -1,
+}
+
+
+class InventoryError(ValueError):
+    """A movement that cannot be applied; nothing in its batch was applied."""
+
+    def __init__(self, message, insert_ids=()):
+        super().__init__(message)
+        self.insert_ids = list(insert_ids)
+
+
+@dataclass(slots=True)
+class Movement:
+    """A quantity change for one insert."""
+    insert_id: int
+    quantity_change: int
+    reason: str = ''
+    reference: str = ''
+
+    @classmethod
+    def from_operation(cls, insert_id, quantity, operation='add', reason='', reference=''):
+        """
+        Build a movement from a positive quantity and an 'add'/'subtract' operation.
+
+        Raises:
+            InventoryError: If the quantity, operation, reason or reference is invalid
+        """
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+            raise InventoryError('Invalid quantity')
+        if operation not in OPERATIONS:
+            raise InventoryError('Invalid operation')
+        reason = reason or ''
+        reference = reference or ''
+        # Checked here so an over-long value is rejected before the batch is applied
+        for name, value in (('reason', reason), ('reference', reference)):
+            max_length = InsertMovement._meta.get_field(name).max_length
+            if not isinstance(value, str) or len(value) > max_length:
+                raise InventoryError(f'Invalid {name}: must be text of at most {max_length} characters')
+        return cls(insert_id, OPERATIONS[operation] * quantity, reason, reference)
+
+
+def apply_movements(movements):
+    """
+    Apply quantity changes to inserts atomically and record them in the ledger.
+
+    The changes are added up per insert and applied with a single UPDATE
+    that adds each net change to the stored quantity with F() expressions.
+    The same statement only matches rows whose quantity stays non-negative,
+    so concurrent pickers can never drive stock below zero or overwrite each
+    other's changes, and no row is read before it is written. If any insert
+    is missing or would go negative, the whole batch is rolled back.
+
+    Args:
+        movements: Iterable of Movement
+
+    Returns:
+        Dictionary of insert ID to its quantity after the batch
+
+    Raises:
+        InventoryError: If an insert does not exist or has insufficient quantity
+    """
+    movements = list(movements)
+    if not movements:
+        return {}
+
+    net_changes = defaultdict(int)
+    for movement in movements:
+        net_changes[movement.insert_id] += movement.quantity_change
+    insert_ids = sorted(net_changes)
+
+    change = Case(
+        *(When(pk=insert_id, then=Value(delta)) for insert_id, delta in net_changes.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+    with transaction.atomic():
+        updated = (
+            Insert.objects.filter(pk__in=insert_ids)
+            .alias(new_quantity=F('insert_quantity') + change)
+            .filter(new_quantity__gte=0)
+            .update(insert_quantity=F('insert_quantity') + change, updated_at=timezone.now())
+        )
+
+        if updated == len(insert_ids):
+            # The updated rows stay locked until commit, so this reads our own result
+            balances = dict(Insert.objects.filter(pk__in=insert_ids).values_list('pk', 'insert_quantity'))
+
+            # Running balance after each movement, ending at the stored quantity
+            running = {insert_id: balances[insert_id] - net_changes[insert_id] for insert_id in insert_ids}
+            ledger = []
+            for movement in movements:
+                running[movement.insert_id] += movement.quantity_change
+                ledger.append(InsertMovement(
+                    insert_id=movement.insert_id,
+                    quantity_change=movement.quantity_change,
+                    balance_after=running[movement.insert_id],
+                    reason=movement.reason,
+                    reference=movement.reference,
+                ))
+            InsertMovement.objects.bulk_create(ledger)
+        else:
+            # Undo the rows that did match before reporting the ones that did not
+            transaction.set_rollback(True)
+
+    if updated != len(insert_ids):
+        balances = dict(Insert.objects.filter(pk__in=insert_ids).values_list('pk', 'insert_quantity'))
+        missing = [insert_id for insert_id in insert_ids if insert_id not in balances]
+        if missing:
+            raise InventoryError(f"Insert not found: {', '.join(map(str, missing))}", missing)
+        short = [insert_id for insert_id in insert_ids if balances[insert_id] + net_changes[insert_id] < 0]
+        raise InventoryError('Insufficient quantity', short)
+
+    logger.info(f"Applied {len(movements)} insert movements to {len(insert_ids)} inserts")
+    return balances
+
+
+def apply_movement(insert_id, quantity_change, reason='', reference=''):
+    """
+    Apply a single quantity change; see apply_movements.
+
+    Returns:
+        The insert's quantity after the change
+    """
+    return apply_movements([Movement(insert_id, quantity_change, reason, reference)])[insert_id]
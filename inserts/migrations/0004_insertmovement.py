@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inserts', '0003_add_cascade_delete_fixed_fkey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InsertMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity_change', models.IntegerField()),
+                ('balance_after', models.IntegerField()),
+                ('reason', models.CharField(blank=True, max_length=50)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('insert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inserts.insert')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['insert', '-id'], name='idx_insertmovement_insert')],
+            },
+        ),
+    ]
@@ -14,3 +14,36 @@ class Insert(models.Model):
 
     def __str__(self):
         return f"{self.insert_name} ({self.sku})"
+
+
+class InsertMovement(models.Model):
+    """
+    Append-only ledger of insert inventory movements.
+
+    Rows are written by inserts/inventory.py together with the quantity
+    change they record, and are never updated or deleted afterwards.
+    """
+    insert = models.ForeignKey(Insert, on_delete=models.CASCADE, related_name='movements')
+    quantity_change = models.IntegerField()
+    # Running balance within a batch; a batch is applied only if every final balance is >= 0
+    balance_after = models.IntegerField()
+    reason = models.CharField(max_length=50, blank=True)
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['insert', '-id'], name='idx_insertmovement_insert'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Insert movements cannot be changed")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Insert movements cannot be deleted")
+
+    def __str__(self):
+        return f"{self.insert_id}: {self.quantity_change:+d} -> {self.balance_after}"
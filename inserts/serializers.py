@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Insert
+from .models import Insert, InsertMovement
 from customers.serializers import CustomerSerializer
 
 class InsertSerializer(serializers.ModelSerializer):
@@ -49,4 +49,17 @@ class InsertSerializer(serializers.ModelSerializer):
                     "This SKU is already in use for this customer."
                 )
         
-        return value.upper()
\ No newline at end of file
+        return value.upper()
+
+class InsertMovementSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the insert movement ledger (read only).
+    """
+
+    class Meta:
+        model = InsertMovement
+        fields = [
+            'id', 'insert', 'quantity_change', 'balance_after',
+            'reason', 'reference', 'created_at'
+        ]
+        read_only_fields = fields
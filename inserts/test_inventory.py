@@ -0,0 +1,105 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from customers.models import Customer
+from .inventory import InventoryError, Movement, apply_movement, apply_movements
+from .models import Insert, InsertMovement
+
+
+class InventoryMovementTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Insert Co",
+            legal_business_name="Insert Co LLC",
+            email="insert@example.com",
+        )
+        self.flyer = Insert.objects.create(sku="FLY", insert_name="Flyer", insert_quantity=10, customer=self.customer)
+        self.card = Insert.objects.create(sku="CRD", insert_name="Card", insert_quantity=3, customer=self.customer)
+
+    def test_single_movement_updates_in_sql(self):
+        # Update, read back and ledger insert, all in one savepoint
+        with self.assertNumQueries(5):
+            balance = apply_movement(self.flyer.pk, -4, reason='pick', reference='ORD-1')
+
+        self.assertEqual(balance, 6)
+        self.flyer.refresh_from_db()
+        self.assertEqual(self.flyer.insert_quantity, 6)
+
+        movement = InsertMovement.objects.get()
+        self.assertEqual((movement.quantity_change, movement.balance_after, movement.reference), (-4, 6, 'ORD-1'))
+
+    def test_stale_instance_does_not_lose_updates(self):
+        stale = Insert.objects.get(pk=self.flyer.pk)
+        apply_movement(self.flyer.pk, 5)
+        apply_movement(stale.pk, -2)
+
+        self.flyer.refresh_from_db()
+        self.assertEqual(self.flyer.insert_quantity, 13)
+
+    def test_batch_is_all_or_nothing(self):
+        balances = apply_movements([
+            Movement(self.flyer.pk, -8),
+            Movement(self.card.pk, 2),
+            Movement(self.flyer.pk, 5),
+        ])
+        self.assertEqual(balances, {self.flyer.pk: 7, self.card.pk: 5})
+        self.assertEqual(
+            list(InsertMovement.objects.filter(insert=self.flyer).order_by('id').values_list('balance_after', flat=True)),
+            [2, 7]
+        )
+
+        with self.assertRaises(InventoryError) as raised:
+            apply_movements([Movement(self.flyer.pk, -1), Movement(self.card.pk, -6)])
+        self.assertEqual(raised.exception.insert_ids, [self.card.pk])
+
+        with self.assertRaises(InventoryError) as raised:
+            apply_movements([Movement(self.flyer.pk, -1), Movement(999999, 1)])
+        self.assertEqual(raised.exception.insert_ids, [999999])
+
+        self.assertEqual(
+            dict(Insert.objects.values_list('pk', 'insert_quantity')),
+            {self.flyer.pk: 7, self.card.pk: 5}
+        )
+        self.assertEqual(InsertMovement.objects.count(), 3)
+
+    def test_ledger_is_append_only(self):
+        apply_movement(self.card.pk, 1)
+        movement = InsertMovement.objects.get()
+
+        with self.assertRaises(ValueError):
+            movement.save()
+        with self.assertRaises(ValueError):
+            movement.delete()
+
+    def test_endpoints(self):
+        url = reverse('insert-update-quantity', kwargs={'pk': self.card.pk})
+        response = self.client.post(url, {'quantity': 5, 'operation': 'subtract'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Insufficient quantity')
+
+        response = self.client.post(url, {'quantity': 2, 'operation': 'subtract', 'reason': 'pick'},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['data']['insert_quantity'], 1)
+
+        response = self.client.post(reverse('insert-movements'), {'movements': [
+            {'insert': self.flyer.pk, 'quantity': 3, 'operation': 'subtract'},
+            {'insert': self.card.pk, 'quantity': 4},
+        ]}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], [
+            {'insert': self.flyer.pk, 'insert_quantity': 7},
+            {'insert': self.card.pk, 'insert_quantity': 5},
+        ])
+
+        response = self.client.post(reverse('insert-movements'), {'movements': [
+            {'insert': self.flyer.pk, 'quantity': 1, 'operation': 'subtract'},
+            {'insert': self.card.pk, 'quantity': 1, 'reference': 'R' * 101},
+        ]}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reference', response.json()['message'])
+        response = self.client.post(url, {'quantity': 1, 'reason': 'r' * 51}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Insert.objects.get(pk=self.flyer.pk).insert_quantity, 7)
+
+        response = self.client.get(reverse('insert-history', kwargs={'pk': self.card.pk}))
+        self.assertEqual([row['quantity_change'] for row in response.json()['data']], [4, -2])
@@ -2,16 +2,21 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db.models import Q, Sum
+from LedgerLink.faceting import FacetedCountsMixin
+from .inventory import InventoryError, Movement, apply_movements
 from .models import Insert
-from .serializers import InsertSerializer
+from .serializers import InsertMovementSerializer, InsertSerializer
 
-class InsertViewSet(viewsets.ModelViewSet):
+class InsertViewSet(FacetedCountsMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling insert CRUD operations.
     Provides standard CRUD endpoints plus additional actions.
     """
     queryset = Insert.objects.all()
     serializer_class = InsertSerializer
+    facet_fields = ('customer',)
+    facet_aggregates = {'total_quantity': Sum('insert_quantity')}
+    facet_cache_timeout = 30
 
     def get_queryset(self):
         """
@@ -97,62 +102,103 @@ class InsertViewSet(viewsets.ModelViewSet):
     def update_quantity(self, request, pk=None):
         """
         Update insert quantity.
-        Expects quantity and operation ('add' or 'subtract') in request data.
+        Expects quantity and operation ('add' or 'subtract') in request data,
+        plus an optional reason and reference for the movement ledger.
+        The change is applied atomically in the database.
         """
         instance = self.get_object()
-        quantity = request.data.get('quantity')
-        operation = request.data.get('operation', 'add')
 
-        if not quantity or not isinstance(quantity, int) or quantity <= 0:
+        try:
+            movement = Movement.from_operation(
+                instance.pk,
+                request.data.get('quantity'),
+                request.data.get('operation', 'add'),
+                request.data.get('reason', ''),
+                request.data.get('reference', '')
+            )
+            apply_movements([movement])
+        except InventoryError as e:
             return Response({
                 'success': False,
-                'message': 'Invalid quantity'
+                'message': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        if operation not in ['add', 'subtract']:
+        instance.refresh_from_db()
+        serializer = self.get_serializer(instance)
+        return Response({
+            'success': True,
+            'message': f"Quantity {request.data.get('operation', 'add')}ed successfully",
+            'data': serializer.data
+        })
+
+    @action(detail=False, methods=['post'])
+    def movements(self, request):
+        """
+        Apply quantity changes to many inserts at once.
+        Expects a list of {insert, quantity, operation, reason, reference} under
+        'movements'. Either every movement is applied or none is.
+        """
+        items = request.data.get('movements')
+        if not isinstance(items, list) or not items:
             return Response({
                 'success': False,
-                'message': 'Invalid operation'
+                'message': 'movements must be a non-empty list'
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            if operation == 'add':
-                instance.insert_quantity += quantity
-            else:
-                if instance.insert_quantity < quantity:
-                    return Response({
-                        'success': False,
-                        'message': 'Insufficient quantity'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                instance.insert_quantity -= quantity
-
-            instance.save()
-            serializer = self.get_serializer(instance)
-            return Response({
-                'success': True,
-                'message': f'Quantity {operation}ed successfully',
-                'data': serializer.data
-            })
-        except Exception as e:
+            movements = []
+            for item in items:
+                if not isinstance(item, dict) or not isinstance(item.get('insert'), int):
+                    raise InventoryError('Each movement needs an insert ID')
+                movements.append(Movement.from_operation(
+                    item['insert'],
+                    item.get('quantity'),
+                    item.get('operation', 'add'),
+                    item.get('reason', ''),
+                    item.get('reference', '')
+                ))
+            balances = apply_movements(movements)
+        except InventoryError as e:
             return Response({
                 'success': False,
-                'message': str(e)
+                'message': str(e),
+                'inserts': e.insert_ids
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response({
+            'success': True,
+            'message': f'{len(movements)} movements applied',
+            'data': [
+                {'insert': insert_id, 'insert_quantity': quantity}
+                for insert_id, quantity in balances.items()
+            ]
+        })
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """
+        Get the movement ledger of an insert, newest first.
+        """
+        instance = self.get_object()
+        movements = instance.movements.all()
+        page = self.paginate_queryset(movements)
+        serializer = InsertMovementSerializer(page if page is not None else movements, many=True)
+        return Response({
+            'success': True,
+            'data': serializer.data
+        })
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
         Get insert statistics.
         """
-        total_inserts = self.get_queryset().count()
-        total_quantity = self.get_queryset().aggregate(
-            total=Sum('insert_quantity')
-        )['total'] or 0
+        facets = self.get_facets([])
         
         return Response({
             'success': True,
             'data': {
-                'total_inserts': total_inserts,
-                'total_quantity': total_quantity
+                'total_inserts': facets['total'],
+                'total_quantity': facets['aggregates']['total_quantity'] or 0
             }
         })
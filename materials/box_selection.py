@@ -0,0 +1,194 @@
+# materials/box_selection.py
+
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+
+from orders.models import Order
+from .models import BoxPrice
+
+logger = logging.getLogger(__name__)
+
+# BoxPrice dimensions are in inches; orders record their volume in cubic feet
+CUBIC_INCHES_PER_CUBIC_FOOT = 1728
+
+# Share of a box's volume that packed goods can actually fill
+DEFAULT_FILL_RATIO = 0.85
+
+
+@dataclass(frozen=True, slots=True)
+class Box:
+    id: int
+    box_type: str
+    price: Decimal
+    dimensions: tuple  # inches, largest first
+    volume: float  # cubic inches
+
+    def holds(self, dimensions):
+        """Whether an item (dimensions largest first) fits in some orientation."""
+        return all(side >= needed for side, needed in zip(self.dimensions, dimensions))
+
+
+@dataclass(frozen=True, slots=True)
+class BoxRecommendation:
+    box: Box
+    count: int = 1
+
+    @property
+    def cost(self):
+        return self.box.price * self.count
+
+    def to_dict(self):
+        return {
+            'box_id': self.box.id,
+            'box_type': self.box.box_type,
+            'count': self.count,
+            'unit_price': self.box.price,
+            'cost': self.cost,
+        }
+
+
+def _sorted_dimensions(length, width, height):
+    return tuple(sorted((float(length), float(width), float(height)), reverse=True))
+
+
+class BoxIndex:
+    """
+    Boxes sorted by volume, for picking the cheapest box that fits.
+
+    Next to the volume-sorted boxes the index keeps, for every position, the
+    cheapest box at or after it. A volume-only lookup is then a binary search
+    for the first box large enough followed by one list read, so scoring an
+    order costs O(log n) whatever the number of box types.
+    """
+
+    def __init__(self, boxes, fill_ratio=None):
+        """
+        Args:
+            boxes: Iterable of Box
+            fill_ratio: Usable share of a box's volume; defaults to
+                        settings.BOX_FILL_RATIO or DEFAULT_FILL_RATIO
+        """
+        if fill_ratio is None:
+            fill_ratio = getattr(settings, 'BOX_FILL_RATIO', DEFAULT_FILL_RATIO)
+        if not 0 < fill_ratio <= 1:
+            raise ValueError("fill_ratio must be in (0, 1]")
+        self.fill_ratio = fill_ratio
+
+        self.boxes = sorted(boxes, key=lambda box: (box.volume, box.price))
+        self.volumes = [box.volume for box in self.boxes]
+
+        cheapest = None
+        self.cheapest_from = [None] * len(self.boxes)
+        for position in range(len(self.boxes) - 1, -1, -1):
+            box = self.boxes[position]
+            # Ties on price go to the smaller box, which comes first
+            if cheapest is None or box.price <= cheapest.price:
+                cheapest = box
+            self.cheapest_from[position] = cheapest
+
+    @classmethod
+    def load(cls, fill_ratio=None):
+        """Build the index from every BoxPrice with usable dimensions, in one query."""
+        boxes = []
+        for box_id, box_type, price, length, width, height in BoxPrice.objects.values_list(
+            'id', 'box_type', 'price', 'length', 'width', 'height'
+        ):
+            dimensions = _sorted_dimensions(length, width, height)
+            if dimensions[-1] <= 0:
+                continue
+            boxes.append(Box(box_id, box_type, price, dimensions, dimensions[0] * dimensions[1] * dimensions[2]))
+        return cls(boxes, fill_ratio)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def cheapest_for_volume(self, volume):
+        """
+        Cheapest box whose usable volume holds the given volume.
+
+        Args:
+            volume: Volume to pack, in cubic inches
+
+        Returns:
+            Box, or None if no box is large enough
+        """
+        position = bisect_left(self.volumes, volume / self.fill_ratio)
+        if position == len(self.boxes):
+            return None
+        return self.cheapest_from[position]
+
+    def cheapest_for_items(self, items):
+        """
+        Cheapest box that holds every item by volume and each item by its dimensions.
+
+        Args:
+            items: Iterable of (length, width, height) in inches
+
+        Returns:
+            Box, or None if no box fits
+        """
+        needed = (0.0, 0.0, 0.0)
+        volume = 0.0
+        for length, width, height in items:
+            dimensions = _sorted_dimensions(length, width, height)
+            needed = tuple(map(max, needed, dimensions))
+            volume += dimensions[0] * dimensions[1] * dimensions[2]
+
+        position = bisect_left(self.volumes, volume / self.fill_ratio)
+        best = None
+        for box in self.boxes[position:]:
+            if box.holds(needed) and (best is None or box.price < best.price):
+                best = box
+        return best
+
+    def recommend(self, volume_cuft, packages=1):
+        """
+        Box recommendation for an order volume split over its packages.
+
+        Args:
+            volume_cuft: Order volume in cubic feet
+            packages: Number of packages the order ships in
+
+        Returns:
+            BoxRecommendation, or None without a volume or a large enough box
+        """
+        if not volume_cuft or volume_cuft <= 0:
+            return None
+        packages = packages if packages and packages > 0 else 1
+        box = self.cheapest_for_volume(float(volume_cuft) * CUBIC_INCHES_PER_CUBIC_FOOT / packages)
+        if box is None:
+            return None
+        return BoxRecommendation(box, packages)
+
+    def recommend_for_order(self, order):
+        """Box recommendation from an order's volume_cuft and packages."""
+        return self.recommend(order.volume_cuft, order.packages)
+
+
+def recommend_boxes(transaction_ids, index=None):
+    """
+    Box recommendations for many orders, with one query for the orders.
+
+    Args:
+        transaction_ids: Iterable of order transaction IDs
+        index: BoxIndex to use; loaded from BoxPrice when omitted
+
+    Returns:
+        Dictionary of transaction ID to BoxRecommendation or None, for every
+        order that exists
+    """
+    if index is None:
+        index = BoxIndex.load()
+
+    recommendations = {
+        transaction_id: index.recommend(volume_cuft, packages)
+        for transaction_id, volume_cuft, packages in Order.objects.filter(
+            transaction_id__in=list(transaction_ids)
+        ).values_list('transaction_id', 'volume_cuft', 'packages')
+    }
+    logger.info(f"Recommended boxes for {len(recommendations)} orders from {len(index)} box types")
+    return recommendations
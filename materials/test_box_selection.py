@@ -0,0 +1,99 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from customers.models import Customer
+from orders.models import Order
+from .box_selection import BoxIndex, recommend_boxes
+from .models import BoxPrice
+
+
+class BoxSelectionTests(TestCase):
+    def setUp(self):
+        # 1 cu ft, 2 cu ft and 4.5 cu ft of usable space at the default fill ratio
+        self.small = BoxPrice.objects.create(box_type="Small", price=Decimal('1.50'), length=12, width=12, height=12)
+        self.medium = BoxPrice.objects.create(box_type="Medium", price=Decimal('2.75'), length=24, width=12, height=12)
+        self.flat = BoxPrice.objects.create(box_type="Flat", price=Decimal('2.00'), length=36, width=24, height=4)
+        self.large = BoxPrice.objects.create(box_type="Large", price=Decimal('4.00'), length=24, width=18, height=18)
+        BoxPrice.objects.create(box_type="Unsized", price=Decimal('0.10'), length=0, width=0, height=0)
+
+        self.customer = Customer.objects.create(
+            company_name="Box Co",
+            legal_business_name="Box Co LLC",
+            email="box@example.com",
+        )
+
+    def order(self, transaction_id, volume_cuft, packages=1):
+        return Order.objects.create(
+            transaction_id=transaction_id,
+            customer=self.customer,
+            reference_number=f"BOX-{transaction_id}",
+            close_date=datetime(2024, 5, 10, 12, tzinfo=dt_timezone.utc),
+            volume_cuft=volume_cuft,
+            packages=packages,
+        )
+
+    def test_cheapest_box_that_fits(self):
+        with self.assertNumQueries(1):
+            index = BoxIndex.load()
+        self.assertEqual(len(index), 4)
+
+        self.assertEqual(index.recommend(Decimal('0.5')).box.id, self.small.pk)
+        # The flat box is larger than the medium one and cheaper
+        self.assertEqual(index.recommend(Decimal('1.2')).box.id, self.flat.pk)
+        self.assertEqual(index.recommend(Decimal('3')).box.id, self.large.pk)
+        self.assertIsNone(index.recommend(Decimal('10')))
+        self.assertIsNone(index.recommend(None))
+
+        # Split over packages, each package gets its own box
+        recommendation = index.recommend(Decimal('3'), packages=3)
+        self.assertEqual((recommendation.box.id, recommendation.count, recommendation.cost),
+                         (self.flat.pk, 3, Decimal('6.00')))
+
+    def test_items_must_fit_by_dimensions(self):
+        index = BoxIndex.load()
+        # Small by volume but too tall for the flat box
+        self.assertEqual(index.cheapest_for_items([(20, 10, 10)]).id, self.medium.pk)
+        self.assertEqual(index.cheapest_for_items([(30, 10, 3), (30, 10, 1)]).id, self.flat.pk)
+        self.assertIsNone(index.cheapest_for_items([(40, 1, 1)]))
+
+    def test_fill_ratio(self):
+        self.assertEqual(BoxIndex.load(fill_ratio=1).recommend(1).box.id, self.small.pk)
+        with self.assertRaises(ValueError):
+            BoxIndex([], fill_ratio=0)
+
+    def test_batch_recommendations(self):
+        self.order(91000, Decimal('0.5'))
+        self.order(91001, Decimal('20'))
+        index = BoxIndex.load()
+
+        with self.assertNumQueries(1):
+            recommendations = recommend_boxes([91000, 91001, 99999], index)
+
+        self.assertEqual(recommendations[91000].box.id, self.small.pk)
+        self.assertIsNone(recommendations[91001])
+        self.assertNotIn(99999, recommendations)
+
+    def test_recommend_endpoint(self):
+        self.order(91000, Decimal('3'), packages=3)
+        user = User.objects.create_user(username='boxer', password='secret')
+        self.client.force_login(user)
+
+        response = self.client.post(reverse('boxprice-recommend'), {
+            'orders': [91000],
+            'items': [{'volume_cuft': 0.5}, {'dimensions': [20, 10, 10]}, {'volume_cuft': 50}],
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['orders']['91000']['box_type'], 'Flat')
+        self.assertEqual(data['orders']['91000']['count'], 3)
+        self.assertEqual([item and item['box_type'] for item in data['items']], ['Small', 'Medium', None])
+
+        response = self.client.post(reverse('boxprice-recommend'), {'items': [{'size': 1}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -1,8 +1,16 @@
-from rest_framework import viewsets
+import logging
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .box_selection import CUBIC_INCHES_PER_CUBIC_FOOT, BoxIndex, recommend_boxes
 from .models import Material, BoxPrice
 from .serializers import MaterialSerializer, BoxPriceSerializer
 
+logger = logging.getLogger(__name__)
+
+
 class MaterialViewSet(viewsets.ModelViewSet):
     queryset = Material.objects.all()
     serializer_class = MaterialSerializer
@@ -12,3 +20,69 @@ class BoxPriceViewSet(viewsets.ModelViewSet):
     queryset = BoxPrice.objects.all()
     serializer_class = BoxPriceSerializer
     permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'])
+    def recommend(self, request):
+        """
+        Recommend the cheapest boxes for a batch of orders and/or items.
+
+        Body:
+            orders: List of order transaction IDs, sized from volume_cuft/packages
+            items: List of {"volume_cuft": n} or {"dimensions": [l, w, h]} (inches)
+        """
+        transaction_ids = request.data.get('orders') or []
+        items = request.data.get('items') or []
+        if not isinstance(transaction_ids, list) or not isinstance(items, list):
+            return Response({
+                'success': False,
+                'message': 'orders and items must be lists'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not transaction_ids and not items:
+            return Response({
+                'success': False,
+                'message': 'Provide orders or items'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            index = BoxIndex.load()
+
+            item_results = []
+            for item in items:
+                if not isinstance(item, dict):
+                    raise ValueError('Each item must be an object')
+                if 'dimensions' in item:
+                    dimensions = item['dimensions']
+                    if not isinstance(dimensions, list) or len(dimensions) != 3:
+                        raise ValueError('dimensions must be [length, width, height]')
+                    box = index.cheapest_for_items([tuple(float(side) for side in dimensions)])
+                else:
+                    box = index.cheapest_for_volume(float(item['volume_cuft']) * CUBIC_INCHES_PER_CUBIC_FOOT)
+                item_results.append(None if box is None else {
+                    'box_id': box.id,
+                    'box_type': box.box_type,
+                    'price': box.price,
+                })
+
+            order_results = {
+                transaction_id: None if recommendation is None else recommendation.to_dict()
+                for transaction_id, recommendation in recommend_boxes(transaction_ids, index).items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            return Response({
+                'success': False,
+                'message': f"Invalid request: {str(e)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error recommending boxes: {str(e)}")
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({
+            'success': True,
+            'data': {
+                'orders': order_results,
+                'items': item_results,
+            }
+        })
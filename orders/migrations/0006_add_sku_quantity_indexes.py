@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('orders', '0005_create_sku_view'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            # Normalized SKU keys of an order, matching orders.models.normalized_sku_keys().
+            # Accepts {"SKU": qty} and [{"sku": ..., "quantity": ...}] (optionally JSON-encoded)
+            # and returns NULL for anything else so invalid rows never match.
+            sql=r"""
+            CREATE OR REPLACE FUNCTION orders_normalized_skus(data jsonb)
+            RETURNS text[] AS $$
+            DECLARE
+                skus text[];
+            BEGIN
+                IF jsonb_typeof(data) = 'string' THEN
+                    BEGIN
+                        data := (data #>> '{}')::jsonb;
+                    EXCEPTION WHEN others THEN
+                        RETURN NULL;
+                    END;
+                END IF;
+
+                IF jsonb_typeof(data) = 'object' THEN
+                    IF EXISTS (
+                        SELECT 1 FROM jsonb_each(data) AS item
+                        WHERE jsonb_typeof(item.value) NOT IN ('number', 'boolean')
+                    ) THEN
+                        RETURN NULL;
+                    END IF;
+                    SELECT array_agg(DISTINCT upper(btrim(key, E' \t\n\r\f\v')))
+                    INTO skus
+                    FROM jsonb_object_keys(data) AS key;
+                ELSIF jsonb_typeof(data) = 'array' THEN
+                    IF EXISTS (
+                        SELECT 1 FROM jsonb_array_elements(data) AS item
+                        WHERE jsonb_typeof(item) <> 'object'
+                           OR NOT item ? 'sku'
+                           OR coalesce(jsonb_typeof(item -> 'quantity'), '') NOT IN ('number', 'boolean')
+                    ) THEN
+                        RETURN NULL;
+                    END IF;
+                    SELECT array_agg(DISTINCT upper(btrim(coalesce(item ->> 'sku', 'None'), E' \t\n\r\f\v')))
+                    INTO skus
+                    FROM jsonb_array_elements(data) AS item;
+                ELSE
+                    RETURN NULL;
+                END IF;
+
+                RETURN coalesce(skus, '{}'::text[]);
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS orders_normalized_skus(jsonb);"
+        ),
+        migrations.RunSQL(
+            # Serves with_any_skus/with_all_skus/with_only_skus and sku_quantity rules
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_order_normalized_skus
+            ON orders_order USING gin (orders_normalized_skus(sku_quantity));
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_order_normalized_skus;"
+        ),
+        # Raw containment lookups such as sku_quantity__contains use the existing
+        # idx_orders_sku_quantity GIN index from 0002_create_materialized_sku_view.
+    ]
@@ -0,0 +1,58 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('customers', '0003_alter_customer_id'),
+        ('orders', '0006_add_sku_quantity_indexes'),
+    ]
+
+    operations = [
+        # Build the composite indexes first so customer lookups stay indexed throughout
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(
+                fields=['customer', 'close_date'],
+                include=['transaction_id', 'weight_lb', 'line_items', 'total_item_qty', 'volume_cuft', 'packages', 'status'],
+                name='idx_order_customer_close_date',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['customer', 'status'], name='idx_order_customer_status'),
+        ),
+        # customer_id alone is a prefix of both composites; transaction_id is the primary key
+        migrations.RunSQL(
+            sql='''
+            DROP INDEX CONCURRENTLY IF EXISTS idx_order_customer_id;
+            ''',
+            reverse_sql='''
+            CREATE INDEX IF NOT EXISTS idx_order_customer_id
+            ON orders_order(customer_id);
+            '''
+        ),
+        migrations.RunSQL(
+            sql='''
+            DROP INDEX CONCURRENTLY IF EXISTS idx_order_transaction_id;
+            ''',
+            reverse_sql='''
+            CREATE INDEX IF NOT EXISTS idx_order_transaction_id
+            ON orders_order(transaction_id);
+            '''
+        ),
+        # Drops the foreign key's own single-column index for the same reason
+        migrations.AlterField(
+            model_name='order',
+            name='customer',
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to='customers.customer',
+            ),
+        ),
+    ]
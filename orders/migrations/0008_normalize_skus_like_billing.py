@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# orders_normalized_skus() from 0006 with the SKU normalization as a parameter
+FUNCTION_SQL = r"""
+CREATE OR REPLACE FUNCTION orders_normalized_skus(data jsonb)
+RETURNS text[] AS $$
+DECLARE
+    skus text[];
+BEGIN
+    IF jsonb_typeof(data) = 'string' THEN
+        BEGIN
+            data := (data #>> '{}')::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+    END IF;
+
+    IF jsonb_typeof(data) = 'object' THEN
+        IF EXISTS (
+            SELECT 1 FROM jsonb_each(data) AS item
+            WHERE jsonb_typeof(item.value) NOT IN ('number', 'boolean')
+        ) THEN
+            RETURN NULL;
+        END IF;
+        SELECT array_agg(DISTINCT %(key)s)
+        INTO skus
+        FROM jsonb_object_keys(data) AS key;
+    ELSIF jsonb_typeof(data) = 'array' THEN
+        IF EXISTS (
+            SELECT 1 FROM jsonb_array_elements(data) AS item
+            WHERE jsonb_typeof(item) <> 'object'
+               OR NOT item ? 'sku'
+               OR coalesce(jsonb_typeof(item -> 'quantity'), '') NOT IN ('number', 'boolean')
+        ) THEN
+            RETURN NULL;
+        END IF;
+        SELECT array_agg(DISTINCT %(item)s)
+        INTO skus
+        FROM jsonb_array_elements(data) AS item;
+    ELSE
+        RETURN NULL;
+    END IF;
+
+    RETURN coalesce(skus, '{}'::text[]);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+"""
+
+# products.sku.normalize_sku(): upper-case, then drop hyphens and whitespace (SKU_STRIP_CHARS)
+STRIP_CHARS = (
+    r"E'-\t\n\u000b\f\r\u001c\u001d\u001e\u001f \u0085\u00a0\u1680"
+    r"\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    r"\u2028\u2029\u202f\u205f\u3000'"
+)
+NORMALIZED = FUNCTION_SQL % {
+    'key': f"translate(upper(key), {STRIP_CHARS}, '')",
+    # A JSON null SKU normalizes to '' like None does in Python
+    'item': f"translate(upper(coalesce(item ->> 'sku', '')), {STRIP_CHARS}, '')",
+}
+PREVIOUS = FUNCTION_SQL % {
+    'key': r"upper(btrim(key, E' \t\n\r\f\v'))",
+    'item': r"upper(btrim(coalesce(item ->> 'sku', 'None'), E' \t\n\r\f\v'))",
+}
+REINDEX_SQL = "REINDEX INDEX CONCURRENTLY idx_order_normalized_skus;"
+
+
+class Migration(migrations.Migration):
+    # REINDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('orders', '0007_order_billing_period_indexes'),
+    ]
+
+    operations = [
+        # The function is IMMUTABLE, so the expression index must be rebuilt
+        # whenever its definition changes
+        migrations.RunSQL(sql=NORMALIZED, reverse_sql=[PREVIOUS, REINDEX_SQL]),
+        migrations.RunSQL(sql=REINDEX_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('orders', '0008_normalize_skus_like_billing'),
+    ]
+
+    operations = [
+        # idx_order_reference_number is already created by 0002_add_order_search_indexes;
+        # only record it in the model state so Meta.indexes and migrations agree.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='order',
+                    index=models.Index(fields=['reference_number'], name='idx_order_reference_number'),
+                ),
+            ],
+        ),
+    ]
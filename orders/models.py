@@ -1,7 +1,73 @@
 # orders/models.py
 
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.lookups import ContainedBy, DataContains, Overlap
+from django.db import connections, models
 from customers.models import Customer
+from products.sku import normalize_skus, normalized_sku_keys
+
+
+class NormalizedSkus(models.Func):
+    """Normalized SKU keys of a sku_quantity column; matches the GIN expression index."""
+    function = 'orders_normalized_skus'
+    output_field = ArrayField(models.TextField())
+
+
+class OrderQuerySet(models.QuerySet):
+    """
+    SKU lookups over Order.sku_quantity.
+
+    On PostgreSQL these use the GIN index on orders_normalized_skus(sku_quantity);
+    other backends fall back to filtering in Python.
+    """
+
+    def _sku_array(self, skus):
+        return models.Value(sorted(normalize_skus(skus)),
+                            output_field=ArrayField(models.TextField()))
+
+    def _filter_skus_in_python(self, predicate):
+        matching = [
+            transaction_id
+            for transaction_id, sku_quantity in self.values_list('transaction_id', 'sku_quantity')
+            if (keys := normalized_sku_keys(sku_quantity)) is not None and predicate(keys)
+        ]
+        return self.filter(transaction_id__in=matching)
+
+    def with_any_skus(self, skus):
+        """Orders containing at least one of the given SKUs."""
+        skus = list(skus)
+        if not skus:
+            return self.none()
+        if self._is_postgresql():
+            return self.filter(Overlap(NormalizedSkus('sku_quantity'), self._sku_array(skus)))
+        wanted = normalize_skus(skus)
+        return self._filter_skus_in_python(lambda keys: not keys.isdisjoint(wanted))
+
+    def with_all_skus(self, skus):
+        """Orders containing every one of the given SKUs."""
+        skus = list(skus)
+        if not skus:
+            return self.none()
+        if self._is_postgresql():
+            return self.filter(DataContains(NormalizedSkus('sku_quantity'), self._sku_array(skus)))
+        wanted = normalize_skus(skus)
+        return self._filter_skus_in_python(lambda keys: wanted <= keys)
+
+    def with_only_skus(self, skus):
+        """Orders with at least one SKU, all of which are among the given SKUs."""
+        skus = list(skus)
+        if not skus:
+            return self.none()
+        if self._is_postgresql():
+            return self.filter(
+                ContainedBy(NormalizedSkus('sku_quantity'), self._sku_array(skus)),
+                Overlap(NormalizedSkus('sku_quantity'), self._sku_array(skus)),
+            )
+        wanted = normalize_skus(skus)
+        return self._filter_skus_in_python(lambda keys: keys and keys <= wanted)
+
+    def _is_postgresql(self):
+        return connections[self.db].vendor == 'postgresql'
 
 
 class Order(models.Model):
@@ -18,7 +84,8 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     transaction_id = models.IntegerField(primary_key=True)  # Externally assigned
-    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    # Indexed through the composite indexes below, which lead with customer_id
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, db_index=False)
     close_date = models.DateTimeField(blank=True, null=True)
     reference_number = models.CharField(max_length=100)
     ship_to_name = models.CharField(max_length=100, blank=True, null=True)
@@ -47,6 +114,22 @@ class Order(models.Model):
         choices=PRIORITY_CHOICES,
         default='medium'
     )
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Billing period scans: customer + close_date range, ordered by close_date.
+            # INCLUDE lets the calculators read these columns from the index alone.
+            models.Index(
+                fields=['customer', 'close_date'],
+                include=['transaction_id', 'weight_lb', 'line_items', 'total_item_qty', 'volume_cuft', 'packages', 'status'],
+                name='idx_order_customer_close_date',
+            ),
+            models.Index(fields=['customer', 'status'], name='idx_order_customer_status'),
+            # Carrier invoice reconciliation matches lines by reference number
+            models.Index(fields=['reference_number'], name='idx_order_reference_number'),
+        ]
     
     def save(self, *args, **kwargs):
         # Validate status choice
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Avg, Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from customers.models import Customer
+from inserts.models import Insert
+from shipping.models import USShipping
+from LedgerLink.faceting import facet_counts
+from .models import Order
+
+# A cache of their own, so cached values never leak into other tests
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-facets',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FacetedCountsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(
+            company_name="Facet Co",
+            legal_business_name="Facet Co LLC",
+            email="facet@example.com",
+        )
+        rows = [
+            (9001, 'draft', 'low'),
+            (9002, 'draft', 'high'),
+            (9003, 'submitted', 'high'),
+        ]
+        for transaction_id, status, priority in rows:
+            Order.objects.create(
+                transaction_id=transaction_id,
+                customer=self.customer,
+                reference_number=f"FACET-{transaction_id}",
+                status=status,
+                priority=priority,
+            )
+        for quantity in (5, 7):
+            Insert.objects.create(sku="INS", insert_name="Flyer", insert_quantity=quantity, customer=self.customer)
+
+    def test_facet_counts_single_query(self):
+        with self.assertNumQueries(1):
+            result = facet_counts(Order.objects.all(), ['status', 'priority'])
+
+        self.assertEqual(result['total'], 3)
+        self.assertEqual(result['facets']['status']['draft'], 2)
+        self.assertEqual(result['facets']['status']['shipped'], 0)
+        self.assertEqual(result['facets']['priority'], {'low': 1, 'medium': 0, 'high': 2})
+
+        with self.assertRaises(ImproperlyConfigured):
+            facet_counts(Insert.objects.all(), ['customer'], {'avg': Avg('insert_quantity')})
+
+    def test_aggregates_combine_across_groups(self):
+        result = facet_counts(Insert.objects.all(), ['insert_quantity'], {'total': Sum('insert_quantity')})
+        self.assertEqual(result['aggregates'], {'total': 12})
+        self.assertEqual(facet_counts(Insert.objects.none(), (), {'total': Sum('insert_quantity')})['total'], 0)
+
+    def test_status_counts_endpoint(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-status-counts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['draft'], 2)
+        self.assertEqual(response.json()['data']['cancelled'], 0)
+
+        # Served from the cache until it expires
+        with self.assertNumQueries(0):
+            self.client.get(reverse('order-status-counts'))
+
+    def test_facets_endpoint(self):
+        response = self.client.get(reverse('order-facets'), {'facets': 'priority', 'status': 'draft'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(list(data['facets']), ['priority'])
+        self.assertEqual(data['facets']['priority']['high'], 1)
+
+        response = self.client.get(reverse('order-facets'), {'facets': 'ship_to_name'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_insert_stats_endpoint(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('insert-stats'))
+        self.assertEqual(response.json()['data'], {'total_inserts': 2, 'total_quantity': 12})
+
+    def test_shipping_statuses_endpoint(self):
+        rows = [
+            (9001, 'Delivered', 'On time'),
+            (9002, 'In transit', None),
+            (9003, 'Delivered', 'Late'),
+        ]
+        for transaction_id, current_status, delivery_status in rows:
+            USShipping.objects.create(
+                transaction_id=transaction_id,
+                customer=self.customer,
+                current_status=current_status,
+                delivery_status=delivery_status,
+            )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('usshipping-statuses'))
+        data = response.json()['data']
+        self.assertEqual(data['current_statuses'], ['Delivered', 'In transit'])
+        self.assertEqual(data['delivery_statuses'], ['Late', 'On time'])
+        self.assertEqual(data['counts']['current_status'], {'Delivered': 2, 'In transit': 1})
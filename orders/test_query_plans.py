@@ -0,0 +1,87 @@
+import json
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from .models import Order
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans are PostgreSQL specific')
+class OrderQueryPlanTests(TestCase):
+    """
+    Regression tests for the access paths the billing calculators depend on.
+
+    Sequential scans are disabled so the assertions check that a suitable
+    index exists and matches the query, independent of table statistics.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            company_name="Plan Co",
+            legal_business_name="Plan Co LLC",
+            email="plan@example.com",
+        )
+        now = timezone.now()
+        Order.objects.bulk_create([
+            Order(
+                transaction_id=60000 + i,
+                customer=cls.customer,
+                reference_number=f"PLAN-{i}",
+                close_date=now - timedelta(hours=i),
+                status='shipped' if i % 2 else 'delivered',
+            )
+            for i in range(200)
+        ])
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE orders_order')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def plan_indexes(self, queryset):
+        """Return the set of index names used anywhere in the plan."""
+        plan = json.loads(queryset.explain(format='json'))
+        indexes = set()
+        nodes = [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if 'Index Name' in node:
+                indexes.add(node['Index Name'])
+            nodes.extend(node.get('Plans', []))
+        return indexes
+
+    def period(self):
+        end = timezone.now()
+        return end - timedelta(days=3), end
+
+    def test_billing_period_scan_uses_composite_index(self):
+        start, end = self.period()
+        queryset = Order.objects.filter(
+            customer_id=self.customer.id,
+            close_date__gte=start,
+            close_date__lte=end,
+        ).order_by('close_date')
+        self.assertIn('idx_order_customer_close_date', self.plan_indexes(queryset))
+
+    def test_billing_period_range_scan_uses_composite_index(self):
+        start, end = self.period()
+        queryset = Order.objects.filter(
+            customer_id=self.customer.id,
+            close_date__range=(start, end),
+        ).values_list('transaction_id', 'weight_lb', 'total_item_qty')
+        self.assertIn('idx_order_customer_close_date', self.plan_indexes(queryset))
+
+    def test_status_filter_uses_customer_status_index(self):
+        queryset = Order.objects.filter(customer_id=self.customer.id, status='shipped')
+        self.assertIn('idx_order_customer_status', self.plan_indexes(queryset))
+
+    def test_customer_lookup_uses_a_composite_index(self):
+        queryset = Order.objects.filter(customer_id=self.customer.id)
+        self.assertTrue(self.plan_indexes(queryset) & {
+            'idx_order_customer_close_date', 'idx_order_customer_status'
+        })
@@ -0,0 +1,90 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from customers.models import Customer
+from LedgerLink.db_router import (
+    PIN_COOKIE,
+    ReadReplicaRouter,
+    ReplicaPinningMiddleware,
+    read_alias,
+    read_from_primary,
+    replica_reads,
+    routing_scope,
+)
+from .models import Order
+
+
+@override_settings(READ_REPLICA_ALIAS='replica')
+class ReadReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+
+    def test_reads_opt_in_to_the_replica(self):
+        with routing_scope():
+            self.assertIsNone(self.router.db_for_read(Order))
+            with replica_reads():
+                self.assertEqual(self.router.db_for_read(Order), 'replica')
+                with read_from_primary():
+                    self.assertEqual(self.router.db_for_read(Order), 'default')
+
+    def test_written_models_are_read_from_the_primary(self):
+        with routing_scope(), replica_reads():
+            self.assertEqual(self.router.db_for_write(Order), 'default')
+            self.assertEqual(self.router.db_for_read(Order), 'default')
+            self.assertEqual(self.router.db_for_read(Customer), 'replica')
+            self.assertEqual(read_alias(Customer), 'replica')
+
+        # A new scope starts without writes
+        with routing_scope(), replica_reads():
+            self.assertEqual(self.router.db_for_read(Order), 'replica')
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'orders'))
+        self.assertIsNone(self.router.allow_migrate('default', 'orders'))
+
+    @override_settings(READ_REPLICA_ALIAS=None)
+    def test_without_replica_everything_uses_default(self):
+        with routing_scope(), replica_reads():
+            self.assertEqual(self.router.db_for_read(Order), 'default')
+
+    def test_middleware_pins_clients_after_writes(self):
+        router = self.router
+
+        def view(request):
+            if request.method == 'POST':
+                router.db_for_write(Order)
+            with replica_reads():
+                return HttpResponse(router.db_for_read(Order))
+
+        middleware = ReplicaPinningMiddleware(view)
+        factory = RequestFactory()
+
+        response = middleware(factory.get('/'))
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        response = middleware(factory.post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        request = factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(middleware(request).content, b'default')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class ReplicaRoutedEndpointsTests(TestCase):
+    """Opted-in endpoints keep working on the primary when no replica is configured."""
+
+    def test_status_counts(self):
+        customer = Customer.objects.create(
+            company_name="Replica Co",
+            legal_business_name="Replica Co LLC",
+            email="replica@example.com",
+        )
+        Order.objects.create(transaction_id=93000, customer=customer, reference_number="REP-1", status='draft')
+
+        response = self.client.get(reverse('order-status-counts'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['draft'], 1)
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from .models import Order, normalized_sku_keys
+
+
+class NormalizedSkuKeysTests(TestCase):
+    def test_both_storage_formats(self):
+        self.assertEqual(normalized_sku_keys({' abc ': 1, 'DEF': 2}), {'ABC', 'DEF'})
+        self.assertEqual(normalized_sku_keys([{'sku': 'abc', 'quantity': 5}]), {'ABC'})
+        self.assertEqual(normalized_sku_keys('{"xyz": 1}'), {'XYZ'})
+
+    def test_invalid_values(self):
+        self.assertIsNone(normalized_sku_keys(None))
+        self.assertIsNone(normalized_sku_keys({'ABC': 'five'}))
+        self.assertIsNone(normalized_sku_keys([{'sku': 'ABC'}]))
+        self.assertIsNone(normalized_sku_keys('not json'))
+
+
+class OrderSkuQuerySetTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="SKU Co",
+            legal_business_name="SKU Co LLC",
+            email="sku@example.com",
+        )
+        rows = {
+            8001: {'SKU-A': 1, 'SKU-B': 2},
+            8002: [{'sku': ' sku-a ', 'quantity': 1}],
+            8003: {'SKU-C': 4},
+            8004: None,
+            8005: {'SKU-A': 'bad'},
+        }
+        for transaction_id, sku_quantity in rows.items():
+            Order.objects.create(
+                transaction_id=transaction_id,
+                customer=self.customer,
+                reference_number=f"SKU-{transaction_id}",
+                close_date=timezone.now(),
+                sku_quantity=sku_quantity,
+            )
+
+    def ids(self, queryset):
+        return set(queryset.values_list('transaction_id', flat=True))
+
+    def test_with_any_skus(self):
+        self.assertEqual(self.ids(Order.objects.with_any_skus(['sku-a'])), {8001, 8002})
+        self.assertEqual(self.ids(Order.objects.with_any_skus(['SKU-B', 'SKU-C'])), {8001, 8003})
+        self.assertEqual(self.ids(Order.objects.with_any_skus([])), set())
+
+    def test_with_all_skus(self):
+        self.assertEqual(self.ids(Order.objects.with_all_skus(['SKU-A', 'sku-b'])), {8001})
+
+    def test_with_only_skus(self):
+        self.assertEqual(self.ids(Order.objects.with_only_skus(['SKU-A', 'SKU-C'])), {8002, 8003})
+
+    def test_chains_with_other_filters(self):
+        queryset = Order.objects.filter(transaction_id__gt=8001).with_any_skus(['SKU-A'])
+        self.assertEqual(self.ids(queryset), {8002})
+
+    def test_order_list_sku_filter(self):
+        client = APIClient()
+        url = reverse('order-list')
+        response = client.get(url, {'skus': 'sku-a,SKU-C'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({o['transaction_id'] for o in response.data['data']}, {8001, 8002, 8003})
+
+        response = client.get(url, {'skus': 'SKU-A,SKU-B', 'sku_match': 'all'})
+        self.assertEqual({o['transaction_id'] for o in response.data['data']}, {8001})
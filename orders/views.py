@@ -2,16 +2,19 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db.models import Q
+from LedgerLink.faceting import FacetedCountsMixin
 from .models import Order
 from .serializers import OrderSerializer
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(FacetedCountsMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling order CRUD operations.
     Provides standard CRUD endpoints plus additional actions.
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    facet_fields = ('status', 'priority')
+    facet_cache_timeout = 30
 
     def get_queryset(self):
         """
@@ -34,6 +37,15 @@ class OrderViewSet(viewsets.ModelViewSet):
         if priority:
             queryset = queryset.filter(priority=priority)
 
+        # Filter by SKUs (comma-separated); sku_match=all requires every SKU
+        skus = self.request.query_params.get('skus', None)
+        if skus:
+            sku_list = [sku for sku in skus.split(',') if sku.strip()]
+            if self.request.query_params.get('sku_match') == 'all':
+                queryset = queryset.with_all_skus(sku_list)
+            else:
+                queryset = queryset.with_any_skus(sku_list)
+
         # Search functionality
         search = self.request.query_params.get('search', None)
         if search:
@@ -148,11 +160,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         """
         Get count of orders by status.
         """
-        counts = {}
-        for status_choice in Order.STATUS_CHOICES:
-            counts[status_choice[0]] = self.get_queryset().filter(
-                status=status_choice[0]
-            ).count()
+        counts = self.get_facets(['status'])['facets']['status']
         
         return Response({
             'success': True,
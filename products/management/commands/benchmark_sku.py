@@ -0,0 +1,177 @@
+import json
+import random
+import re
+import string
+import timeit
+from functools import lru_cache
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.sku import clear_sku_pool, normalize_sku, normalize_sku_quantity, normalized_sku_keys
+
+
+# The helpers products.sku replaced, kept here as the baseline to measure against
+
+def _regex_normalize_sku(sku):
+    # billing.billing_calculator
+    if sku is None:
+        return ''
+    return re.sub(r'[-\s]', '', str(sku).upper())
+
+
+_replace_cache = {}
+
+
+def _replace_normalize_sku(sku):
+    # Billing_V2.utils.sku_utils
+    if sku in _replace_cache:
+        return _replace_cache[sku]
+    if sku is None:
+        return ''
+    normalized = str(sku).replace('-', '').replace(' ', '').upper()
+    _replace_cache[sku] = normalized
+    return normalized
+
+
+def _strip_normalize_sku(sku):
+    # rules.models
+    return str(sku).strip().upper()
+
+
+def _legacy_convert_sku_format(sku_data):
+    # billing.billing_calculator (list format only)
+    if isinstance(sku_data, str):
+        sku_data = json.loads(sku_data)
+    result = {}
+    for item in sku_data:
+        if not isinstance(item, dict) or 'sku' not in item or 'quantity' not in item:
+            continue
+        sku = _regex_normalize_sku(item.get('sku'))
+        if not sku:
+            continue
+        try:
+            quantity = int(item.get('quantity'))
+        except (TypeError, ValueError):
+            continue
+        if quantity <= 0:
+            continue
+        result[sku] = result.get(sku, 0) + quantity
+    return result
+
+
+def _v2_convert_sku_format(sku_data):
+    # Billing_V2.utils.sku_utils, including its JSON cache
+    if isinstance(sku_data, str):
+        sku_data = _v2_parse_sku_json(sku_data)
+    result = {}
+    for item in sku_data:
+        if not isinstance(item, dict):
+            continue
+        sku = item.get('sku')
+        quantity = item.get('quantity')
+        if not sku or not quantity:
+            continue
+        normalized_sku = _replace_normalize_sku(sku)
+        if not normalized_sku:
+            continue
+        try:
+            quantity = int(quantity)
+            if quantity <= 0:
+                continue
+        except (ValueError, TypeError):
+            continue
+        if normalized_sku in result:
+            result[normalized_sku] += quantity
+        else:
+            result[normalized_sku] = quantity
+    return result
+
+
+@lru_cache(maxsize=128)
+def _v2_parse_sku_json(sku_json):
+    return json.loads(sku_json)
+
+
+def _rules_sku_keys(sku_data):
+    # rules.models.RuleEvaluator: validate, convert, then normalize the keys
+    if isinstance(sku_data, str):
+        sku_data = json.loads(sku_data)
+    if not all(isinstance(item, dict) and 'sku' in item and 'quantity' in item
+               and isinstance(item['quantity'], (int, float)) for item in sku_data):
+        return None
+    return {_strip_normalize_sku(sku) for sku in {item['sku']: item['quantity'] for item in sku_data}}
+
+
+# benchmark -> implementation -> (function, which input it takes)
+BENCHMARKS = {
+    'normalize_sku': {
+        'billing': (_regex_normalize_sku, 'skus'),
+        'Billing_V2': (_replace_normalize_sku, 'skus'),
+        'rules': (_strip_normalize_sku, 'skus'),
+        'products.sku': (normalize_sku, 'skus'),
+    },
+    'sku_quantity': {
+        'billing': (_legacy_convert_sku_format, 'orders'),
+        'Billing_V2': (_v2_convert_sku_format, 'orders'),
+        'products.sku': (normalize_sku_quantity, 'orders'),
+    },
+    'sku_quantity_json': {
+        'billing': (_legacy_convert_sku_format, 'encoded'),
+        'Billing_V2': (_v2_convert_sku_format, 'encoded'),
+        'products.sku': (normalize_sku_quantity, 'encoded'),
+    },
+    'rule_sku_keys': {
+        'rules': (_rules_sku_keys, 'orders'),
+        'products.sku': (normalized_sku_keys, 'orders'),
+    },
+}
+
+
+def generate_orders(orders, skus, seed):
+    """Synthetic sku_quantity lists drawn from a catalogue of differently formatted SKUs."""
+    rng = random.Random(seed)
+    catalogue = []
+    for _ in range(skus):
+        base = ''.join(rng.choices(string.ascii_uppercase, k=3)) + ''.join(rng.choices(string.digits, k=4))
+        catalogue.append(rng.choice([base, base.lower(), f"{base[:3]}-{base[3:]}", f" {base[:3]} {base[3:]} "]))
+    return [
+        [{'sku': sku, 'quantity': rng.randint(1, 20)} for sku in rng.sample(catalogue, rng.randint(1, min(8, skus)))]
+        for _ in range(orders)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark SKU normalization against the helpers it replaced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10000,
+                            help='Number of synthetic sku_quantity values (default: 10000)')
+        parser.add_argument('--skus', type=int, default=500,
+                            help='Number of distinct SKUs in the catalogue (default: 500)')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed for the data generator (default: 42)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per benchmark; the best one is reported (default: 5)')
+
+    def handle(self, *args, **options):
+        if options['orders'] < 1 or options['skus'] < 1 or options['repeat'] < 1:
+            raise CommandError('--orders, --skus and --repeat must be positive')
+
+        orders = generate_orders(options['orders'], options['skus'], options['seed'])
+        inputs = {
+            'skus': [item['sku'] for items in orders for item in items],
+            'orders': orders,
+            'encoded': [json.dumps(items) for items in orders],
+        }
+
+        for benchmark, implementations in BENCHMARKS.items():
+            self.stdout.write(benchmark)
+            for name, (function, input_name) in implementations.items():
+                values = inputs[input_name]
+                # Every implementation starts with cold caches
+                clear_sku_pool()
+                _replace_cache.clear()
+                _v2_parse_sku_json.cache_clear()
+                best = min(timeit.repeat(lambda: [function(value) for value in values],
+                                         number=1, repeat=options['repeat']))
+                self.stdout.write(f"  {name:<14} {best * 1e9 / len(values):>8,.0f} ns/call")
@@ -0,0 +1,197 @@
+# products/sku.py
+
+"""
+SKU normalization shared by billing, Billing_V2, rules and orders.
+
+A normalized SKU is upper-cased with hyphens and whitespace removed, so
+'abc-123', 'ABC 123' and 'ABC123' all compare equal everywhere an order's
+sku_quantity is billed or matched against a rule.
+"""
+
+import json
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Hyphen plus every character str.isspace() (and the regex \s) treats as whitespace.
+# orders_normalized_skus() in the orders migrations strips the same set.
+SKU_STRIP_CHARS = (
+    '-\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680'
+    '\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a'
+    '\u2028\u2029\u202f\u205f\u3000'
+)
+_STRIP_TABLE = str.maketrans('', '', SKU_STRIP_CHARS)
+
+# Raw SKU string -> interned normalized SKU. Bounded so that free-form input
+# cannot grow it without limit; it is simply cleared when full.
+SKU_POOL_SIZE = 65536
+_sku_pool = {}
+
+
+def normalize_sku(sku):
+    """
+    Normalize a SKU for comparison.
+
+    Args:
+        sku: The SKU to normalize (usually a string; None gives '')
+
+    Returns:
+        Upper-cased SKU without hyphens or whitespace. Results for string input
+        are interned, so equal SKUs share one object across orders.
+    """
+    if sku.__class__ is str:
+        try:
+            return _sku_pool[sku]
+        except KeyError:
+            if len(_sku_pool) >= SKU_POOL_SIZE:
+                _sku_pool.clear()
+            normalized = _sku_pool[sku] = sys.intern(sku.upper().translate(_STRIP_TABLE))
+            return normalized
+    if sku is None:
+        return ''
+    # str subclasses and other types are not pooled: 1, 1.0 and True hash alike
+    return sys.intern(str(sku).upper().translate(_STRIP_TABLE))
+
+
+def normalize_skus(skus):
+    """
+    Normalize an iterable of SKUs.
+
+    Args:
+        skus: Iterable of SKUs
+
+    Returns:
+        Set of normalized SKUs
+    """
+    return {normalize_sku(sku) for sku in skus}
+
+
+def clear_sku_pool():
+    """Drop all pooled SKUs."""
+    _sku_pool.clear()
+
+
+def load_sku_quantity(sku_data):
+    """
+    Decode JSON-encoded sku_quantity data.
+
+    Returns:
+        The decoded value, sku_data itself if it is not a string, or None for invalid JSON
+    """
+    if isinstance(sku_data, (str, bytes)):
+        try:
+            return json.loads(sku_data)
+        except ValueError:
+            logger.debug("Invalid JSON in SKU data")
+            return None
+    return sku_data
+
+
+def _iter_sku_items(data):
+    # Yields (raw_sku, raw_quantity) for both supported formats
+    if isinstance(data, dict):
+        return data.items()
+    return ((item.get('sku'), item.get('quantity')) for item in data if isinstance(item, dict))
+
+
+def _positive_int(quantity):
+    if not isinstance(quantity, (int, float, str)):
+        return None
+    try:
+        quantity = int(quantity)
+    except (ValueError, OverflowError):
+        return None
+    return quantity if quantity > 0 else None
+
+
+def _add_quantity(result, sku, quantity):
+    sku = normalize_sku(sku)
+    quantity = _positive_int(quantity)
+    if sku and quantity is not None:
+        result[sku] = result.get(sku, 0) + quantity
+
+
+def normalize_sku_quantity(sku_data):
+    """
+    Normalize an order's whole sku_quantity in one pass.
+
+    Accepts {"SKU": qty} and [{"sku": ..., "quantity": ...}] data, optionally
+    JSON-encoded. Entries with an empty SKU or a quantity that is not a
+    positive integer are skipped; quantities of SKUs that normalize to the
+    same value are added together.
+
+    Args:
+        sku_data: The sku_quantity value of an order
+
+    Returns:
+        Dictionary mapping normalized SKUs to quantities ({} if nothing is valid)
+    """
+    data = load_sku_quantity(sku_data)
+    if not isinstance(data, (dict, list)):
+        return {}
+
+    result = {}
+    if isinstance(data, dict):
+        for sku, quantity in data.items():
+            _add_quantity(result, sku, quantity)
+        return result
+
+    # Hot path for the list format: pooled SKUs and plain int quantities skip
+    # the function calls
+    pool = _sku_pool
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        sku = item.get('sku')
+        quantity = item.get('quantity')
+        if sku.__class__ is str and quantity.__class__ is int and sku in pool:
+            if quantity > 0 and (sku := pool[sku]):
+                result[sku] = result.get(sku, 0) + quantity
+        else:
+            _add_quantity(result, sku, quantity)
+    return result
+
+
+def validate_sku_quantity(sku_data):
+    """
+    Check that sku_quantity data can be billed.
+
+    Args:
+        sku_data: The sku_quantity value of an order
+
+    Returns:
+        True if the data holds at least one entry and every entry has a
+        non-empty SKU and a positive integer quantity
+    """
+    data = load_sku_quantity(sku_data)
+    if not isinstance(data, (dict, list)) or not data:
+        return False
+    if isinstance(data, list) and not all(isinstance(item, dict) for item in data):
+        return False
+    return all(normalize_sku(sku) and _positive_int(quantity) is not None
+               for sku, quantity in _iter_sku_items(data))
+
+
+def normalized_sku_keys(sku_data):
+    """
+    Return the set of normalized SKUs in an order's sku_quantity, or None if invalid.
+
+    This is what rule matching compares against and mirrors the
+    orders_normalized_skus() database function: every entry needs a numeric
+    quantity (of any value), and an empty order gives an empty set.
+    """
+    data = load_sku_quantity(sku_data)
+
+    if isinstance(data, dict):
+        if not all(isinstance(qty, (int, float)) for qty in data.values()):
+            return None
+        return {normalize_sku(sku) for sku in data}
+
+    if isinstance(data, list):
+        if not all(isinstance(item, dict) and 'sku' in item and isinstance(item.get('quantity'), (int, float))
+                   for item in data):
+            return None
+        return {normalize_sku(item['sku']) for item in data}
+
+    return None
@@ -0,0 +1,87 @@
+import json
+import re
+import sys
+
+from django.test import SimpleTestCase
+
+from products import sku
+from products.sku import (
+    SKU_STRIP_CHARS,
+    normalize_sku,
+    normalize_sku_quantity,
+    normalized_sku_keys,
+    validate_sku_quantity,
+)
+
+
+class NormalizeSkuTests(SimpleTestCase):
+    def test_removes_hyphens_and_whitespace(self):
+        for raw in ['abc-123', 'ABC 123', ' abc\t-123\n', 'A-B-C-1-2-3', 'abc\xa0123']:
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_sku(raw), 'ABC123')
+
+    def test_matches_the_regex_it_replaces(self):
+        for raw in ['x-y z', '\xdf-1', '\u3000sku\u2028', '', '--', 'Mixed Case-9']:
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_sku(raw), re.sub(r'[-\s]', '', raw.upper()))
+
+    def test_strip_chars_cover_all_whitespace(self):
+        whitespace = {chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()}
+        self.assertEqual(set(SKU_STRIP_CHARS), whitespace | {'-'})
+
+    def test_non_string_input(self):
+        self.assertEqual(normalize_sku(None), '')
+        self.assertEqual(normalize_sku(123), '123')
+        self.assertEqual(normalize_sku(True), 'TRUE')
+        self.assertEqual(normalize_sku(1), '1')
+
+    def test_results_are_interned_and_pool_is_bounded(self):
+        self.assertIs(normalize_sku('pool-sku'), normalize_sku('POOL SKU'))
+        original = sku.SKU_POOL_SIZE
+        sku.SKU_POOL_SIZE = 2
+        try:
+            sku.clear_sku_pool()
+            for raw in ['a', 'b', 'c', 'd']:
+                normalize_sku(raw)
+            self.assertLessEqual(len(sku._sku_pool), 2)
+        finally:
+            sku.SKU_POOL_SIZE = original
+
+
+class NormalizeSkuQuantityTests(SimpleTestCase):
+    def test_list_dict_and_json_formats_agree(self):
+        as_list = [{'sku': 'abc-1', 'quantity': 2}, {'sku': 'ABC 1', 'quantity': 3}, {'sku': 'x', 'quantity': 1}]
+        as_dict = {'abc-1': 2, 'ABC 1': 3, 'x': 1}
+        expected = {'ABC1': 5, 'X': 1}
+        for data in [as_list, as_dict, json.dumps(as_list), json.dumps(as_dict)]:
+            with self.subTest(data=data):
+                self.assertEqual(normalize_sku_quantity(data), expected)
+
+    def test_invalid_entries_are_skipped(self):
+        data = [
+            {'sku': 'OK', 'quantity': '4'},
+            {'sku': '', 'quantity': 1},
+            {'sku': 'ZERO', 'quantity': 0},
+            {'sku': 'NAN', 'quantity': float('nan')},
+            {'sku': 'TEXT', 'quantity': 'many'},
+            {'quantity': 1},
+            'not a dictionary',
+        ]
+        self.assertEqual(normalize_sku_quantity(data), {'OK': 4})
+        self.assertEqual(normalize_sku_quantity(None), {})
+        self.assertEqual(normalize_sku_quantity('{invalid json}'), {})
+
+    def test_validate_requires_every_entry_to_be_billable(self):
+        self.assertTrue(validate_sku_quantity({'ABC-1': 1}))
+        self.assertTrue(validate_sku_quantity('[{"sku": "ABC-1", "quantity": 1}]'))
+        self.assertFalse(validate_sku_quantity([{'sku': 'ABC-1', 'quantity': 1}, {'sku': 'B', 'quantity': -1}]))
+        self.assertFalse(validate_sku_quantity({'sku': 'ABO-072', 'quantity': 10}))
+        self.assertFalse(validate_sku_quantity([]))
+
+
+class NormalizedSkuKeysTests(SimpleTestCase):
+    def test_rule_matching_uses_billing_normalization(self):
+        self.assertEqual(normalized_sku_keys({'sku-a': 1, ' SKU B ': 0}), {'SKUA', 'SKUB'})
+        self.assertEqual(normalized_sku_keys([{'sku': None, 'quantity': 1}]), {''})
+        self.assertEqual(normalized_sku_keys({}), set())
+        self.assertIsNone(normalized_sku_keys({'SKU-A': 'bad'}))
@@ -3,9 +3,11 @@
 from django.contrib import admin
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from django.urls import reverse
 import json
+from LedgerLink.paginators import EstimatedCountPaginator
 from .models import RuleGroup, Rule, AdvancedRule
 
 
@@ -68,23 +70,35 @@ class RuleGroupAdmin(admin.ModelAdmin):
         'customer_service__service__service_name'
     ]
     inlines = [RuleInline, AdvancedRuleInline]
+    list_select_related = ['customer_service__customer', 'customer_service__service']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Count both kinds of rule in the changelist query instead of per row
+        return super().get_queryset(request).annotate(
+            _rule_count=Count('rules', filter=Q(rules__advancedrule__isnull=True)),
+            _advanced_rule_count=Count('rules', filter=Q(rules__advancedrule__isnull=False)),
+        )
 
     def customer_service_link(self, obj):
         url = reverse('admin:customer_services_customerservice_change',
-                      args=[obj.customer_service.id])
+                      args=[obj.customer_service_id])
         return format_html('<a href="{}">{}</a>', url, obj.customer_service)
 
     customer_service_link.short_description = 'Customer Service'
 
     def rule_count(self, obj):
-        return obj.rules.filter(advancedrule=None).count()
+        return obj._rule_count
 
     rule_count.short_description = 'Rules'
+    rule_count.admin_order_field = '_rule_count'
 
     def advanced_rule_count(self, obj):
-        return obj.rules.filter(advancedrule__isnull=False).count()
+        return obj._advanced_rule_count
 
     advanced_rule_count.short_description = 'Advanced Rules'
+    advanced_rule_count.admin_order_field = '_advanced_rule_count'
 
     class Media:
         css = {
@@ -115,9 +129,12 @@ class RuleAdmin(admin.ModelAdmin):
         'value',
         'rule_group__customer_service__customer__company_name'
     ]
+    list_select_related = ['rule_group__customer_service__customer', 'rule_group__customer_service__service']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def rule_group_link(self, obj):
-        url = reverse('admin:rules_rulegroup_change', args=[obj.rule_group.id])
+        url = reverse('admin:rules_rulegroup_change', args=[obj.rule_group_id])
         return format_html('<a href="{}">{}</a>', url, obj.rule_group)
 
     rule_group_link.short_description = 'Rule Group'
@@ -146,6 +163,9 @@ class AdvancedRuleAdmin(admin.ModelAdmin):
         'calculations',
         'rule_group__customer_service__customer__company_name'
     ]
+    list_select_related = ['rule_group__customer_service__customer', 'rule_group__customer_service__service']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (None, {
             'fields': (
@@ -162,7 +182,7 @@ class AdvancedRuleAdmin(admin.ModelAdmin):
     )
 
     def rule_group_link(self, obj):
-        url = reverse('admin:rules_rulegroup_change', args=[obj.rule_group.id])
+        url = reverse('admin:rules_rulegroup_change', args=[obj.rule_group_id])
         return format_html('<a href="{}">{}</a>', url, obj.rule_group)
 
     rule_group_link.short_description = 'Rule Group'
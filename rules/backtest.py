@@ -0,0 +1,208 @@
+# rules/backtest.py
+
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.utils import timezone
+
+from orders.models import Order
+from .compiler import RuleQueryCompiler, UncompilableRule
+from .models import Rule, AdvancedRule, RuleEvaluator
+
+logger = logging.getLogger(__name__)
+
+# Order fields read by AdvancedRule calculations when projecting revenue impact
+CALCULATION_FIELDS = ['total_item_qty', 'weight_lb', 'volume_cuft', 'sku_quantity']
+
+# Order fields returned for each sample match
+SAMPLE_FIELDS = ['transaction_id', 'reference_number', 'close_date']
+
+
+class RuleBacktester:
+    """
+    Evaluate a draft rule against a customer's historical orders in bulk.
+
+    Simple predicates are pushed down to the database so only candidate orders
+    are loaded; everything else is evaluated in Python with the same
+    RuleEvaluator the billing engine uses, in batches, until the latency
+    budget runs out.
+    """
+
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 365
+    DEFAULT_SAMPLE_SIZE = 10
+    DEFAULT_BUDGET_MS = 2000
+    BATCH_SIZE = 2000
+
+    def __init__(self, rule, customer_id, days=None, base_price=None,
+                 sample_size=None, budget_ms=None):
+        """
+        Args:
+            rule: Unsaved (draft) or saved Rule/AdvancedRule instance
+            customer_id: ID of the customer whose orders are replayed
+            days: Number of days of history to replay (defaults to 30)
+            base_price: Unit price the rule adjusts, used for revenue projection
+            sample_size: Number of matching orders to return as samples
+            budget_ms: Wall-clock budget for evaluation in milliseconds
+        """
+        self.rule = rule
+        self.customer_id = customer_id
+        self.days = min(int(days or self.DEFAULT_DAYS), self.MAX_DAYS)
+        self.base_price = Decimal(str(base_price)) if base_price is not None else Decimal('0')
+        self.sample_size = int(sample_size if sample_size is not None else self.DEFAULT_SAMPLE_SIZE)
+        self.budget_ms = int(budget_ms or self.DEFAULT_BUDGET_MS)
+        self.evaluator = RuleEvaluator()
+
+    @classmethod
+    def build_rule(cls, rule_data):
+        """
+        Build an unsaved rule from request data.
+
+        Returns an AdvancedRule when calculations or conditions are supplied,
+        otherwise a basic Rule.
+
+        Raises:
+            ValidationError: If the rule definition is invalid
+        """
+        if not rule_data or not rule_data.get('field') or not rule_data.get('operator'):
+            raise ValidationError('Rule field and operator are required')
+
+        adjustment_amount = rule_data.get('adjustment_amount')
+        if adjustment_amount in (None, ''):
+            adjustment_amount = None
+        else:
+            try:
+                adjustment_amount = Decimal(str(adjustment_amount))
+            except InvalidOperation:
+                raise ValidationError('adjustment_amount must be a number')
+
+        fields = {
+            'field': rule_data['field'],
+            'operator': rule_data['operator'],
+            'value': str(rule_data.get('value', '')),
+            'adjustment_amount': adjustment_amount,
+        }
+
+        if rule_data.get('calculations') or rule_data.get('conditions'):
+            rule = AdvancedRule(
+                conditions=rule_data.get('conditions') or {},
+                calculations=rule_data.get('calculations') or [],
+                tier_config=rule_data.get('tier_config') or {},
+                **fields
+            )
+        else:
+            rule = Rule(**fields)
+
+        rule.clean()
+        return rule
+
+    @property
+    def is_advanced(self):
+        return isinstance(self.rule, AdvancedRule)
+
+    def get_queryset(self):
+        """Orders for the customer inside the backtest window."""
+        since = timezone.now() - timedelta(days=self.days)
+        return Order.objects.filter(customer_id=self.customer_id, close_date__gte=since)
+
+    def get_pushdown_q(self):
+        """
+        Compile the rule into a Q object when it has an exact SQL equivalent.
+
+        Returns None when the rule has to be evaluated in Python.
+        """
+        try:
+            return RuleQueryCompiler().compile_rule(self.rule)
+        except UncompilableRule:
+            return None
+
+    def _load_fields(self):
+        """Restrict loaded columns to the ones evaluation actually reads."""
+        fields = set(SAMPLE_FIELDS)
+        candidates = [self.rule.field]
+        if self.is_advanced:
+            candidates += CALCULATION_FIELDS
+        for name in candidates:
+            try:
+                Order._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            fields.add(name)
+        return sorted(fields)
+
+    def _order_impact(self, order):
+        """Revenue delta the rule would add to one matching order."""
+        if self.is_advanced:
+            adjusted = self.rule.apply_adjustment(order, self.base_price)
+            return Decimal(str(adjusted)) - self.base_price
+        return self.rule.apply_adjustment(self.base_price) - self.base_price
+
+    def _sample(self, order):
+        sample = {
+            'transaction_id': order.transaction_id,
+            'reference_number': order.reference_number,
+            'close_date': order.close_date.isoformat() if order.close_date else None,
+        }
+        value = getattr(order, self.rule.field, None)
+        sample[self.rule.field] = value if isinstance(value, (dict, list)) or value is None else str(value)
+        return sample
+
+    def run(self):
+        """
+        Run the backtest.
+
+        Returns:
+            Dictionary with match counts, sample matches and projected impact
+        """
+        started = time.monotonic()
+        deadline = started + self.budget_ms / 1000.0
+
+        queryset = self.get_queryset()
+        total_orders = queryset.count()
+
+        pushdown = self.get_pushdown_q()
+        candidates = queryset.filter(pushdown) if pushdown is not None else queryset
+        candidates = candidates.only(*self._load_fields()).order_by('-close_date')
+
+        evaluated = 0
+        matched = 0
+        impact = Decimal('0')
+        samples = []
+        complete = True
+
+        for order in candidates.iterator(chunk_size=self.BATCH_SIZE):
+            if evaluated % self.BATCH_SIZE == 0 and time.monotonic() > deadline:
+                complete = False
+                break
+            evaluated += 1
+
+            if pushdown is None and not self.evaluator.evaluate_rule(self.rule, order):
+                continue
+
+            matched += 1
+            impact += self._order_impact(order)
+            if len(samples) < self.sample_size:
+                samples.append(self._sample(order))
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        logger.info(
+            f"Backtested rule {self.rule.field} {self.rule.operator} {self.rule.value} for customer "
+            f"{self.customer_id}: {matched} matches in {evaluated} orders ({elapsed_ms:.0f}ms)"
+        )
+
+        return {
+            'customer_id': self.customer_id,
+            'days': self.days,
+            'total_orders': total_orders,
+            'evaluated_orders': evaluated,
+            'matched_orders': matched,
+            'match_rate': round(matched / total_orders, 4) if total_orders and complete else None,
+            'pushed_down': pushdown is not None,
+            'complete': complete,
+            'sample_matches': samples,
+            'projected_revenue_impact': str(impact.quantize(Decimal('0.01'))),
+            'elapsed_ms': round(elapsed_ms, 1),
+        }
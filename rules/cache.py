@@ -0,0 +1,25 @@
+# rules/cache.py
+
+from LedgerLink.cache import invalidate_namespace, namespace_version, versioned_key
+
+# Serialized rule group listings are cached under a version that changes
+# whenever a rule group or rule, or the customer service, customer or service
+# it belongs to, is saved or deleted (see rules/signals.py).
+RULE_GROUPS_NAMESPACE = 'rules:rule_groups'
+RULE_GROUPS_TIMEOUT = 60 * 60
+
+
+def get_rule_groups_version():
+    """Current snapshot version, initialised on first use."""
+    return namespace_version(RULE_GROUPS_NAMESPACE)
+
+
+def rule_groups_cache_key(customer_id=None):
+    """Cache key for the rule group snapshot, optionally for one customer."""
+    scope = customer_id if customer_id is not None else 'all'
+    return versioned_key(RULE_GROUPS_NAMESPACE, scope)
+
+
+def invalidate_rule_groups():
+    """Make every cached rule group snapshot unreachable."""
+    invalidate_namespace(RULE_GROUPS_NAMESPACE)
@@ -0,0 +1,231 @@
+# rules/compiler.py
+
+import math
+import operator as op
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.lookups import ContainedBy, Overlap
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Case, Func, IntegerField, Q, TextField, Value, When
+from django.db.models.lookups import Exact, GreaterThan, IsNull
+
+from orders.models import NormalizedSkus, Order
+from products.sku import normalize_skus
+
+# Field groups as handled by RuleEvaluator
+NUMERIC_FIELDS = ['weight_lb', 'line_items', 'total_item_qty', 'volume_cuft', 'packages', 'sku_count']
+STRING_FIELDS = ['reference_number', 'ship_to_name', 'ship_to_company', 'ship_to_city',
+                 'ship_to_state', 'ship_to_country', 'carrier', 'notes', 'sku_name']
+
+NUMERIC_LOOKUPS = {'gt': 'gt', 'lt': 'lt', 'ge': 'gte', 'le': 'lte', 'eq': 'exact'}
+STRING_LOOKUPS = {'contains': 'contains', 'ncontains': 'contains',
+                  'startswith': 'startswith', 'endswith': 'endswith'}
+
+
+class UncompilableRule(Exception):
+    """Raised when a rule or rule group has no exact SQL equivalent."""
+
+
+def never():
+    """Q object that matches no rows."""
+    return Q(pk__in=[])
+
+
+class RuleQueryCompiler:
+    """
+    Translate rules and rule groups into Q objects over Order.
+
+    The compiled filter selects exactly the orders for which RuleGroup.evaluate
+    returns True, so callers can let the database do the filtering and fall
+    back to Python evaluation when UncompilableRule is raised.
+
+    Every compiled rule is two-valued: a NULL column never matches (as in
+    RuleEvaluator), and the explicit IS NOT NULL guards keep that true when
+    the rule is negated by NOT/NAND/NOR.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+
+    @property
+    def is_postgresql(self):
+        return self.connection.vendor == 'postgresql'
+
+    def compile_group(self, rule_group, rules=None):
+        """
+        Compile a RuleGroup into a Q object.
+
+        Args:
+            rule_group: RuleGroup to compile
+            rules: Optional pre-fetched rules of the group
+
+        Returns:
+            Q object matching the orders the group applies to
+
+        Raises:
+            UncompilableRule: If any rule in the group cannot be expressed in SQL
+        """
+        if rules is None:
+            rules = list(rule_group.rules.all())
+        if not rules:
+            return Q()
+
+        predicates = [self.compile_rule(rule) for rule in rules]
+        operator = rule_group.logic_operator
+
+        if operator == 'AND':
+            return self._combine(predicates, Q.AND)
+        elif operator == 'OR':
+            return self._combine(predicates, Q.OR)
+        elif operator in ('NOT', 'NOR'):
+            return ~self._combine(predicates, Q.OR)
+        elif operator == 'NAND':
+            return ~self._combine(predicates, Q.AND)
+        elif operator == 'XOR':
+            return self._exactly_one(predicates)
+
+        raise UncompilableRule(f"Unknown logic operator {operator}")
+
+    def compile_groups(self, rule_groups):
+        """
+        Compile several rule groups into a Q matching orders any group applies to.
+
+        Args:
+            rule_groups: Iterable of RuleGroup objects (rules may be prefetched)
+
+        Returns:
+            Q object, or an empty Q() when no groups are given or any
+            group is empty (matches every order)
+
+        Raises:
+            UncompilableRule: If any group cannot be compiled
+        """
+        compiled = [self.compile_group(group) for group in rule_groups]
+        # An empty group matches every order; Django would drop Q() from an OR
+        if not compiled or any(q == Q() for q in compiled):
+            return Q()
+        return self._combine(compiled, Q.OR)
+
+    def compile_rule(self, rule):
+        """
+        Compile a single Rule into a Q object.
+
+        Raises:
+            UncompilableRule: If the rule cannot be expressed in SQL
+        """
+        try:
+            Order._meta.get_field(rule.field)
+        except FieldDoesNotExist:
+            # RuleEvaluator never matches a field the order does not have
+            return never()
+
+        values = rule.get_values_as_list()
+
+        if rule.field in NUMERIC_FIELDS:
+            return self._compile_numeric(rule, values)
+        if rule.field in STRING_FIELDS:
+            return self._compile_string(rule, values)
+        if rule.field == 'sku_quantity':
+            return self._compile_sku_quantity(rule, values)
+
+        return never()
+
+    def _compile_numeric(self, rule, values):
+        field = rule.field
+        if rule.operator not in NUMERIC_LOOKUPS and rule.operator != 'ne':
+            return never()
+
+        try:
+            value = Decimal(values[0]) if values else Decimal('0')
+        except InvalidOperation:
+            return never()
+        if not value.is_finite():
+            raise UncompilableRule(f"Non-finite value {values[0]} for {field}")
+
+        not_null = Q(**{f'{field}__isnull': False})
+        model_field = Order._meta.get_field(field)
+        operator = rule.operator
+
+        if model_field.get_internal_type() == 'IntegerField':
+            if value != value.to_integral_value():
+                # Rewrite comparisons against a fractional literal on integers
+                if operator == 'eq':
+                    return never()
+                if operator == 'ne':
+                    return not_null
+                if operator in ('gt', 'ge'):
+                    return not_null & Q(**{f'{field}__gte': math.ceil(value)})
+                return not_null & Q(**{f'{field}__lte': math.floor(value)})
+            value = int(value)
+        elif model_field.get_internal_type() == 'DecimalField':
+            # Literals finer than the column's scale would be rounded by the driver
+            if value != round(value, model_field.decimal_places):
+                raise UncompilableRule(f"Value {values[0]} exceeds precision of {field}")
+
+        if operator == 'ne':
+            return not_null & ~Q(**{field: value})
+        return not_null & Q(**{f'{field}__{NUMERIC_LOOKUPS[operator]}': value})
+
+    def _compile_string(self, rule, values):
+        field = rule.field
+        operator = rule.operator
+        not_null = Q(**{f'{field}__isnull': False})
+
+        if operator == 'eq':
+            return not_null & Q(**{field: values[0]}) if values else never()
+        if operator == 'ne':
+            return not_null & ~Q(**{field: values[0]}) if values else never()
+        if operator == 'in':
+            return not_null & Q(**{f'{field}__in': values}) if values else never()
+        if operator == 'ni':
+            return not_null & ~Q(**{f'{field}__in': values}) if values else not_null
+
+        if operator in STRING_LOOKUPS:
+            # LIKE is case-insensitive on SQLite; only PostgreSQL matches str methods
+            if not self.is_postgresql:
+                raise UncompilableRule(f"Operator {operator} needs case-sensitive LIKE")
+            lookup = f'{field}__{STRING_LOOKUPS[operator]}'
+            matches = self._combine([Q(**{lookup: v}) for v in values], Q.OR) if values else never()
+            if operator == 'ncontains':
+                return not_null & ~matches
+            return not_null & matches
+
+        return never()
+
+    def _compile_sku_quantity(self, rule, values):
+        # Relies on the orders_normalized_skus() function and its GIN index
+        if not self.is_postgresql:
+            raise UncompilableRule("SKU quantity rules need the PostgreSQL SKU index")
+
+        skus = NormalizedSkus('sku_quantity')
+        rule_skus = Value(sorted(normalize_skus(values)), output_field=ArrayField(TextField()))
+        # NULL means the column is missing or malformed, which never matches
+        valid = Q(IsNull(skus, False))
+        operator = rule.operator
+
+        if operator == 'only_contains':
+            return valid & Q(ContainedBy(skus, rule_skus)) & Q(GreaterThan(Func(skus, function='cardinality'), 0))
+        if operator == 'contains':
+            return valid & Q(Overlap(skus, rule_skus))
+        if operator in ('ncontains', 'ni'):
+            return valid & ~Q(Overlap(skus, rule_skus))
+        if operator == 'in':
+            return valid & Q(ContainedBy(skus, rule_skus))
+
+        return never()
+
+    @staticmethod
+    def _combine(predicates, connector):
+        return reduce(op.and_ if connector == Q.AND else op.or_, predicates)
+
+    @staticmethod
+    def _exactly_one(predicates):
+        """XOR as conditional aggregation: exactly one predicate holds."""
+        matched = None
+        for predicate in predicates:
+            term = Case(When(predicate, then=Value(1)), default=Value(0), output_field=IntegerField())
+            matched = term if matched is None else matched + term
+        return Q(Exact(matched, 1))
@@ -3,6 +3,7 @@
 from django.core.exceptions import ValidationError
 from django.db import models
 from customer_services.models import CustomerService
+from products.sku import normalize_sku, normalize_sku_quantity, normalized_sku_keys
 import json
 import logging
 import re
@@ -10,37 +11,6 @@ import re
 logger = logging.getLogger(__name__)
 
 
-def validate_sku_quantity(value):
-    """Validate the SKU quantity format"""
-    if not isinstance(value, (list, dict)):
-        return False
-
-    # If it's a list, each item should be a dict with 'sku' and 'quantity'
-    if isinstance(value, list):
-        return all(
-            isinstance(item, dict) and
-            'sku' in item and
-            'quantity' in item and
-            isinstance(item['quantity'], (int, float))
-            for item in value
-        )
-
-    # If it's a dict, each value should be a quantity
-    return all(isinstance(v, (int, float)) for v in value.values())
-
-
-def convert_sku_format(value):
-    """Convert SKU quantity to standard format"""
-    if isinstance(value, list):
-        return {item['sku']: item['quantity'] for item in value}
-    return value
-
-
-def normalize_sku(sku):
-    """Normalize SKU for comparison"""
-    return str(sku).strip().upper()
-
-
 class RuleGroup(models.Model):
     """
     A group of rules with a logical operator that determines how the rules are combined.
@@ -373,6 +343,9 @@ class AdvancedRule(Rule):
             if not self.calculations:
                 return amount
 
+            # Calculation values are floats; keep the running amount in one type
+            amount = float(amount)
+
             for calc in self.calculations:
                 calc_type = calc['type']
                 value = float(calc['value'])
@@ -397,12 +370,10 @@ class AdvancedRule(Rule):
                                 break
                 elif calc_type == 'product_specific':
                     if order.sku_quantity:
-                        sku_data = json.loads(order.sku_quantity) if isinstance(order.sku_quantity,
-                                                                                str) else order.sku_quantity
-                        sku_dict = convert_sku_format(sku_data)
-                        for sku, qty in sku_dict.items():
-                            if sku in calc.get('rates', {}):
-                                amount += qty * calc['rates'][sku]
+                        rates = {normalize_sku(sku): rate for sku, rate in calc.get('rates', {}).items()}
+                        for sku, qty in normalize_sku_quantity(order.sku_quantity).items():
+                            if sku in rates:
+                                amount += qty * rates[sku]
 
             return amount
 
@@ -475,17 +446,12 @@ class RuleEvaluator:
                     return False
 
                 try:
-                    # Parse JSON if field_value is a string
-                    if isinstance(field_value, str):
-                        field_value = json.loads(field_value)
-
-                    if not validate_sku_quantity(field_value):
+                    # Normalized SKUs of the order, or None if the data is malformed
+                    order_sku_set = normalized_sku_keys(field_value)
+                    if order_sku_set is None:
                         logger.error(f"Invalid SKU quantity format in order {order.transaction_id}")
                         return False
 
-                    # Convert to standard format and normalize SKUs
-                    order_skus = convert_sku_format(field_value)
-                    order_sku_set = {normalize_sku(sku) for sku in order_skus.keys()}
                     rule_sku_set = {normalize_sku(v) for v in values}
 
                     if rule.operator == 'only_contains':
@@ -0,0 +1,26 @@
+# rules/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from customer_services.models import CustomerService
+from customers.models import Customer
+from services.models import Service
+from .cache import invalidate_rule_groups
+from .models import AdvancedRule, Rule, RuleGroup
+
+
+@receiver([post_save, post_delete], sender=RuleGroup)
+@receiver([post_save, post_delete], sender=Rule)
+@receiver([post_save, post_delete], sender=AdvancedRule)
+def invalidate_rule_group_snapshot(sender, **kwargs):
+    """Drop cached rule group listings when rules change."""
+    invalidate_rule_groups()
+
+
+@receiver([post_save, post_delete], sender=CustomerService)
+@receiver([post_save, post_delete], sender=Customer)
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_rule_group_snapshot_names(sender, **kwargs):
+    """Drop cached rule group listings when the customer or service names they embed change."""
+    invalidate_rule_groups()
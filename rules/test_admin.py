@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from services.models import Service
+from rules.models import AdvancedRule, Rule, RuleGroup
+
+
+class RuleGroupAdminTests(TestCase):
+    """The rule group changelist must not issue queries per row."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.user)
+        customer = Customer.objects.create(
+            company_name="Admin Co",
+            legal_business_name="Admin Co LLC",
+            email="admin-co@example.com",
+        )
+        self.customer_service = CustomerService.objects.create(
+            customer=customer,
+            service=Service.objects.create(service_name="Admin Service", charge_type="single"),
+            unit_price=Decimal('1.00')
+        )
+
+    def add_groups(self, count):
+        for _ in range(count):
+            group = RuleGroup.objects.create(customer_service=self.customer_service)
+            Rule.objects.create(rule_group=group, field='weight_lb', operator='gt', value='1')
+            Rule.objects.create(rule_group=group, field='packages', operator='gt', value='1')
+            AdvancedRule.objects.create(rule_group=group, field='carrier', operator='eq', value='UPS')
+
+    def changelist_queries(self, url_name):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(captured), response
+
+    def test_rule_group_changelist_query_count_is_constant(self):
+        self.add_groups(2)
+        few, _ = self.changelist_queries('admin:rules_rulegroup_changelist')
+        self.add_groups(5)
+        many, response = self.changelist_queries('admin:rules_rulegroup_changelist')
+
+        self.assertEqual(few, many)
+        group = response.context['cl'].result_list[0]
+        self.assertEqual(group._rule_count, 2)
+        self.assertEqual(group._advanced_rule_count, 1)
+
+    def test_rule_changelist_query_count_is_constant(self):
+        self.add_groups(2)
+        few, _ = self.changelist_queries('admin:rules_rule_changelist')
+        self.add_groups(5)
+        many, _ = self.changelist_queries('admin:rules_rule_changelist')
+        self.assertEqual(few, many)
+
+    def test_customer_service_changelist_query_count_is_constant(self):
+        few, _ = self.changelist_queries('admin:customer_services_customerservice_changelist')
+        for i in range(4):
+            CustomerService.objects.create(
+                customer=self.customer_service.customer,
+                service=Service.objects.create(service_name=f"Extra Service {i}", charge_type="single"),
+                unit_price=Decimal('1.00')
+            )
+        many, _ = self.changelist_queries('admin:customer_services_customerservice_changelist')
+        self.assertEqual(few, many)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from orders.models import Order
+from services.models import Service
+from rules.backtest import RuleBacktester
+from rules.models import AdvancedRule, Rule, RuleGroup
+
+
+class RuleBacktesterTests(TestCase):
+    """Tests for bulk rule evaluation against historical orders."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Backtest Co",
+            legal_business_name="Backtest Co LLC",
+            email="backtest@example.com",
+        )
+        self.service = Service.objects.create(service_name="Backtest Service", charge_type="single")
+        self.customer_service = CustomerService.objects.create(
+            customer=self.customer,
+            service=self.service,
+            unit_price=Decimal('10.00')
+        )
+        now = timezone.now()
+        for i, (weight, country) in enumerate([(5, 'US'), (15, 'US'), (25, 'CA'), (None, 'CA')]):
+            Order.objects.create(
+                transaction_id=9000 + i,
+                customer=self.customer,
+                reference_number=f"BT-{i}",
+                close_date=now - timedelta(days=i + 1),
+                weight_lb=weight,
+                ship_to_country=country,
+                total_item_qty=i + 1,
+                sku_quantity={"SKU-A": 1} if i % 2 == 0 else {"SKU-B": 2},
+            )
+        # Outside the default 30-day window
+        Order.objects.create(
+            transaction_id=9100,
+            customer=self.customer,
+            reference_number="BT-OLD",
+            close_date=now - timedelta(days=90),
+            weight_lb=50,
+        )
+
+    def test_numeric_rule_is_pushed_down(self):
+        rule = RuleBacktester.build_rule({
+            'field': 'weight_lb', 'operator': 'gt', 'value': '10', 'adjustment_amount': '2.50'
+        })
+        result = RuleBacktester(rule, self.customer.id, base_price=Decimal('10.00')).run()
+
+        self.assertTrue(result['pushed_down'])
+        self.assertTrue(result['complete'])
+        self.assertEqual(result['total_orders'], 4)
+        self.assertEqual(result['matched_orders'], 2)
+        self.assertEqual(result['projected_revenue_impact'], '5.00')
+        self.assertEqual(
+            {s['transaction_id'] for s in result['sample_matches']},
+            {9001, 9002}
+        )
+
+    def test_ne_does_not_match_null_columns(self):
+        rule = RuleBacktester.build_rule({'field': 'weight_lb', 'operator': 'ne', 'value': '5'})
+        result = RuleBacktester(rule, self.customer.id).run()
+        self.assertEqual(result['matched_orders'], 2)
+
+    def test_sku_rule_is_evaluated_in_python(self):
+        rule = RuleBacktester.build_rule({'field': 'sku_quantity', 'operator': 'contains', 'value': 'sku-a'})
+        result = RuleBacktester(rule, self.customer.id).run()
+
+        self.assertFalse(result['pushed_down'])
+        self.assertEqual(result['evaluated_orders'], 4)
+        self.assertEqual(result['matched_orders'], 2)
+
+    def test_days_window_and_sample_size(self):
+        rule = RuleBacktester.build_rule({'field': 'weight_lb', 'operator': 'gt', 'value': '0'})
+        result = RuleBacktester(rule, self.customer.id, days=120, sample_size=1).run()
+
+        self.assertEqual(result['total_orders'], 5)
+        self.assertEqual(result['matched_orders'], 4)
+        self.assertEqual(len(result['sample_matches']), 1)
+
+    def test_advanced_rule_projects_calculations(self):
+        rule = RuleBacktester.build_rule({
+            'field': 'ship_to_country', 'operator': 'eq', 'value': 'US',
+            'calculations': [{'type': 'per_unit', 'value': 1.5}],
+        })
+        self.assertIsInstance(rule, AdvancedRule)
+        result = RuleBacktester(rule, self.customer.id, base_price=Decimal('10.00')).run()
+
+        # Orders 9000 and 9001 carry 1 and 2 items
+        self.assertEqual(result['matched_orders'], 2)
+        self.assertEqual(result['projected_revenue_impact'], '4.50')
+
+    def test_invalid_rule_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            RuleBacktester.build_rule({'field': 'weight_lb', 'operator': 'contains', 'value': 'x'})
+
+
+class BacktestAPITests(TestCase):
+    """Tests for the rule backtest endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(
+            company_name="API Co",
+            legal_business_name="API Co LLC",
+            email="api-backtest@example.com",
+        )
+        service = Service.objects.create(service_name="API Service", charge_type="single")
+        self.customer_service = CustomerService.objects.create(
+            customer=self.customer, service=service, unit_price=Decimal('4.00')
+        )
+        self.group = RuleGroup.objects.create(customer_service=self.customer_service)
+        Order.objects.create(
+            transaction_id=9500,
+            customer=self.customer,
+            reference_number="API-1",
+            close_date=timezone.now(),
+            carrier="UPS",
+        )
+
+    def test_backtest_saved_rule(self):
+        rule = Rule.objects.create(
+            rule_group=self.group, field='carrier', operator='eq', value='UPS',
+            adjustment_amount=Decimal('1.00')
+        )
+        response = self.client.post(reverse('rules:backtest_rule'), {'rule_id': rule.id}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['customer_id'], self.customer.id)
+        self.assertEqual(response.data['matched_orders'], 1)
+        self.assertEqual(response.data['projected_revenue_impact'], '1.00')
+
+    def test_backtest_requires_customer(self):
+        response = self.client.post(
+            reverse('rules:backtest_rule'),
+            {'rule': {'field': 'carrier', 'operator': 'eq', 'value': 'UPS'}},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,139 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from orders.models import Order
+from services.models import Service
+from rules.compiler import RuleQueryCompiler, UncompilableRule
+from rules.models import Rule, RuleGroup
+
+
+class RuleQueryCompilerTests(TestCase):
+    """The compiled Q must select exactly the orders RuleGroup.evaluate accepts."""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Compiler Co",
+            legal_business_name="Compiler Co LLC",
+            email="compiler@example.com",
+        )
+        service = Service.objects.create(service_name="Compiler Service", charge_type="quantity")
+        self.customer_service = CustomerService.objects.create(
+            customer=self.customer, service=service, unit_price=Decimal('1.00')
+        )
+        rows = [
+            (Decimal('5.00'), 1, 'US', 'UPS'),
+            (Decimal('15.50'), 3, 'US', 'FedEx'),
+            (Decimal('25.00'), 2, 'CA', 'UPS'),
+            (None, None, None, None),
+            (Decimal('10.00'), 4, 'MX', 'DHL'),
+        ]
+        for i, (weight, packages, country, carrier) in enumerate(rows):
+            Order.objects.create(
+                transaction_id=7000 + i,
+                customer=self.customer,
+                reference_number=f"CMP-{i}",
+                close_date=timezone.now(),
+                weight_lb=weight,
+                packages=packages,
+                ship_to_country=country,
+                carrier=carrier,
+            )
+        self.orders = Order.objects.filter(customer=self.customer)
+
+    def make_group(self, logic_operator, *rules):
+        group = RuleGroup.objects.create(customer_service=self.customer_service, logic_operator=logic_operator)
+        for field, operator, value in rules:
+            Rule.objects.create(rule_group=group, field=field, operator=operator, value=value)
+        return group
+
+    def assertMatchesPython(self, group):
+        compiled = RuleQueryCompiler().compile_group(group)
+        in_sql = set(self.orders.filter(compiled).values_list('transaction_id', flat=True))
+        in_python = {order.transaction_id for order in self.orders if group.evaluate(order)}
+        self.assertEqual(in_sql, in_python)
+        return in_sql
+
+    def test_logic_operators_match_python(self):
+        rules = [
+            ('weight_lb', 'gt', '10'),
+            ('ship_to_country', 'in', 'US;MX'),
+            ('packages', 'le', '2'),
+        ]
+        for logic_operator in ['AND', 'OR', 'NOT', 'XOR', 'NAND', 'NOR']:
+            with self.subTest(logic_operator=logic_operator):
+                self.assertMatchesPython(self.make_group(logic_operator, *rules))
+
+    def test_xor_is_exactly_one(self):
+        group = self.make_group(
+            'XOR',
+            ('weight_lb', 'ge', '5'),
+            ('carrier', 'eq', 'UPS'),
+            ('packages', 'gt', '0'),
+        )
+        # Every order satisfies either none or at least two of the rules
+        self.assertEqual(self.assertMatchesPython(group), set())
+
+    def test_negated_operators_skip_null_columns(self):
+        for rule in [('carrier', 'ne', 'UPS'), ('ship_to_country', 'ni', 'US'), ('weight_lb', 'ne', '5')]:
+            with self.subTest(rule=rule):
+                matched = self.assertMatchesPython(self.make_group('AND', rule))
+                self.assertNotIn(7003, matched)
+
+    def test_fractional_literal_on_integer_field(self):
+        for operator in ['gt', 'lt', 'ge', 'le', 'eq', 'ne']:
+            with self.subTest(operator=operator):
+                self.assertMatchesPython(self.make_group('AND', ('packages', operator, '2.5')))
+
+    def test_fields_missing_from_order_never_match(self):
+        group = self.make_group('OR', ('sku_count', 'gt', '0'), ('sku_name', 'eq', 'X'))
+        self.assertEqual(self.assertMatchesPython(group), set())
+        self.assertEqual(self.assertMatchesPython(self.make_group('NOR', ('sku_count', 'gt', '0'))),
+                         set(self.orders.values_list('transaction_id', flat=True)))
+
+    def test_empty_group_matches_everything(self):
+        group = self.make_group('AND')
+        self.assertEqual(len(self.assertMatchesPython(group)), 5)
+
+    def test_empty_group_among_others_matches_everything(self):
+        groups = [self.make_group('AND'), self.make_group('AND', ('ship_to_country', 'eq', 'US'))]
+        compiled = RuleQueryCompiler().compile_groups(groups)
+        in_sql = set(self.orders.filter(compiled).values_list('transaction_id', flat=True))
+        in_python = {
+            order.transaction_id for order in self.orders if any(group.evaluate(order) for group in groups)
+        }
+        self.assertEqual(in_sql, in_python)
+        self.assertEqual(len(in_sql), 5)
+
+    @skipUnless(connection.vendor != 'postgresql', 'SKU rules compile on PostgreSQL')
+    def test_sku_quantity_needs_postgresql(self):
+        group = self.make_group('AND', ('sku_quantity', 'contains', 'SKU-A'))
+        with self.assertRaises(UncompilableRule):
+            RuleQueryCompiler().compile_group(group)
+
+    @skipUnless(connection.vendor == 'postgresql', 'SKU index requires PostgreSQL')
+    def test_sku_quantity_operators(self):
+        sku_rows = {
+            7000: {' sku-a ': 1, 'SKU-B': 2},
+            7001: [{'sku': 'sku-b', 'quantity': 3}],
+            7002: {},
+            7003: {'SKU-A': 'bad'},
+            7004: '{"SKU-C": 1}',
+        }
+        for transaction_id, sku_quantity in sku_rows.items():
+            Order.objects.filter(transaction_id=transaction_id).update(sku_quantity=sku_quantity)
+
+        for operator in ['contains', 'ncontains', 'only_contains', 'in', 'ni']:
+            with self.subTest(operator=operator):
+                self.assertMatchesPython(self.make_group('AND', ('sku_quantity', operator, 'SKU-A;sku-b')))
+
+    @skipUnless(connection.vendor == 'postgresql', 'Case-sensitive LIKE requires PostgreSQL')
+    def test_string_pattern_operators(self):
+        for operator, value in [('contains', 'P'), ('ncontains', 'ps'), ('startswith', 'Fed'), ('endswith', 'L')]:
+            with self.subTest(operator=operator):
+                self.assertMatchesPython(self.make_group('AND', ('carrier', operator, value)))
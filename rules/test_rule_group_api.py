@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from customer_services.models import CustomerService
+from services.models import Service
+from rules.models import AdvancedRule, Rule, RuleGroup
+
+
+# A cache of their own, so cached values never leak into other tests
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-rule-groups',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RuleGroupAPIViewTests(TestCase):
+    """Tests for the rule group listing endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('rules:api_rule_groups')
+        self.customers = []
+        for i in range(2):
+            customer = Customer.objects.create(
+                company_name=f"Listing Co {i}",
+                legal_business_name=f"Listing Co {i} LLC",
+                email=f"listing{i}@example.com",
+            )
+            service = Service.objects.create(service_name=f"Listing Service {i}", charge_type="single")
+            customer_service = CustomerService.objects.create(
+                customer=customer, service=service, unit_price=Decimal('1.00')
+            )
+            for logic_operator in ['AND', 'OR']:
+                group = RuleGroup.objects.create(customer_service=customer_service, logic_operator=logic_operator)
+                Rule.objects.create(rule_group=group, field='weight_lb', operator='gt', value='5')
+                AdvancedRule.objects.create(
+                    rule_group=group, field='carrier', operator='eq', value='UPS',
+                    calculations=[{'type': 'flat_fee', 'value': 2}]
+                )
+            self.customers.append(customer)
+
+    def test_listing_uses_constant_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 4)
+        rules = response.data[0]['rules']
+        self.assertEqual([r['advancedrule'] for r in rules], [False, True])
+        self.assertEqual(rules[1]['calculations'], [{'type': 'flat_fee', 'value': 2}])
+        self.assertIsNone(rules[0]['conditions'])
+
+    def test_snapshot_is_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 4)
+
+    def test_rule_edit_invalidates_snapshot(self):
+        self.client.get(self.url)
+        rule = Rule.objects.filter(advancedrule__isnull=True).order_by('id').first()
+        rule.value = '50'
+        rule.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data[0]['rules'][0]['value'], '50')
+
+        RuleGroup.objects.order_by('id').first().delete()
+        self.assertEqual(len(self.client.get(self.url).data), 3)
+
+    def test_name_changes_invalidate_snapshot(self):
+        self.client.get(self.url)
+        customer = self.customers[0]
+        customer.company_name = "Renamed Co"
+        customer.save()
+        service = Service.objects.get(service_name="Listing Service 0")
+        service.service_name = "Renamed Service"
+        service.save()
+
+        group = self.client.get(self.url).data[0]
+        self.assertEqual(group['customer_service']['customer']['name'], "Renamed Co")
+        self.assertEqual(group['customer_service']['service']['name'], "Renamed Service")
+
+    def test_customer_filter(self):
+        response = self.client.get(self.url, {'customer': self.customers[1].id})
+        self.assertEqual(len(response.data), 2)
+        self.assertTrue(all(
+            g['customer_service']['customer']['id'] == self.customers[1].id for g in response.data
+        ))
+
+        response = self.client.get(self.url, {'customer': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pagination(self):
+        response = self.client.get(self.url, {'page': 2, 'page_size': 3})
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(response.data['results']), 1)
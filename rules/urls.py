@@ -17,6 +17,7 @@ urlpatterns = [
     path('calculation-types/', views.get_calculation_types, name='get_calculation_types'),
     path('validate-rule-value/', views.validate_rule_value, name='validate_rule_value'),
     path('test-rule/', views.test_rule, name='test_rule'),
+    path('backtest/', views.backtest_rule, name='backtest_rule'),
     path('group/<int:group_id>/rules/', views.get_rules, name='get_rules'),
     path('group/<int:group_id>/rule/create/api/', views.create_or_update_rule, name='api_create_rule'),
     path('rule/<int:pk>/edit/api/', views.create_or_update_rule, name='api_update_rule'),
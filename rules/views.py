@@ -6,8 +6,9 @@ from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy, reverse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
-from django.db.models import Q
+from django.http import JsonResponse, Http404
+from django.db.models import Q, Prefetch
+from django.core.cache import cache
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
@@ -18,6 +19,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
+from rest_framework.pagination import PageNumberPagination
 
 import json
 import logging
@@ -27,6 +29,8 @@ from products.models import Product
 from orders.models import Order
 from .models import RuleGroup, Rule, AdvancedRule
 from .forms import RuleGroupForm, RuleForm, AdvancedRuleForm
+from .backtest import RuleBacktester
+from .cache import RULE_GROUPS_TIMEOUT, rule_groups_cache_key
 from customer_services.models import CustomerService
 from .utils import validate_field_operator_value, validate_calculation
 
@@ -230,6 +234,11 @@ def create_or_update_rule(request, group_id=None, pk=None):
         )
 
 # API Views
+class RuleGroupPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
 @method_decorator([csrf_exempt, ensure_csrf_cookie], name='dispatch')
 class RuleGroupAPIView(APIView):
     permission_classes = [AllowAny]
@@ -246,14 +255,75 @@ class RuleGroupAPIView(APIView):
         return Response(status=status.HTTP_200_OK)
 
     def get(self, request, *args, **kwargs):
+        """
+        List rule groups with their rules.
+
+        Query params:
+            customer: Only return rule groups for this customer ID
+            page, page_size: Paginate the result (unpaginated when omitted)
+        """
         try:
-            rule_groups = RuleGroup.objects.select_related(
-                'customer_service',
-                'customer_service__customer',
-                'customer_service__service'
-            ).all()
-            
-            data = [{
+            customer_id = request.query_params.get('customer')
+            if customer_id is not None:
+                try:
+                    customer_id = int(customer_id)
+                except ValueError:
+                    return Response({'error': 'customer must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+            cache_key = rule_groups_cache_key(customer_id)
+            data = cache.get(cache_key)
+            if data is None:
+                data = self.serialize_rule_groups(customer_id)
+                cache.set(cache_key, data, RULE_GROUPS_TIMEOUT)
+
+            if 'page' in request.query_params or 'page_size' in request.query_params:
+                paginator = RuleGroupPagination()
+                page = paginator.paginate_queryset(data, request, view=self)
+                return paginator.get_paginated_response(page)
+
+            return Response(data)
+        except Exception as e:
+            logger.error(f"Error fetching rule groups: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @staticmethod
+    def serialize_rule_groups(customer_id=None):
+        """Serialize rule groups and rules in two queries."""
+        rule_groups = RuleGroup.objects.select_related(
+            'customer_service',
+            'customer_service__customer',
+            'customer_service__service'
+        ).prefetch_related(
+            # advancedrule is joined so checking for it never hits the database
+            Prefetch('rules', queryset=Rule.objects.select_related('advancedrule').order_by('id'))
+        ).order_by('id')
+
+        if customer_id is not None:
+            rule_groups = rule_groups.filter(customer_service__customer_id=customer_id)
+
+        data = []
+        for group in rule_groups:
+            rules = []
+            for rule in group.rules.all():
+                try:
+                    advanced = rule.advancedrule
+                except AdvancedRule.DoesNotExist:
+                    advanced = None
+                rules.append({
+                    'id': rule.id,
+                    'field': rule.field,
+                    'operator': rule.operator,
+                    'value': rule.value,
+                    'adjustment_amount': str(rule.adjustment_amount) if rule.adjustment_amount else None,
+                    'advancedrule': advanced is not None,
+                    'conditions': advanced.conditions if advanced else None,
+                    'calculations': advanced.calculations if advanced else None,
+                })
+
+            data.append({
                 'id': group.id,
                 'customer_service': {
                     'id': group.customer_service_id,
@@ -268,25 +338,9 @@ class RuleGroupAPIView(APIView):
                     }
                 },
                 'logic_operator': group.logic_operator,
-                'rules': [{
-                    'id': rule.id,
-                    'field': rule.field,
-                    'operator': rule.operator,
-                    'value': rule.value,
-                    'adjustment_amount': str(rule.adjustment_amount) if rule.adjustment_amount else None,
-                    'advancedrule': hasattr(rule, 'advancedrule'),
-                    'conditions': rule.advancedrule.conditions if hasattr(rule, 'advancedrule') else None,
-                    'calculations': rule.advancedrule.calculations if hasattr(rule, 'advancedrule') else None,
-                } for rule in group.rules.all()]
-            } for group in rule_groups]
-            
-            return Response(data)
-        except Exception as e:
-            logger.error(f"Error fetching rule groups: {str(e)}")
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+                'rules': rules
+            })
+        return data
 
     def post(self, request, *args, **kwargs):
         try:
@@ -918,6 +972,79 @@ def evaluate_condition(order, field, operator, value):
         logger.error(f"Error evaluating condition: {str(e)}")
         return False
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def backtest_rule(request):
+    """
+    Backtest a draft or saved rule against a customer's historical orders.
+
+    Parameters:
+        - rule: Draft rule definition (field, operator, value, adjustment_amount,
+          conditions, calculations), or
+        - rule_id: ID of a saved rule to replay instead
+        - customer_id: Customer whose orders are replayed (optional when the
+          customer service or saved rule identifies it)
+        - customer_service_id: Customer service whose unit price the rule adjusts
+        - days: Days of history to replay (default 30, max 365)
+        - sample_size: Number of matching orders to return (default 10)
+        - budget_ms: Evaluation time budget in milliseconds (default 2000)
+
+    Returns:
+        - 200 OK with match counts, sample matches and projected revenue impact
+        - 400 Bad Request if the rule or customer is missing or invalid
+    """
+    try:
+        data = request.data
+        customer_service = None
+        rule_id = data.get('rule_id')
+
+        if rule_id:
+            rule = AdvancedRule.objects.filter(pk=rule_id).select_related(
+                'rule_group__customer_service'
+            ).first() or get_object_or_404(
+                Rule.objects.select_related('rule_group__customer_service'), pk=rule_id
+            )
+            customer_service = rule.rule_group.customer_service
+        else:
+            rule = RuleBacktester.build_rule(data.get('rule'))
+
+        customer_service_id = data.get('customer_service_id')
+        if customer_service_id:
+            customer_service = get_object_or_404(CustomerService, id=customer_service_id)
+
+        customer_id = data.get('customer_id') or (customer_service.customer_id if customer_service else None)
+        if not customer_id:
+            return Response(
+                {'error': 'customer_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        backtester = RuleBacktester(
+            rule,
+            customer_id=customer_id,
+            days=data.get('days'),
+            base_price=customer_service.unit_price if customer_service else None,
+            sample_size=data.get('sample_size'),
+            budget_ms=data.get('budget_ms'),
+        )
+        return Response(backtester.run())
+
+    except ValidationError as e:
+        return Response(
+            {'error': e.messages if hasattr(e, 'messages') else [str(e)]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except (TypeError, ValueError) as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Http404:
+        raise
+    except Exception as e:
+        logger.error(f"Error backtesting rule: {str(e)}")
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
 @api_view(['GET'])
 def get_calculations_schema(request):
     """Return JSON schema for calculations"""
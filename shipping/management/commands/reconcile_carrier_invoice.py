@@ -0,0 +1,60 @@
+import csv
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...reconciliation import BATCH_SIZE, CARRIER_MODELS, CarrierReconciler
+
+logger = logging.getLogger(__name__)
+
+ISSUE_COLUMNS = ['row', 'kind', 'message', 'transaction_id', 'reference', 'tracking_number']
+
+
+class Command(BaseCommand):
+    help = 'Reconcile a carrier invoice CSV export with orders and upsert shipping records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Carrier CSV export')
+        parser.add_argument('--carrier', choices=sorted(CARRIER_MODELS), required=True,
+                            help='Shipping table to reconcile into')
+        parser.add_argument('--customer-id', type=int, help='Only match orders of this customer')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Lines per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report without writing')
+        parser.add_argument('--issues', type=str, help='Write every unapplied line to this CSV file')
+        parser.add_argument('--encoding', type=str, default='utf-8-sig', help='Encoding of the export')
+
+    def handle(self, *args, **options):
+        issues_file = None
+        on_issue = None
+        if options.get('issues'):
+            issues_file = open(options['issues'], 'w', newline='')
+            writer = csv.writer(issues_file)
+            writer.writerow(ISSUE_COLUMNS)
+
+            def on_issue(issue):
+                writer.writerow([getattr(issue, column) for column in ISSUE_COLUMNS])
+
+        reconciler = CarrierReconciler(
+            CARRIER_MODELS[options['carrier']],
+            customer_id=options.get('customer_id'),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            on_issue=on_issue,
+        )
+
+        try:
+            with open(options['path'], 'rb') as file_obj:
+                result = reconciler.reconcile_file(file_obj, encoding=options['encoding'])
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+        finally:
+            if issues_file:
+                issues_file.close()
+
+        summary = result.to_dict()
+        prefix = 'Dry run: ' if result.dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{summary['total_rows']} lines, {summary['created']} created, "
+            f"{summary['updated']} updated, {summary['unmatched']} unmatched, "
+            f"{summary['duplicates']} duplicates, {summary['invalid']} invalid"
+        ))
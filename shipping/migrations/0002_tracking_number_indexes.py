@@ -0,0 +1,22 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('shipping', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='cadshipping',
+            index=models.Index(fields=['tracking_number'], name='idx_cadshipping_tracking'),
+        ),
+        AddIndexConcurrently(
+            model_name='usshipping',
+            index=models.Index(fields=['tracking_number'], name='idx_usshipping_tracking'),
+        ),
+    ]
@@ -37,6 +37,10 @@ class CADShipping(models.Model):
     carrier = models.CharField(max_length=50, blank=True, null=True)
     raw_ship_date = models.TextField(blank=True, null=True)
 
+    class Meta:
+        # Carrier invoice reconciliation matches lines by tracking number
+        indexes = [models.Index(fields=['tracking_number'], name='idx_cadshipping_tracking')]
+
     def __str__(self):
         return f"CAD Shipping for Order {self.transaction_id}"
 
@@ -71,5 +75,9 @@ class USShipping(models.Model):
     delivery_date = models.DateField(blank=True, null=True)
     days_to_first_deliver = models.IntegerField(blank=True, null=True)
 
+    class Meta:
+        # Carrier invoice reconciliation matches lines by tracking number
+        indexes = [models.Index(fields=['tracking_number'], name='idx_usshipping_tracking')]
+
     def __str__(self):
         return f"US Shipping for Order {self.transaction_id}"
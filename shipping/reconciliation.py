@@ -0,0 +1,376 @@
+# shipping/reconciliation.py
+
+import codecs
+import csv
+import logging
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+from orders.models import Order
+from .models import CADShipping, USShipping
+
+logger = logging.getLogger(__name__)
+
+CARRIER_MODELS = {
+    'cad': CADShipping,
+    'us': USShipping,
+}
+
+# Columns a carrier export can be matched to orders by, in order of preference
+TRANSACTION_COLUMNS = ('transaction_id', 'transaction')
+REFERENCE_COLUMNS = ('reference_number', 'reference')
+TRACKING_COLUMN = 'tracking_number'
+
+BATCH_SIZE = 2000
+MAX_REPORTED_ISSUES = 100
+
+
+@dataclass(slots=True)
+class ReconciliationIssue:
+    """A CSV line that was not applied."""
+    row: int
+    kind: str  # 'unmatched', 'ambiguous', 'duplicate' or 'invalid'
+    message: str
+    transaction_id: int = None
+    reference: str = None
+    tracking_number: str = None
+
+    def to_dict(self):
+        return {
+            'row': self.row,
+            'kind': self.kind,
+            'message': self.message,
+            'transaction_id': self.transaction_id,
+            'reference': self.reference,
+            'tracking_number': self.tracking_number,
+        }
+
+
+@dataclass(slots=True)
+class ReconciliationResult:
+    """Counts of a reconciliation run and the first issues found."""
+    dry_run: bool = False
+    total_rows: int = 0
+    created: int = 0
+    updated: int = 0
+    issue_counts: dict = field(default_factory=lambda: {
+        'unmatched': 0, 'ambiguous': 0, 'duplicate': 0, 'invalid': 0
+    })
+    issues: list = field(default_factory=list)
+
+    @property
+    def matched(self):
+        return self.created + self.updated
+
+    def to_dict(self):
+        issue_total = sum(self.issue_counts.values())
+        return {
+            'dry_run': self.dry_run,
+            'total_rows': self.total_rows,
+            'matched': self.matched,
+            'created': self.created,
+            'updated': self.updated,
+            'unmatched': self.issue_counts['unmatched'] + self.issue_counts['ambiguous'],
+            'duplicates': self.issue_counts['duplicate'],
+            'invalid': self.issue_counts['invalid'],
+            'issues': [issue.to_dict() for issue in self.issues],
+            'has_more_issues': issue_total > len(self.issues),
+        }
+
+
+def parse_value(model_field, raw):
+    """
+    Convert a CSV cell to a model field value.
+
+    Args:
+        model_field: Field of the shipping model
+        raw: Cell text; blank cells give None
+
+    Returns:
+        The cleaned value
+
+    Raises:
+        ValidationError: If the text is not a valid value for the field
+    """
+    raw = (raw or '').strip()
+    if not raw:
+        return None
+    if isinstance(model_field, models.DecimalField):
+        # Carrier exports format amounts as currency
+        raw = raw.replace('$', '').replace(',', '')
+    value = model_field.clean(raw, None)
+    if isinstance(model_field, models.DateTimeField) and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class CarrierReconciler:
+    """
+    Reconcile a carrier invoice export with orders and upsert shipping records.
+
+    Lines are read as a stream and handled in batches. For each batch, orders
+    are looked up by transaction ID, reference number and tracking number with
+    one IN query per key, and the results are kept in dictionaries while the
+    lines are matched. Matched lines are written with INSERT ... ON CONFLICT
+    statements of many rows each. Lines that match no order, match several, repeat an order already
+    seen in the file or hold invalid values are reported as issues.
+
+    Only columns present in the file are written, and blank cells keep the
+    stored value, so a partial export never blanks existing data.
+    """
+
+    def __init__(self, model, customer_id=None, batch_size=BATCH_SIZE, dry_run=False, on_issue=None):
+        """
+        Args:
+            model: CADShipping or USShipping
+            customer_id: Only match orders of this customer
+            batch_size: Number of lines matched and written together
+            dry_run: Match and validate without writing
+            on_issue: Optional callable receiving every ReconciliationIssue
+        """
+        self.model = model
+        self.customer_id = customer_id
+        self.batch_size = batch_size
+        self.on_issue = on_issue
+        self.fields = {
+            f.name: f for f in model._meta.concrete_fields
+            if f.name not in ('transaction', 'customer')
+        }
+        self.update_fields = []
+        self.seen_transactions = set()
+        self.result = ReconciliationResult(dry_run=dry_run)
+
+    def reconcile_file(self, file_obj, encoding='utf-8-sig'):
+        """
+        Reconcile a CSV file.
+
+        Args:
+            file_obj: Binary file object, such as an uploaded file
+            encoding: Text encoding of the file
+
+        Returns:
+            ReconciliationResult
+
+        Raises:
+            ValueError: If the file has no header or no column to match on
+        """
+        reader = csv.DictReader(codecs.iterdecode(file_obj, encoding))
+        if not reader.fieldnames:
+            raise ValueError("The file is empty")
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+        match_columns = (*TRANSACTION_COLUMNS, *REFERENCE_COLUMNS, TRACKING_COLUMN)
+        if not any(column in reader.fieldnames for column in match_columns):
+            raise ValueError(f"The file needs one of these columns: {', '.join(match_columns)}")
+
+        self.update_fields = [name for name in reader.fieldnames if name in self.fields]
+        return self.reconcile(reader)
+
+    def reconcile(self, rows):
+        """
+        Reconcile parsed CSV lines.
+
+        Args:
+            rows: Iterable of dictionaries keyed by lower-case column name
+
+        Returns:
+            ReconciliationResult
+        """
+        batch = []
+        # Line 1 is the header
+        for row_number, row in enumerate(rows, start=2):
+            batch.append((row_number, row))
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch)
+                batch = []
+        if batch:
+            self.process_batch(batch)
+
+        result = self.result
+        logger.info(
+            f"Reconciled {result.total_rows} {self.model.__name__} lines: "
+            f"{result.created} created, {result.updated} updated, {result.issue_counts}"
+        )
+        return result
+
+    def report(self, row_number, kind, message, keys):
+        issue = ReconciliationIssue(row_number, kind, message, *keys)
+        self.result.issue_counts[kind] += 1
+        if len(self.result.issues) < MAX_REPORTED_ISSUES:
+            self.result.issues.append(issue)
+        if self.on_issue:
+            self.on_issue(issue)
+
+    @staticmethod
+    def first_value(row, columns):
+        for column in columns:
+            value = (row.get(column) or '').strip()
+            if value:
+                return value
+        return None
+
+    def orders(self):
+        orders = Order.objects.order_by()
+        if self.customer_id is not None:
+            orders = orders.filter(customer_id=self.customer_id)
+        return orders
+
+    def build_indexes(self, keyed_rows):
+        """Hash indexes from each match key to (transaction_id, customer_id)."""
+        transaction_ids = {keys[0] for _, keys, _ in keyed_rows if keys[0] is not None}
+        references = {keys[1] for _, keys, _ in keyed_rows if keys[1]}
+        tracking_numbers = {keys[2] for _, keys, _ in keyed_rows if keys[2]}
+
+        by_transaction = {}
+        if transaction_ids:
+            by_transaction = {
+                transaction_id: (transaction_id, customer_id)
+                for transaction_id, customer_id in self.orders().filter(
+                    transaction_id__in=transaction_ids
+                ).values_list('transaction_id', 'customer_id')
+            }
+
+        # A reference can be reused across customers; keep every match
+        by_reference = {}
+        if references:
+            for reference, transaction_id, customer_id in self.orders().filter(
+                reference_number__in=references
+            ).values_list('reference_number', 'transaction_id', 'customer_id'):
+                by_reference.setdefault(reference, []).append((transaction_id, customer_id))
+
+        by_tracking = {}
+        if tracking_numbers:
+            shipments = self.model.objects.order_by().filter(tracking_number__in=tracking_numbers)
+            if self.customer_id is not None:
+                shipments = shipments.filter(customer_id=self.customer_id)
+            for tracking_number, transaction_id, customer_id in shipments.values_list(
+                'tracking_number', 'transaction_id', 'customer_id'
+            ):
+                by_tracking.setdefault(tracking_number, []).append((transaction_id, customer_id))
+
+        return by_transaction, by_reference, by_tracking
+
+    def match(self, keys, indexes):
+        """The (transaction_id, customer_id) of a line, or an issue kind."""
+        transaction_id, reference, tracking_number = keys
+        by_transaction, by_reference, by_tracking = indexes
+
+        if transaction_id in by_transaction:
+            return by_transaction[transaction_id], None
+
+        ambiguous = False
+        for index, key in ((by_reference, reference), (by_tracking, tracking_number)):
+            candidates = index.get(key)
+            if not candidates:
+                continue
+            if len(candidates) == 1:
+                return candidates[0], None
+            ambiguous = True
+
+        return None, 'ambiguous' if ambiguous else 'unmatched'
+
+    def process_batch(self, batch):
+        """Match, validate and upsert one batch of lines."""
+        self.result.total_rows += len(batch)
+
+        keyed_rows = []
+        for row_number, row in batch:
+            raw_transaction_id = self.first_value(row, TRANSACTION_COLUMNS)
+            keys = (
+                None,
+                self.first_value(row, REFERENCE_COLUMNS),
+                self.first_value(row, (TRACKING_COLUMN,)),
+            )
+            if raw_transaction_id is not None:
+                try:
+                    keys = (int(raw_transaction_id), *keys[1:])
+                except ValueError:
+                    self.report(row_number, 'invalid', f"Invalid transaction_id: {raw_transaction_id}", keys)
+                    continue
+            keyed_rows.append((row_number, keys, row))
+
+        indexes = self.build_indexes(keyed_rows)
+
+        records = []
+        for row_number, keys, row in keyed_rows:
+            matched, problem = self.match(keys, indexes)
+            if problem == 'ambiguous':
+                self.report(row_number, problem, "Matches more than one order", keys)
+                continue
+            if problem:
+                self.report(row_number, problem, "No matching order", keys)
+                continue
+
+            transaction_id, customer_id = matched
+            if transaction_id in self.seen_transactions:
+                self.report(row_number, 'duplicate', f"Order {transaction_id} already appears in the file", keys)
+                continue
+
+            try:
+                values = [parse_value(self.fields[name], row.get(name)) for name in self.update_fields]
+            except ValidationError as e:
+                self.report(row_number, 'invalid', '; '.join(e.messages), keys)
+                continue
+
+            self.seen_transactions.add(transaction_id)
+            records.append([transaction_id, customer_id, *values])
+
+        if not records:
+            return
+
+        # Blank cells keep the stored value; the upsert writes every column it names
+        existing = {
+            stored[0]: stored[1:]
+            for stored in self.model.objects.filter(
+                transaction_id__in=[record[0] for record in records]
+            ).values_list('transaction_id', *self.update_fields)
+        }
+        for record in records:
+            stored = existing.get(record[0])
+            if stored:
+                for index, value in enumerate(stored, start=2):
+                    if record[index] is None:
+                        record[index] = value
+
+        self.result.updated += len(existing)
+        self.result.created += len(records) - len(existing)
+
+        if not self.result.dry_run:
+            self.upsert(records)
+
+    def upsert(self, records):
+        """
+        Insert or update shipping records with one statement per chunk.
+
+        Only the transaction, customer and file columns are sent. Going
+        through bulk_create would send all of the model's columns for every
+        row, which dominated the run time on large files.
+
+        Args:
+            records: Lists of [transaction_id, customer_id, *update_fields values]
+        """
+        connection = connections[router.db_for_write(self.model)]
+        fields = [self.model._meta.get_field(name) for name in ('transaction', 'customer', *self.update_fields)]
+        quote_name = connection.ops.quote_name
+        columns = [quote_name(f.column) for f in fields]
+        updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns[1:])
+        placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+        chunk_size = connection.ops.bulk_batch_size(fields, records)
+
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for start in range(0, len(records), chunk_size):
+                chunk = records[start:start + chunk_size]
+                params = [
+                    model_field.get_db_prep_save(value, connection)
+                    for record in chunk
+                    for model_field, value in zip(fields, record)
+                ]
+                cursor.execute(
+                    f"INSERT INTO {quote_name(self.model._meta.db_table)} ({', '.join(columns)}) "
+                    f"VALUES {', '.join([placeholders] * len(chunk))} "
+                    f"ON CONFLICT ({columns[0]}) DO UPDATE SET {updates}",
+                    params
+                )
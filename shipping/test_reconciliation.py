@@ -0,0 +1,131 @@
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from customers.models import Customer
+from orders.models import Order
+from .models import CADShipping, USShipping
+from .reconciliation import CarrierReconciler
+
+
+def csv_file(*lines):
+    return BytesIO(('\n'.join(lines) + '\n').encode('utf-8-sig'))
+
+
+class CarrierReconcilerTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            company_name="Carrier Co",
+            legal_business_name="Carrier Co LLC",
+            email="carrier@example.com",
+        )
+        self.other = Customer.objects.create(
+            company_name="Other Co",
+            legal_business_name="Other Co LLC",
+            email="other@example.com",
+        )
+        for transaction_id, customer, reference in [
+            (7001, self.customer, 'REF-1'),
+            (7002, self.customer, 'REF-2'),
+            (7003, self.customer, 'SHARED'),
+            (7004, self.other, 'SHARED'),
+            (7005, self.other, 'REF-5'),
+        ]:
+            Order.objects.create(transaction_id=transaction_id, customer=customer, reference_number=reference)
+
+        USShipping.objects.create(
+            transaction_id=7005, customer=self.other, tracking_number='1Z005', service_name='Ground'
+        )
+
+    def test_matches_by_each_key_and_reports_issues(self):
+        file_obj = csv_file(
+            'Transaction_ID,Reference,Tracking_Number,Rate,Ship_Date',
+            '7001,,,"$1,012.50",2024-03-01',
+            ',REF-2,,4.10,2024-03-02',
+            ',,1Z005,7.25,2024-03-03',
+            ',SHARED,,1.00,',
+            '9999,NOPE,,1.00,',
+            '7001,,,2.00,',
+            ',REF-1,,oops,',
+            'abc,,,1.00,',
+        )
+
+        # Four lookups and one upsert (in a savepoint)
+        with self.assertNumQueries(7):
+            result = CarrierReconciler(USShipping).reconcile_file(file_obj)
+
+        summary = result.to_dict()
+        self.assertEqual(summary['total_rows'], 8)
+        self.assertEqual((summary['created'], summary['updated']), (2, 1))
+        self.assertEqual((summary['unmatched'], summary['duplicates'], summary['invalid']), (2, 2, 1))
+        self.assertEqual(
+            [(issue['row'], issue['kind']) for issue in summary['issues']],
+            [(9, 'invalid'), (5, 'ambiguous'), (6, 'unmatched'), (7, 'duplicate'), (8, 'duplicate')]
+        )
+
+        first = USShipping.objects.get(transaction_id=7001)
+        self.assertEqual(first.rate, Decimal('1012.50'))
+        self.assertEqual(first.ship_date, date(2024, 3, 1))
+        self.assertEqual(first.customer, self.customer)
+
+        # Columns missing from the file are left alone
+        updated = USShipping.objects.get(transaction_id=7005)
+        self.assertEqual((updated.rate, updated.service_name), (Decimal('7.25'), 'Ground'))
+
+        # Blank cells keep the stored value
+        file_obj = csv_file('transaction_id,tracking_number,rate', '7005,,8.00')
+        result = CarrierReconciler(USShipping).reconcile_file(file_obj)
+        self.assertEqual(result.updated, 1)
+        updated.refresh_from_db()
+        self.assertEqual((updated.rate, updated.tracking_number), (Decimal('8.00'), '1Z005'))
+
+    def test_customer_scope_and_dry_run(self):
+        file_obj = csv_file('reference_number,weight', 'SHARED,2.5')
+
+        result = CarrierReconciler(CADShipping, customer_id=self.customer.id, dry_run=True).reconcile_file(file_obj)
+
+        self.assertEqual(result.created, 1)
+        self.assertFalse(CADShipping.objects.exists())
+
+    def test_batches(self):
+        lines = ['transaction_id,weight'] + [f'{transaction_id},1' for transaction_id in (7001, 7002, 7003)]
+        result = CarrierReconciler(CADShipping, batch_size=2).reconcile_file(csv_file(*lines))
+
+        self.assertEqual(result.created, 3)
+        self.assertEqual(CADShipping.objects.count(), 3)
+
+    def test_requires_match_column(self):
+        with self.assertRaises(ValueError):
+            CarrierReconciler(CADShipping).reconcile_file(csv_file('weight', '1'))
+
+    def test_endpoint(self):
+        upload = SimpleUploadedFile('invoice.csv', b'transaction_id,weight\n7001,1.5\n7999,2\n')
+        response = self.client.post(reverse('cadshipping-reconcile'), {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['created'], 1)
+        self.assertEqual(response.json()['data']['unmatched'], 1)
+
+        response = self.client.post(reverse('cadshipping-reconcile'), {})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_issues(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'invoice.csv')
+            issues_path = os.path.join(directory, 'issues.csv')
+            with open(path, 'wb') as f:
+                f.write(csv_file('transaction_id,rate', '7001,1', '7999,2').getvalue())
+
+            out = StringIO()
+            call_command('reconcile_carrier_invoice', path, '--carrier', 'us', '--issues', issues_path, stdout=out)
+
+            self.assertIn('2 lines, 1 created, 0 updated, 1 unmatched', out.getvalue())
+            with open(issues_path) as f:
+                self.assertEqual(f.read().splitlines()[1], '3,unmatched,No matching order,7999,,')
@@ -2,10 +2,62 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db.models import Q
+import logging
+from LedgerLink.faceting import FacetedCountsMixin
 from .models import CADShipping, USShipping
+from .reconciliation import CarrierReconciler
 from .serializers import CADShippingSerializer, USShippingSerializer
 
-class CADShippingViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+
+class CarrierReconciliationMixin:
+    """
+    Adds a `reconcile` action that applies a carrier invoice CSV export.
+    """
+
+    @action(detail=False, methods=['post'])
+    def reconcile(self, request):
+        """
+        Match an uploaded carrier CSV to orders and upsert the shipping records.
+
+        Form fields: `file` (required), `customer` to only match that
+        customer's orders, and `dry_run` to report without writing.
+        """
+        file_obj = request.FILES.get('file')
+        if not file_obj:
+            return Response({
+                'success': False,
+                'message': 'No file provided'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            customer_id = request.data.get('customer') or None
+            reconciler = CarrierReconciler(
+                self.queryset.model,
+                customer_id=int(customer_id) if customer_id else None,
+                dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes'),
+            )
+            result = reconciler.reconcile_file(file_obj)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error reconciling carrier file: {str(e)}")
+            return Response({
+                'success': False,
+                'message': 'Failed to reconcile carrier file'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({
+            'success': True,
+            'data': result.to_dict()
+        })
+
+
+class CADShippingViewSet(CarrierReconciliationMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling CAD shipping CRUD operations.
     Provides standard CRUD endpoints plus additional actions.
@@ -114,13 +166,15 @@ class CADShippingViewSet(viewsets.ModelViewSet):
             'data': list(filter(None, carriers))  # Filter out None values
         })
 
-class USShippingViewSet(viewsets.ModelViewSet):
+class USShippingViewSet(CarrierReconciliationMixin, FacetedCountsMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling US shipping CRUD operations.
     Provides standard CRUD endpoints plus additional actions.
     """
     queryset = USShipping.objects.all()
     serializer_class = USShippingSerializer
+    facet_fields = ('current_status', 'delivery_status', 'service_name')
+    facet_cache_timeout = 30
 
     def get_queryset(self):
         """
@@ -217,20 +271,21 @@ class USShippingViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statuses(self, request):
         """
-        Get lists of unique current and delivery statuses.
+        Get lists of unique current and delivery statuses, with their counts.
         """
-        current_statuses = USShipping.objects.values_list(
-            'current_status', flat=True
-        ).distinct().order_by('current_status')
-        delivery_statuses = USShipping.objects.values_list(
-            'delivery_status', flat=True
-        ).distinct().order_by('delivery_status')
+        facets = self.get_facets(['current_status', 'delivery_status'])['facets']
+        current_statuses = facets['current_status']
+        delivery_statuses = facets['delivery_status']
         
         return Response({
             'success': True,
             'data': {
-                'current_statuses': list(filter(None, current_statuses)),
-                'delivery_statuses': list(filter(None, delivery_statuses))
+                'current_statuses': sorted(filter(None, current_statuses)),
+                'delivery_statuses': sorted(filter(None, delivery_statuses)),
+                'counts': {
+                    'current_status': {key: count for key, count in current_statuses.items() if key},
+                    'delivery_status': {key: count for key, count in delivery_statuses.items() if key}
+                }
             }
         })
 